@@ -12,7 +12,9 @@ config = context.config
 # Setup logging
 logger = structlog.get_logger()
 
-config.set_main_option("sqlalchemy.url", app_settings.DATABASE_URI)
+# upgrade_to_heads sets the URL of the database it upgrades; % is escaped for the interpolation of the config
+if not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option("sqlalchemy.url", app_settings.DATABASE_URI.replace("%", "%%"))
 
 # add your model's MetaData object here
 # for 'autogenerate' support
@@ -0,0 +1,34 @@
+"""Add indexes on the order numbers of products and categories.
+
+They keep the products of a category and the categories of a shop in order, and let the `max(order_number)` of a new
+row be read from the end of the index alone, see `server.crud.ordering`. Existing order numbers are left as they are:
+the first reorder of a category without room between its numbers spreads them out.
+
+Revision ID: 2d9a4f6c8b31
+Revises: 8f3b6d0e2a17
+Create Date: 2026-10-18 23:04:51.208114
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "2d9a4f6c8b31"
+down_revision = "8f3b6d0e2a17"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_products_shop_id_category_id_order_number",
+        "products",
+        ["shop_id", "category_id", "order_number"],
+        unique=False,
+    )
+    op.create_index("ix_categories_shop_id_order_number", "categories", ["shop_id", "order_number"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_categories_shop_id_order_number", table_name="categories")
+    op.drop_index("ix_products_shop_id_category_id_order_number", table_name="products")
@@ -0,0 +1,23 @@
+"""Add an index on orders for keyset pagination by date.
+
+Revision ID: 3c8e5b1f7a92
+Revises: 7890fc217968
+Create Date: 2026-10-18 09:12:40.518230
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3c8e5b1f7a92"
+down_revision = "7890fc217968"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_orders_shop_id_created_at_id", "orders", ["shop_id", "created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_shop_id_created_at_id", table_name="orders")
@@ -0,0 +1,41 @@
+"""Add catalog snapshots and the catalog version of shops.
+
+`shops.catalog_version` is raised by every write to the storefront catalog of a shop. `catalog_snapshots` holds the
+serialized price list of a shop per language with the version it was built from, see `server.crud.catalog`.
+
+Revision ID: 5e2a9c71d4b3
+Revises: b7e3f09a4c18
+Create Date: 2026-10-18 18:21:07.402913
+
+"""
+
+import sqlalchemy as sa
+import sqlalchemy_utils
+from alembic import op
+
+from server.db.models import UtcTimestamp
+
+# revision identifiers, used by Alembic.
+revision = "5e2a9c71d4b3"
+down_revision = "b7e3f09a4c18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("shops", sa.Column("catalog_version", sa.BigInteger(), server_default="0", nullable=False))
+    op.create_table(
+        "catalog_snapshots",
+        sa.Column("shop_id", sqlalchemy_utils.types.uuid.UUIDType(), nullable=False),
+        sa.Column("lang", sa.String(length=8), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("body", sa.LargeBinary(), nullable=False),
+        sa.Column("built_at", UtcTimestamp(timezone=True), server_default=sa.text("CURRENT_TIMESTAMP"), nullable=False),
+        sa.ForeignKeyConstraint(["shop_id"], ["shops.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("shop_id", "lang"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("catalog_snapshots")
+    op.drop_column("shops", "catalog_version")
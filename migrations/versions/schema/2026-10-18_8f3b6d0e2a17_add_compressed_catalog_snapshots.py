@@ -0,0 +1,32 @@
+"""Add the compressed bodies of catalog snapshots.
+
+The snapshots are stored compressed with zstd, brotli and gzip next to the plain body, so the price list is served
+in the encoding a client accepts without compressing it per request, see `server.api.compression`. Snapshots built
+before have none and are rebuilt on their first read.
+
+Revision ID: 8f3b6d0e2a17
+Revises: c41d8e2f7a95
+Create Date: 2026-10-18 21:37:12.550281
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8f3b6d0e2a17"
+down_revision = "c41d8e2f7a95"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("catalog_snapshots", sa.Column("body_zstd", sa.LargeBinary(), nullable=True))
+    op.add_column("catalog_snapshots", sa.Column("body_br", sa.LargeBinary(), nullable=True))
+    op.add_column("catalog_snapshots", sa.Column("body_gzip", sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("catalog_snapshots", "body_gzip")
+    op.drop_column("catalog_snapshots", "body_br")
+    op.drop_column("catalog_snapshots", "body_zstd")
@@ -0,0 +1,49 @@
+"""Add trigram indexes for the text filters of listings.
+
+`key:value` filters on text columns and bare filter values are `ILIKE '%value%'`, which only a pg_trgm GIN index can
+serve. Indexes the columns a bare value searches, `server.db.search.SEARCH_COLUMNS`. Skipped, with a warning, on a
+server without the pg_trgm extension: the filters still work, with a sequential scan.
+
+Revision ID: 9d41c7e2b5a3
+Revises: 3c8e5b1f7a92
+Create Date: 2026-10-18 14:31:07.402116
+
+"""
+
+import logging
+
+import sqlalchemy as sa
+from alembic import op
+
+from server.db.search import SEARCH_COLUMNS
+
+# revision identifiers, used by Alembic.
+revision = "9d41c7e2b5a3"
+down_revision = "3c8e5b1f7a92"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+TRIGRAM_COLUMNS = [(table, column) for table, columns in SEARCH_COLUMNS.items() for column in columns]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if conn.scalar(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")) is None:
+        logger.warning("The pg_trgm extension is not available: skipping the trigram indexes")
+        return
+    conn.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for table, column in TRIGRAM_COLUMNS:
+        op.create_index(
+            f"ix_{table}_{column}_trgm",
+            table,
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for table, column in TRIGRAM_COLUMNS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}_trgm")
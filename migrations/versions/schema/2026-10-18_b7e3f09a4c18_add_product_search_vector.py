@@ -0,0 +1,57 @@
+"""Add a full-text search vector to product translations.
+
+A stored generated tsvector of the names, short descriptions and descriptions of the three languages, with a GIN index.
+Keep the expression in sync with `server.db.search.search_vector_sql`. Also indexes `product_id`, to join the matches
+(and load the translation of a product) without a scan.
+
+Revision ID: b7e3f09a4c18
+Revises: 9d41c7e2b5a3
+Create Date: 2026-10-18 16:05:52.118734
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b7e3f09a4c18"
+down_revision = "9d41c7e2b5a3"
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = """
+    setweight(to_tsvector('dutch'::regconfig, coalesce(main_name, '')), 'A')
+    || setweight(to_tsvector('dutch'::regconfig, coalesce(main_description_short, '')), 'B')
+    || setweight(to_tsvector('dutch'::regconfig, coalesce(main_description, '')), 'C')
+    || setweight(to_tsvector('english'::regconfig, coalesce(alt1_name, '')), 'A')
+    || setweight(to_tsvector('english'::regconfig, coalesce(alt1_description_short, '')), 'B')
+    || setweight(to_tsvector('english'::regconfig, coalesce(alt1_description, '')), 'C')
+    || setweight(to_tsvector('german'::regconfig, coalesce(alt2_name, '')), 'A')
+    || setweight(to_tsvector('german'::regconfig, coalesce(alt2_description_short, '')), 'B')
+    || setweight(to_tsvector('german'::regconfig, coalesce(alt2_description, '')), 'C')
+"""
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(
+        sa.text(
+            f"ALTER TABLE product_translations ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR}) STORED"
+        )
+    )
+    # Without the pending list of fastupdate: catalogs are read far more than written, and a long pending list makes
+    # searches slow and the planner avoid the index until the next vacuum
+    op.create_index(
+        "ix_product_translations_search_vector",
+        "product_translations",
+        ["search_vector"],
+        postgresql_using="gin",
+        postgresql_with={"fastupdate": "off"},
+    )
+    op.create_index(op.f("ix_product_translations_product_id"), "product_translations", ["product_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_product_translations_product_id"), table_name="product_translations")
+    op.drop_index("ix_product_translations_search_vector", table_name="product_translations")
+    op.drop_column("product_translations", "search_vector")
@@ -0,0 +1,37 @@
+"""Add the time of the last catalog change of shops.
+
+`shops.catalog_modified_at` is set along with `shops.catalog_version`, for the `Last-Modified` header of the catalog
+endpoints, see `server.api.conditional`.
+
+Revision ID: c41d8e2f7a95
+Revises: 5e2a9c71d4b3
+Create Date: 2026-10-18 20:04:51.118364
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+from server.db.models import UtcTimestamp
+
+# revision identifiers, used by Alembic.
+revision = "c41d8e2f7a95"
+down_revision = "5e2a9c71d4b3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "shops",
+        sa.Column(
+            "catalog_modified_at",
+            UtcTimestamp(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("shops", "catalog_modified_at")
@@ -16,8 +16,10 @@
 from fastapi import APIRouter, Depends
 
 from server.api import deps
+from server.api.conditional import catalog_version, conditional, faq_version
 from server.api.endpoints import (
     admin_accounts,
+    admin_database,
     downloads,
     early_access,
     faq,
@@ -76,6 +78,11 @@ api_router.include_router(
     prefix="/admin/accounts",
     tags=["admin", "accounts"],
 )
+api_router.include_router(
+    admin_database.router,
+    prefix="/admin/database",
+    tags=["admin", "database"],
+)
 
 api_router.include_router(
     downloads.router,
@@ -85,7 +92,12 @@ api_router.include_router(
 
 # SHOP specific endpoints
 api_router.include_router(shops.router, prefix="/shops", tags=["shops"])
-api_router.include_router(prices.router, prefix="/shops/{shop_id}/prices", tags=["shops"])
+api_router.include_router(
+    prices.router,
+    prefix="/shops/{shop_id}/prices",
+    tags=["shops"],
+    dependencies=[Depends(conditional(catalog_version))],
+)
 api_router.include_router(
     orders.router,
     prefix="/orders",
@@ -101,6 +113,7 @@ api_router.include_router(
     categories.public_router,
     prefix="/shops/{shop_id}/categories",
     tags=["categories"],
+    dependencies=[Depends(conditional(catalog_version))],
 )
 api_router.include_router(
     category_images.router,
@@ -131,6 +144,7 @@ api_router.include_router(
     products.public_router,
     prefix="/shops/{shop_id}/products",
     tags=["shops", "products"],
+    dependencies=[Depends(conditional(catalog_version))],
 )
 api_router.include_router(
     products_to_tags.router,
@@ -198,7 +212,12 @@ api_router.include_router(
     tags=["test-forms"],
 )
 
-api_router.include_router(faq.router, prefix="/faq", tags=["faq"])
+api_router.include_router(
+    faq.router,
+    prefix="/faq",
+    tags=["faq"],
+    dependencies=[Depends(conditional(faq_version))],
+)
 
 if mail_settings.MAIL_TEST_ENDPOINT_ENABLED:
     api_router.include_router(mail_test.router, prefix="/mail-test", tags=["mail-test"])
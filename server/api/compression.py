@@ -0,0 +1,215 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Response compression: zstd, brotli or gzip, negotiated with the `Accept-Encoding` of the request.
+
+`CompressionMiddleware` compresses JSON and text responses of at least `minimum_size` bytes with a fast level;
+streamed responses are compressed chunk by chunk and flushed after every chunk, so they keep streaming. Responses that
+already have a `Content-Encoding` pass untouched: the catalog snapshots are stored compressed (see `server.crud.catalog`),
+and `GET /shops/{shop_id}/prices` serves the stored variant the client accepts.
+"""
+
+import zlib
+from typing import Dict, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from server.utils.imports import lazy_import
+
+brotli = lazy_import("brotli")
+zstandard = lazy_import("zstandard")
+
+# In order of preference: for JSON zstd and brotli are about half the size of gzip, and zstd compresses fastest
+ENCODINGS = ("zstd", "br", "gzip")
+
+# Levels per encoding for compression per response, and for responses compressed once and stored. A stored response
+# is still compressed by the first request for it: brotli above 5 takes many times as long for a few percent
+LEVELS = {"zstd": 3, "br": 5, "gzip": 6}
+STORED_LEVELS = {"zstd": 9, "br": 5, "gzip": 9}
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def negotiate(accept_encoding: Optional[str], encodings: Sequence[str] = ENCODINGS) -> Optional[str]:
+    """Return the encoding of `encodings` the client accepts with the highest weight, or None for the identity.
+
+    On equal weights the order of `encodings` decides. `*` covers the encodings that are not named. Encodings not in
+    `ENCODINGS` are ignored.
+    """
+    weights: Dict[str, float] = {}
+    for part in (accept_encoding or "").split(","):
+        name, *parameters = (value.strip() for value in part.split(";"))
+        weight = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if name:
+            weights[name.lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in encodings:
+        if encoding not in ENCODINGS:
+            continue
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Return `body` compressed with `encoding` at `level`, by default that of `LEVELS`."""
+    level = LEVELS[encoding] if level is None else level
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    if encoding == "gzip":
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(body) + compressor.flush()
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+class StreamCompressor:
+    """Compress a body chunk by chunk with `encoding`, flushing after every chunk."""
+
+    def __init__(self, encoding: str, level: Optional[int] = None) -> None:
+        level = LEVELS[encoding] if level is None else level
+        self.encoding = encoding
+        if encoding == "zstd":
+            self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        elif encoding == "br":
+            self.compressor = brotli.Compressor(quality=level)
+        elif encoding == "gzip":
+            self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == "zstd":
+            return self.compressor.compress(chunk) + self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        if self.encoding == "br":
+            return self.compressor.process(chunk) + self.compressor.flush()
+        return self.compressor.compress(chunk) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+
+def add_vary(headers: MutableHeaders) -> None:
+    """Add `Accept-Encoding` to the `Vary` header, so caches keep a response per encoding."""
+    vary = [value.strip() for value in headers.get("vary", "").split(",") if value.strip()]
+    if "accept-encoding" not in (value.lower() for value in vary):
+        headers["vary"] = ", ".join([*vary, "Accept-Encoding"])
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing responses with the encoding negotiated from `Accept-Encoding`.
+
+    Only responses of a compressible content type and of at least `minimum_size` bytes are compressed; a streamed
+    response is compressed whatever its size. A strong `ETag` of a compressed response is made weak, since the bytes
+    differ per encoding.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000, encodings: Sequence[str] = ENCODINGS) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = tuple(encodings)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        await self.app(scope, receive, CompressingSend(send, encoding, self.minimum_size))
+
+
+class CompressingSend:
+    """The `send` of one response, compressing its body with `encoding` (None: only add `Vary`)."""
+
+    def __init__(self, send: Send, encoding: Optional[str], minimum_size: int) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk tells whether to compress
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        if self.start is not None:
+            await self._start(message)
+            return
+        await self._send_chunk(message)
+
+    async def _start(self, message: Message) -> None:
+        start, self.start = self.start, None
+        start["headers"] = list(start.get("headers", []))
+        headers = MutableHeaders(raw=start["headers"])
+        body, more_body = message.get("body", b""), message.get("more_body", False)
+        compressible = headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+        if compressible and start["status"] not in (204, 304):
+            add_vary(headers)
+
+        if (
+            self.encoding is None
+            or not compressible
+            or "content-encoding" in headers
+            or start["status"] in (204, 304)
+            or (not more_body and len(body) < self.minimum_size)
+        ):
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers["content-encoding"] = self.encoding
+        if (etag := headers.get("etag")) and not etag.startswith("W/"):
+            headers["etag"] = f"W/{etag}"
+        if more_body:
+            del headers["content-length"]
+            self.compressor = StreamCompressor(self.encoding)
+            await self.send(start)
+            await self._send_chunk(message)
+            return
+        body = compress(body, self.encoding)
+        headers["content-length"] = str(len(body))
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": body})
+
+    async def _send_chunk(self, message: Message) -> None:
+        assert self.compressor is not None
+        body = self.compressor.compress(message.get("body", b""))
+        more_body = message.get("more_body", False)
+        if not more_body:
+            body += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -0,0 +1,120 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Conditional GETs of the public read endpoints: weak ETags from content versions, 304 Not Modified, caching headers.
+
+A route, or a whole router, depends on `conditional(version)`. `version` maps the path parameters of a request to a
+Core select of one row: the version of everything the route shows and the time it last changed. The dependency reads
+just that row, no ORM objects. When the `If-None-Match` header names the current ETag it answers 304 before the
+endpoint runs; otherwise the response of the endpoint gets the `ETag`, `Cache-Control` and `Last-Modified` headers.
+The version is read before the endpoint reads the content, so a write in between gives a response newer than its
+ETag, which costs the client one more download at most.
+
+`Cache-Control` and `Last-Modified` are set per route in code and can be overridden per route path with the
+`HTTP_CACHE_CONTROL` and `HTTP_LAST_MODIFIED` settings. Only `If-None-Match` is evaluated: `Last-Modified` has a
+resolution of a second, too coarse to validate against.
+"""
+
+from datetime import timezone
+from email.utils import format_datetime
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Mapping, Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.sql import Select
+from starlette.requests import Request
+from starlette.responses import Response
+
+from server.db import db
+from server.db.models import FaqTable, ShopTable
+from server.settings import app_settings
+
+ContentVersion = Callable[[Mapping[str, Any]], Optional[Select]]
+
+shops = ShopTable.__table__
+faq = FaqTable.__table__
+
+
+def _uuid(value: Any) -> Optional[UUID]:
+    # Dependencies run before FastAPI rejects an invalid path parameter
+    try:
+        return UUID(str(value))
+    except ValueError:
+        return None
+
+
+def catalog_version(path_params: Mapping[str, Any]) -> Optional[Select]:
+    """The catalog of the shop: raised by every write to it, see `server.crud.catalog`."""
+    if (shop_id := _uuid(path_params.get("shop_id"))) is None:
+        return None
+    return select(shops.c.catalog_version, shops.c.catalog_modified_at).where(shops.c.id == shop_id)
+
+
+def shop_version(path_params: Mapping[str, Any]) -> Optional[Select]:
+    """The shop itself, e.g. its config: `modified_at` is set by every update through `CRUDBase.update`.
+
+    Shops that were never updated have no `modified_at`, they fall back on `created_at`.
+    """
+    if (shop_id := _uuid(path_params.get("id"))) is None:
+        return None
+    modified_at = func.coalesce(shops.c.modified_at, shops.c.created_at)
+    return select(func.extract("epoch", modified_at), modified_at).where(shops.c.id == shop_id)
+
+
+def faq_version(path_params: Mapping[str, Any]) -> Select:
+    """All FAQ entries: their number, for deletes, and their last modification."""
+    modified_at = func.max(faq.c.modified_at)
+    return select(func.concat(func.count(), "-", func.extract("epoch", modified_at)), modified_at)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return whether `etag` is one of the tags of an `If-None-Match` header, comparing weakly."""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def conditional(
+    version: ContentVersion, cache_control: str = "public, no-cache", last_modified: bool = True
+) -> Callable[[Request, Response], Awaitable[None]]:
+    """Return the dependency answering GET and HEAD requests of a route with an ETag from `version`, see above.
+
+    The default `no-cache` lets clients keep a response but revalidate it on every use, which costs a 304. The version
+    is read through `db.run_sync`, on the async engine when there is one, like the endpoints it guards.
+    """
+
+    async def dependency(request: Request, response: Response) -> None:
+        if request.method not in ("GET", "HEAD"):
+            return
+        statement = version(request.path_params)
+        if statement is None:
+            return
+        row = await db.run_sync(lambda: db.session.execute(statement).first())
+        if row is None or row[0] is None:
+            # Left to the endpoint, e.g. a 404, or no version to tag the response with
+            return
+
+        route = request.scope["route"].path
+        headers = {
+            "ETag": f'W/"{row[0]}"',
+            "Cache-Control": app_settings.HTTP_CACHE_CONTROL.get(route, cache_control),
+        }
+        if app_settings.HTTP_LAST_MODIFIED.get(route, last_modified) and row[1] is not None:
+            headers["Last-Modified"] = format_datetime(row[1].astimezone(timezone.utc), usegmt=True)
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            raise HTTPException(HTTPStatus.NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+
+    return dependency
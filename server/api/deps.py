@@ -10,14 +10,17 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
 
 from fastapi import Depends, HTTPException, status
 from fastapi.param_functions import Query
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
+from starlette.responses import Response
 
+from server.crud.base import CRUDBase
+from server.crud.count import CountMode
 from server.crud.crud_role import role_crud
 from server.crud.crud_user import user_crud
 from server.db.models import UserTable
@@ -31,16 +34,69 @@ async def common_parameters(
     limit: int = 100,
     filter: List[str] = Query(
         None,
-        description="This filter can accept search query's like `key:value` and will split on the `:`. If it "
-        "detects more than one `:`, or does not find a `:` it will search for the string in all columns.",
+        description="This filter can accept search query's like `key:value` and will split on the first `:`. A text "
+        "column matches when it contains the value, any other column when it equals it. Suffix the key with `_gt`, "
+        "`_gte`, `_lt`, `_lte`, `_ne`, `_in` (comma separated values), `_prefix` or `_null` (`true`/`false`) to "
+        "compare differently, e.g. `total_gte:10`. If it does not find a `:` it will search for the string in all "
+        "text columns and the id.",
     ),
     sort: List[str] = Query(
         None,
         description="The sort will accept parameters like `col:ASC` or `col:DESC` and will split on the `:`. "
         "If it does not find a `:` it will sort ascending on that column.",
     ),
-) -> Dict[str, Union[List[str], int]]:
-    return {"skip": skip, "limit": limit, "filter": filter, "sort": sort}
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset pagination, which stays fast on deep pages: pass an empty `cursor` for the first page and "
+        "the `X-Next-Cursor` response header of a page for the next one. Pages follow `sort` with the id as a "
+        "tiebreaker; `skip` is ignored.",
+    ),
+    count: CountMode = Query(
+        CountMode.exact,
+        description="The total in `Content-Range`: `exact` (may be a few seconds old), `estimate` from the table "
+        "statistics or the query planner, which is much cheaper on big tables, or `none` to skip it (`*`).",
+    ),
+    fields: List[str] = Query(
+        None,
+        description="Return only these fields of each row (and its id), comma separated or repeated, e.g. "
+        "`fields=id,price`. Only the columns behind them are read. Supported by the product, category, tag and "
+        "attribute listings.",
+    ),
+    include: List[str] = Query(
+        None,
+        description="Return these relationships of each row, e.g. `include=translation`. With `fields` only the "
+        "included relationships are returned, without it all fields are; the others are not loaded.",
+    ),
+) -> Dict[str, Union[List[str], int, str, None]]:
+    return {
+        "skip": skip,
+        "limit": limit,
+        "filter": filter,
+        "sort": sort,
+        "cursor": cursor,
+        "count": count,
+        "fields": split_values(fields),
+        "include": split_values(include),
+    }
+
+
+def split_values(values: Optional[List[str]]) -> Optional[List[str]]:
+    """Return the comma separated `values` of a repeatable query parameter as one list."""
+    if values is None:
+        return None
+    return [value.strip() for item in values for value in item.split(",") if value.strip()]
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def set_next_cursor(response: Response, crud: CRUDBase, items: List[Any], common: Dict[str, Any]) -> None:
+    """Set the `X-Next-Cursor` header when a keyset paginated listing has a next page."""
+    if common["cursor"] is None:
+        return
+    next_cursor = crud.next_cursor(items, limit=common["limit"], sort_parameters=common["sort"])
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
 
 def get_current_user(token: str = Depends(reusable_oauth)) -> UserTable:
@@ -29,15 +29,15 @@ from http import HTTPStatus
 from typing import List, Optional
 from uuid import UUID
 
-import stripe
 import structlog
-from fastapi import APIRouter, Body, Depends, Query
+from fastapi import APIRouter, Body, Depends, Query, Request
 from sqlalchemy import or_
 from sqlalchemy.orm import joinedload
 from starlette.responses import Response
 
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.api.error_handling import raise_status
+from server.api.streaming import streaming_response
 from server.crud.crud_account import account_crud
 from server.db import db
 from server.db.models import Account
@@ -50,6 +50,9 @@ from server.schemas.admin_account import (
 from server.security import admin_required
 from server.services import stripe_client
 from server.services.stripe_client import StripeCustomerMissing, StripeNotConfigured
+from server.utils.imports import lazy_import
+
+stripe = lazy_import("stripe")
 
 logger = structlog.get_logger(__name__)
 
@@ -77,6 +80,7 @@ def _require_linked_shop(account: Account) -> None:
     responses={HTTPStatus.FORBIDDEN.value: {"description": "Not a member of the Admins group"}},
 )
 def list_accounts(
+    request: Request,
     response: Response,
     shop_id: Optional[UUID] = Query(None, description="Restrict to a single shop"),
     missing_stripe: Optional[bool] = Query(
@@ -110,8 +114,16 @@ def list_accounts(
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
         query_parameter=query,
+        stream=not common["limit"],
+        cursor=common["cursor"],
+        count=common["count"],
     )
+    if not common["limit"]:
+        return streaming_response(
+            request, map(build_admin_account, accounts), AdminAccountSchema, headers={"Content-Range": header_range}
+        )
     response.headers["Content-Range"] = header_range
+    set_next_cursor(response, account_crud, accounts, common)
     return [build_admin_account(a) for a in accounts]
 
 
@@ -0,0 +1,60 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Admin endpoints for looking into the database connections and slow queries of this process.
+
+Mounted at ``/admin/database``. Every gunicorn worker has its own pools and
+slow query log, so a response describes the worker that served it.
+"""
+
+from http import HTTPStatus
+from typing import List
+
+from fastapi import APIRouter, Depends
+
+from server.db import db
+from server.db.instrumentation import slow_query_log
+from server.schemas.admin_database import PoolMetrics, SlowQuery
+from server.security import admin_required
+
+router = APIRouter()
+
+
+@router.get(
+    "/pool",
+    response_model=List[PoolMetrics],
+    responses={HTTPStatus.FORBIDDEN.value: {"description": "Not a member of the Admins group"}},
+)
+def get_pool_metrics(_: object = Depends(admin_required)) -> List[PoolMetrics]:
+    """Checked out connections, overflow, checkout wait (avg/p99/max over the last 1000 checkouts) and churn."""
+    return [PoolMetrics(**metrics) for metrics in db.pool_metrics()]
+
+
+@router.get(
+    "/slow-queries",
+    response_model=List[SlowQuery],
+    responses={HTTPStatus.FORBIDDEN.value: {"description": "Not a member of the Admins group"}},
+)
+def get_slow_queries(_: object = Depends(admin_required)) -> List[SlowQuery]:
+    """Statements slower than `SLOW_QUERY_THRESHOLD_MS`, slowest first, with route, redacted parameters and plan."""
+    entries = sorted(slow_query_log.entries, key=lambda entry: entry["duration_ms"], reverse=True)
+    return [SlowQuery(**entry) for entry in entries]
+
+
+@router.delete(
+    "/slow-queries",
+    response_model=None,
+    status_code=HTTPStatus.NO_CONTENT,
+    responses={HTTPStatus.FORBIDDEN.value: {"description": "Not a member of the Admins group"}},
+)
+def clear_slow_queries(_: object = Depends(admin_required)) -> None:
+    slow_query_log.clear()
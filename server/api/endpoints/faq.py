@@ -7,7 +7,7 @@ from fastapi import APIRouter, HTTPException
 from fastapi.param_functions import Body, Depends
 from starlette.responses import Response
 
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.crud.crud_faq import faq_crud
 from server.db.models import UserTable
 from server.schemas.faq import FaqCreate, FaqCreated, FaqSchema, FaqUpdate, FaqUpdated
@@ -27,8 +27,11 @@ def get_multi(
         limit=common["limit"],
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
+        cursor=common["cursor"],
+        count=common["count"],
     )
     response.headers["Content-Range"] = header_range
+    set_next_cursor(response, faq_crud, faqs, common)
     return faqs
 
 
@@ -8,7 +8,7 @@ from fastapi.param_functions import Body, Depends
 from starlette.responses import Response
 
 from server.api import deps
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.api.error_handling import raise_status
 from server.crud.crud_license import license_crud
 from server.db.models import UserTable
@@ -24,9 +24,15 @@ def get_multi(
     current_user: UserTable = Depends(deps.get_current_active_superuser),
 ) -> List[LicenseSchema]:
     licenses, header_range = license_crud.get_multi(
-        skip=common["skip"], limit=common["limit"], filter_parameters=common["filter"], sort_parameters=common["sort"]
+        skip=common["skip"],
+        limit=common["limit"],
+        filter_parameters=common["filter"],
+        sort_parameters=common["sort"],
+        cursor=common["cursor"],
+        count=common["count"],
     )
     response.headers["Content-Range"] = header_range
+    set_next_cursor(response, license_crud, licenses, common)
     return licenses
 
 
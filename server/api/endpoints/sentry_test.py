@@ -5,7 +5,10 @@ from http import HTTPStatus
 import httpx
 import structlog
 from fastapi import APIRouter
-from sentry_sdk import capture_exception
+
+from server.utils.imports import lazy_import
+
+sentry_sdk = lazy_import("sentry_sdk")
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
@@ -80,4 +83,4 @@ def trigger_handled_error():
         open("some_missing_file.txt", "r")
     except Exception as e:
         logger.warning("Handled FileNotFoundError triggered", exc_info=e)
-        capture_exception(e)
+        sentry_sdk.capture_exception(e)
@@ -3,12 +3,13 @@ from typing import Any, List
 from uuid import UUID
 
 import structlog
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.param_functions import Body, Depends
 from starlette.responses import Response
 
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.api.error_handling import raise_status
+from server.api.streaming import streaming_response
 from server.crud.crud_account import account_crud
 from server.schemas.account import AccountCreate, AccountSchema, AccountUpdate
 
@@ -18,11 +19,21 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[AccountSchema])
-def get_multi(response: Response, common: dict = Depends(common_parameters)) -> List[AccountSchema]:
+def get_multi(request: Request, response: Response, common: dict = Depends(common_parameters)) -> List[AccountSchema]:
+    stream = not common["limit"]
     accounts, header_range = account_crud.get_multi(
-        skip=common["skip"], limit=common["limit"], filter_parameters=common["filter"], sort_parameters=common["sort"]
+        skip=common["skip"],
+        limit=common["limit"],
+        filter_parameters=common["filter"],
+        sort_parameters=common["sort"],
+        stream=stream,
+        cursor=common["cursor"],
+        count=common["count"],
     )
+    if stream:
+        return streaming_response(request, accounts, AccountSchema, headers={"Content-Range": header_range})
     response.headers["Content-Range"] = header_range
+    set_next_cursor(response, account_crud, accounts, common)
     return accounts
 
 
@@ -8,7 +8,7 @@ from fastapi.param_functions import Body, Depends
 from sqlalchemy.exc import IntegrityError
 from starlette.responses import Response
 
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.api.error_handling import raise_status
 from server.crud.crud_attribute import attribute_crud
 from server.crud.crud_attribute_option import attribute_option_crud
@@ -50,8 +50,11 @@ def list_options(
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
         query_parameter=query,
+        cursor=common["cursor"],
+        count=common["count"],
     )
     response.headers["Content-Range"] = content_range
+    set_next_cursor(response, attribute_option_crud, results, common)
     return results
 
 
@@ -155,8 +158,11 @@ def list_options_for_shop(
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
         query_parameter=query,
+        cursor=common["cursor"],
+        count=common["count"],
     )
     response.headers["Content-Range"] = content_range
+    set_next_cursor(response, attribute_option_crud, results, common)
     return results
 
 
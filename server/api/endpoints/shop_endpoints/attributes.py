@@ -8,20 +8,24 @@ from fastapi.param_functions import Body, Depends
 from sqlalchemy.exc import IntegrityError
 from starlette.responses import Response
 
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.api.error_handling import raise_status
+from server.api.streaming import json_response
 from server.crud.base import NotFound
 from server.crud.crud_attribute import attribute_crud
+from server.crud.fieldsets import sparse_fieldset
 from server.db import db
-from server.db.models import AttributeOptionTable
+from server.db.models import AttributeOptionTable, AttributeTable
 from server.schemas.attribute import (
     AttributeBase,
+    AttributeBulkUpdate,
     AttributeCreate,
     AttributeSchema,
     AttributeTranslationBase,
     AttributeUpdate,
     AttributeWithOptionsSchema,
 )
+from server.settings import app_settings
 
 logger = structlog.get_logger(__name__)
 
@@ -63,8 +67,11 @@ def get_with_options(
         limit=common["limit"],
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
+        cursor=common["cursor"],
+        count=common["count"],
     )
     response.headers["Content-Range"] = header_range
+    set_next_cursor(response, attribute_crud, items, common)
 
     if not items:
         return []
@@ -92,14 +99,21 @@ def get_with_options(
 )
 def get_multi(shop_id: UUID, response: Response, common: dict = Depends(common_parameters)) -> List[AttributeSchema]:
     """List attributes for a shop."""
+    fieldset = sparse_fieldset(AttributeTable, AttributeSchema, common["fields"], common["include"])
     items, header_range = attribute_crud.get_multi_by_shop_id(
         shop_id=shop_id,
         skip=common["skip"],
         limit=common["limit"],
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
+        cursor=common["cursor"],
+        count=common["count"],
+        fieldset=fieldset,
     )
     response.headers["Content-Range"] = header_range
+    set_next_cursor(response, attribute_crud, items, common)
+    if fieldset:
+        return json_response(items, fieldset.schema, response)
     return items
 
 
@@ -149,6 +163,66 @@ def get_by_name(name: str, shop_id: UUID) -> AttributeSchema:
     return attribute
 
 
+@router.post(
+    "/bulk",
+    response_model=List[UUID],
+    status_code=HTTPStatus.CREATED,
+    summary="Create attributes",
+    description="Create attributes for a shop in one transaction, with their translations, and return their ids.",
+)
+def create_many(
+    shop_id: UUID, data: List[AttributeCreate] = Body(..., max_length=app_settings.BULK_MAX_ITEMS)
+) -> List[UUID]:
+    """Create attributes for the given shop; like `create`, a missing translation gets the name as main_name."""
+    logger.info("Saving attributes", amount=len(data))
+
+    for item in data:
+        if item.translation is None or item.translation.main_name is None:
+            item.translation = AttributeTranslationBase(main_name=item.name)
+
+    try:
+        return attribute_crud.create_many(shop_id=shop_id, objs_in=data)
+    except IntegrityError:
+        raise_status(HTTPStatus.CONFLICT, "Attributes with these names already exist for this shop")
+
+
+@router.put(
+    "/bulk",
+    response_model=None,
+    status_code=HTTPStatus.NO_CONTENT,
+    summary="Update attributes",
+    description="Update attributes of a shop in one transaction: all of them, or none when one of the ids is unknown.",
+)
+def update_many(
+    shop_id: UUID, data: List[AttributeBulkUpdate] = Body(..., max_length=app_settings.BULK_MAX_ITEMS)
+) -> None:
+    """Update attributes for a shop."""
+    try:
+        attribute_crud.update_many(shop_id=shop_id, objs_in=data)
+    except NotFound:
+        raise_status(HTTPStatus.NOT_FOUND, "Attributes not found")
+    except IntegrityError:
+        raise_status(HTTPStatus.CONFLICT, "Attributes with these names already exist for this shop")
+
+
+@router.delete(
+    "/bulk",
+    response_model=None,
+    status_code=HTTPStatus.NO_CONTENT,
+    summary="Delete attributes",
+    description="Remove attributes, with their options, from a shop in one transaction. This will fail if one of them "
+    "is currently in use by any products.",
+)
+def delete_many(shop_id: UUID, ids: List[UUID] = Body(..., max_length=app_settings.BULK_MAX_ITEMS)) -> None:
+    """Delete attributes for a shop."""
+    try:
+        attribute_crud.delete_many(shop_id=shop_id, ids=ids)
+    except NotFound:
+        raise_status(HTTPStatus.NOT_FOUND, "Attributes not found")
+    except IntegrityError:
+        raise_status(HTTPStatus.CONFLICT, detail={"message": "Attributes are in use and cannot be deleted"})
+
+
 @router.post(
     "/",
     response_model=AttributeSchema,
@@ -8,15 +8,22 @@ import structlog
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.param_functions import Body, Depends
 from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from starlette.responses import Response
 
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.api.error_handling import raise_status
 from server.api.helpers import invalidateShopCache
+from server.api.responses import prevalidated_response
+from server.api.streaming import json_response
 from server.crud import crud_shop
+from server.crud.base import NotFound
 from server.crud.crud_category import category_crud
 from server.crud.crud_product import product_crud
 from server.crud.crud_shop import shop_crud
+from server.crud.fieldsets import sparse_fieldset
+from server.crud.loaders import LoaderProfile
+from server.crud.ordering import next_order_number
 from server.db import db
 from server.db.models import (
     AttributeOptionTable,
@@ -32,6 +39,7 @@ from server.schemas.attribute import (
     AvailableOptionSchema,
 )
 from server.schemas.category import (
+    CategoryBulkUpdate,
     CategoryCreate,
     CategoryIsDeletable,
     CategoryOrder,
@@ -45,6 +53,7 @@ from server.schemas.product import (
     ProductWithDefaultPrice,
 )
 from server.schemas.product_attribute import ProductAttributeItem
+from server.settings import app_settings
 
 logger = structlog.get_logger(__name__)
 
@@ -62,20 +71,28 @@ def get_shop(shop_id: UUID):
 @router.get("/", response_model=List[CategorySchema])
 def get_multi(shop_id: UUID, response: Response, common: dict = Depends(common_parameters)) -> List[CategorySchema]:
     # shop = get_shop(shop_id)
+    fieldset = sparse_fieldset(CategoryTable, CategorySchema, common["fields"], common["include"])
     categories, header_range = category_crud.get_multi_by_shop_id(
         shop_id=shop_id,
         skip=common["skip"],
         limit=common["limit"],
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
+        cursor=common["cursor"],
+        count=common["count"],
+        profile=LoaderProfile.admin_list,
+        fieldset=fieldset,
     )
     response.headers["Content-Range"] = header_range
+    set_next_cursor(response, category_crud, categories, common)
+    if fieldset:
+        return json_response(categories, fieldset.schema, response)
     return categories
 
 
 @router.get("/{category_id}", response_model=CategorySchema)
 def get_by_id(shop_id: UUID, category_id: UUID) -> CategorySchema:
-    category = category_crud.get_id_by_shop_id(shop_id, category_id)
+    category = category_crud.get_id_by_shop_id(shop_id, category_id, profile=LoaderProfile.detail)
     if not category:
         raise_status(HTTPStatus.NOT_FOUND, f"Category with id {category_id} not found")
     return category
@@ -99,10 +116,57 @@ def get_by_name(name: str, shop_id: UUID) -> CategorySchema:
     return category
 
 
+@router.post("/bulk", response_model=List[UUID], status_code=HTTPStatus.CREATED)
+def create_many(
+    shop_id: UUID, data: List[CategoryCreate] = Body(..., max_length=app_settings.BULK_MAX_ITEMS)
+) -> List[UUID]:
+    """Create categories in one transaction, appended to the shop's categories in the given order, and return their ids."""
+    last = category_crud.last_order_number(shop_id=shop_id)
+    for item in data:
+        item.order_number = last = next_order_number(last)
+
+    logger.info("Saving categories", amount=len(data))
+    return category_crud.create_many(shop_id=shop_id, objs_in=data)
+
+
+@router.put("/bulk", response_model=None, status_code=HTTPStatus.NO_CONTENT)
+def update_many(
+    shop_id: UUID, data: List[CategoryBulkUpdate] = Body(..., max_length=app_settings.BULK_MAX_ITEMS)
+) -> None:
+    """Update categories in one transaction: all of them, or none when one of the ids is no category of the shop."""
+    logger.info("Updating categories", amount=len(data))
+    try:
+        category_crud.update_many(shop_id=shop_id, objs_in=data)
+    except NotFound:
+        raise_status(HTTPStatus.NOT_FOUND, "Categories not found")
+
+
+@router.delete("/bulk", response_model=None, status_code=HTTPStatus.NO_CONTENT)
+def delete_many(shop_id: UUID, ids: List[UUID] = Body(..., max_length=app_settings.BULK_MAX_ITEMS)) -> None:
+    """Delete categories in one transaction. Fails when one of them still has products."""
+    try:
+        category_crud.delete_many(shop_id=shop_id, ids=ids)
+    except NotFound:
+        raise_status(HTTPStatus.NOT_FOUND, "Categories not found")
+    except IntegrityError:
+        raise_status(HTTPStatus.CONFLICT, "Categories are in use and cannot be deleted")
+
+
+@router.put("/reorder", response_model=None, status_code=HTTPStatus.NO_CONTENT)
+def reorder(shop_id: UUID, ids: List[UUID] = Body(..., max_length=app_settings.BULK_MAX_ITEMS)) -> None:
+    """Put the categories of the shop in the order of `ids`, which lists all of them, in one statement."""
+    try:
+        changed = category_crud.reorder(shop_id=shop_id, ids=ids)
+    except NotFound:
+        raise_status(HTTPStatus.NOT_FOUND, "Categories not found")
+    except ValueError as error:
+        raise_status(HTTPStatus.BAD_REQUEST, str(error))
+    logger.info("Reordered categories", amount=len(ids), changed=changed)
+
+
 @router.post("/", response_model=None, status_code=HTTPStatus.CREATED)
 def create(shop_id: UUID, data: CategoryCreate = Body(...)) -> None:
-    category = CategoryTable.query.filter_by(shop_id=shop_id).order_by(CategoryTable.order_number.desc()).first()
-    data.order_number = (category.order_number + 1) if category is not None else 0
+    data.order_number = next_order_number(category_crud.last_order_number(shop_id=shop_id))
 
     logger.info("Saving category", data=data)
     return category_crud.create_by_shop_id(obj_in=data, shop_id=shop_id)
@@ -132,27 +196,27 @@ def swap(shop_id: UUID, category_id: UUID, move_up: bool):
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
 
-    last_category = CategoryTable.query.filter_by(shop_id=shop_id).order_by(CategoryTable.order_number.desc()).first()
-
-    first_category = CategoryTable.query.filter_by(shop_id=shop_id).order_by(CategoryTable.order_number.asc()).first()
-
-    old_order_number = category.order_number
-    new_order_number = None
-
+    # The neighbour: with sparse order numbers it is not the one numbered one more or less
+    siblings = CategoryTable.query.filter_by(shop_id=shop_id)
     if move_up:
-        if old_order_number == first_category.order_number:
+        category_to_swap = (
+            siblings.filter(CategoryTable.order_number < category.order_number)
+            .order_by(CategoryTable.order_number.desc())
+            .first()
+        )
+        if category_to_swap is None:
             raise HTTPException(status_code=400, detail="Cannot move up further - Minimum order number achieved.")
-        new_order_number = old_order_number - 1
     else:
-        if old_order_number == last_category.order_number:
+        category_to_swap = (
+            siblings.filter(CategoryTable.order_number > category.order_number)
+            .order_by(CategoryTable.order_number.asc())
+            .first()
+        )
+        if category_to_swap is None:
             raise HTTPException(status_code=400, detail="Cannot move down further - Maximum order number achieved.")
-        new_order_number = old_order_number + 1
-
-    category_to_swap = CategoryTable.query.filter_by(shop_id=shop_id).filter_by(order_number=new_order_number).first()
-
-    if category_to_swap is not None:
-        category_crud.update(db_obj=category_to_swap, obj_in=CategoryOrder(order_number=old_order_number), commit=False)
 
+    old_order_number, new_order_number = category.order_number, category_to_swap.order_number
+    category_crud.update(db_obj=category_to_swap, obj_in=CategoryOrder(order_number=old_order_number), commit=False)
     category_crud.update(db_obj=category, obj_in=CategoryOrder(order_number=new_order_number))
 
     return HTTPStatus.CREATED
@@ -169,7 +233,11 @@ def delete(category_id: UUID, shop_id: UUID) -> None:
     summary="Get available filter attributes for a category",
     description="Returns attributes actually used by products in this category, with option counts.",
 )
-def get_available_attributes(shop_id: UUID, category_id: UUID) -> list[AvailableAttributeSchema]:
+async def get_available_attributes(shop_id: UUID, category_id: UUID) -> list[AvailableAttributeSchema]:
+    return await db.run_sync(_get_available_attributes, shop_id, category_id)
+
+
+def _get_available_attributes(shop_id: UUID, category_id: UUID) -> list[AvailableAttributeSchema]:
     category = category_crud.get_id_by_shop_id(shop_id, category_id)
     if not category:
         raise_status(HTTPStatus.NOT_FOUND, f"Category with id {category_id} not found")
@@ -263,7 +331,7 @@ Attribute filters (mutually exclusive — only one can be used at a time):
 * `attribute_name` str: Filter by attribute name.
 """,
 )
-def get_category_products(
+async def get_category_products(
     shop_id: UUID,
     category_id: UUID,
     response: Response,
@@ -272,6 +340,30 @@ def get_category_products(
     option_value_key: List[str] = Query(None),
     attribute_name: Optional[str] = Query(None),
     common: dict = Depends(common_parameters),
+) -> Response:
+    products = await db.run_sync(
+        _get_category_products,
+        shop_id,
+        category_id,
+        response,
+        option_id,
+        attribute_id,
+        option_value_key,
+        attribute_name,
+        common,
+    )
+    return prevalidated_response(products, response)
+
+
+def _get_category_products(
+    shop_id: UUID,
+    category_id: UUID,
+    response: Response,
+    option_id: Optional[List[UUID]],
+    attribute_id: Optional[UUID],
+    option_value_key: Optional[List[str]],
+    attribute_name: Optional[str],
+    common: dict,
 ) -> List[ProductWithAttributes]:
     category = category_crud.get_id_by_shop_id(shop_id, category_id)
     if not category:
@@ -306,8 +398,12 @@ def get_category_products(
         filter_parameters=filter_parameters,
         sort_parameters=common["sort"],
         query_parameter=base_query,
+        cursor=common["cursor"],
+        count=common["count"],
+        profile=LoaderProfile.storefront_list,
     )
     response.headers["Content-Range"] = header_range
+    set_next_cursor(response, product_crud, products, common)
 
     if not products:
         return []
@@ -7,7 +7,7 @@ from fastapi import APIRouter
 from fastapi.param_functions import Depends
 from starlette.responses import Response
 
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.api.error_handling import raise_status
 from server.api.helpers import name_file, upload_file
 from server.crud.crud_category import category_crud
@@ -27,8 +27,11 @@ def get_multi(response: Response, common: dict = Depends(common_parameters)):
         limit=common["limit"],
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
+        cursor=common["cursor"],
+        count=common["count"],
     )
     response.headers["Content-Range"] = header_range
+    set_next_cursor(response, category_crud, categories, common)
     return categories
 
 
@@ -1,12 +1,11 @@
 from uuid import UUID
 
-import boto3
 import requests
 import structlog
-from botocore.exceptions import ClientError
 from fastapi import APIRouter
 
 from server.api.helpers import create_presigned_url
+from server.services.aws import aws_clients
 from server.settings import app_settings
 
 logger = structlog.get_logger(__name__)
@@ -30,12 +29,9 @@ def create_presigned_post_url(shop_id: UUID, object_name, fields=None, condition
     s3_name = f"{shop_id}/{object_name}"
 
     # Generate a presigned S3 POST URL
-    s3_client = boto3.client(
-        "s3",
-        aws_access_key_id=app_settings.S3_BUCKET_UPLOAD_ACCESS_KEY_ID,
-        aws_secret_access_key=app_settings.S3_BUCKET_UPLOAD_SECRET_ACCESS_KEY,
-        region_name="eu-central-1",
-    )
+    from botocore.exceptions import ClientError
+
+    s3_client = aws_clients.get("s3_client_upload")
 
     # Todo: do an extra check, to determine if the name already exists!
     #   The endpoint/GUI already know the last name, so they should increase the counter
@@ -4,22 +4,24 @@ from operator import or_
 from typing import Any, List, Optional
 from uuid import UUID
 
-import stripe
 import structlog
-from alembic.util import not_none
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.param_functions import Body, Depends
+from pydantic import TypeAdapter
 from starlette.responses import Response
 
 from server.api import deps
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.api.error_handling import raise_status
 from server.api.helpers import _query_with_filters, invalidateCompletedOrdersCache, invalidatePendingOrdersCache, load
+from server.api.responses import prevalidated_response
+from server.api.streaming import streaming_response
 from server.api.utils import is_ip_allowed, validate_uuid4
 from server.crud.crud_account import account_crud
 from server.crud.crud_order import order_crud
 from server.crud.crud_product import product_crud
 from server.crud.crud_shop import shop_crud
+from server.crud.loaders import LoaderProfile
 from server.db.models import Account, OrderTable, ShopTable, UserTable
 from server.mail import send_order_confirmation_emails
 from server.schemas import ProductUpdate
@@ -31,11 +33,16 @@ from server.services import stripe_client
 from server.services.stripe_client import StripeNotConfigured
 from server.settings import mail_settings
 from server.utils.discord.discord import post_discord_order_complete
+from server.utils.imports import lazy_import
+
+stripe = lazy_import("stripe")
 
 logger = structlog.get_logger(__name__)
 
 router = APIRouter()
 
+order_list = TypeAdapter(List[OrderSchema])
+
 
 def get_price_rules_total(order_items):
     """Calculate the total number of grams."""
@@ -98,55 +105,68 @@ def get_price_rules_total(order_items):
 #     return None
 
 
+def _with_names(order: OrderTable) -> OrderTable:
+    if (order.status == "complete" or order.status == "cancelled") and order.completed_by:
+        order.completed_by_name = order.user.first_name
+    if order.account_id:
+        order.account_name = order.account.name
+    if order.shop_id:
+        order.shop_name = order.shop.name
+    return order
+
+
+def _list_orders(request: Request, response: Response, common: dict, query: Any = None) -> Any:
+    """List orders with their names filled in, streamed when all orders are requested (`limit=0`)."""
+    stream = not common["limit"]
+    orders, header_range = order_crud.get_multi(
+        query_parameter=query,
+        skip=common["skip"],
+        limit=common["limit"],
+        filter_parameters=common["filter"],
+        sort_parameters=common["sort"],
+        stream=stream,
+        cursor=common["cursor"],
+        count=common["count"],
+        profile=LoaderProfile.admin_list,
+    )
+    if stream:
+        return streaming_response(
+            request, map(_with_names, orders), OrderSchema, headers={"Content-Range": header_range}
+        )
+
+    response.headers["Content-Range"] = header_range
+    set_next_cursor(response, order_crud, orders, common)
+    # Validated once here instead of by FastAPI against the `response_model`
+    orders = order_list.validate_python([_with_names(order) for order in orders], from_attributes=True)
+    return prevalidated_response(orders, response)
+
+
 @router.get("/", response_model=List[OrderSchema])
 def get_multi(
+    request: Request,
     response: Response,
     common: dict = Depends(common_parameters),
     current_user: UserTable = Depends(auth_required),
 ) -> List[OrderSchema]:
-    orders, header_range = order_crud.get_multi(
-        skip=common["skip"], limit=common["limit"], filter_parameters=common["filter"], sort_parameters=common["sort"]
-    )
-    for order in orders:
-        if (order.status == "complete" or order.status == "cancelled") and order.completed_by:
-            order.completed_by_name = order.user.first_name
-        if order.account_id:
-            order.account_name = order.account.name
-        if order.shop_id:
-            order.shop_name = order.shop.name
-    response.headers["Content-Range"] = header_range
-    return orders
+    return _list_orders(request, response, common)
 
 
 @router.get("/shop/{shop_id}/pending", response_model=List[OrderSchema])
 def show_all_pending_orders_per_shop(
     shop_id: UUID,
+    request: Request,
     response: Response,
     common: dict = Depends(common_parameters),
     current_user: UserTable = Depends(auth_required),
 ) -> List[OrderSchema]:
     query = OrderTable.query.filter(OrderTable.shop_id == shop_id).filter(OrderTable.status == "pending")
-    orders, header_range = order_crud.get_multi(
-        query_parameter=query,
-        skip=common["skip"],
-        limit=common["limit"],
-        filter_parameters=common["filter"],
-        sort_parameters=common["sort"],
-    )
-
-    for order in orders:
-        if order.account_id:
-            order.account_name = order.account.name
-        if order.shop_id:
-            order.shop_name = order.shop.name
-
-    response.headers["Content-Range"] = header_range
-    return orders
+    return _list_orders(request, response, common, query)
 
 
 @router.get("/shop/{shop_id}/complete", response_model=List[OrderSchema])
 def show_all_complete_orders_per_shop(
     shop_id: UUID,
+    request: Request,
     response: Response,
     common: dict = Depends(common_parameters),
     current_user: UserTable = Depends(auth_required),
@@ -154,29 +174,12 @@ def show_all_complete_orders_per_shop(
     query = OrderTable.query.filter(OrderTable.shop_id == shop_id).filter(
         or_(OrderTable.status == "complete", OrderTable.status == "cancelled")
     )
-    orders, header_range = order_crud.get_multi(
-        query_parameter=query,
-        skip=common["skip"],
-        limit=common["limit"],
-        filter_parameters=common["filter"],
-        sort_parameters=common["sort"],
-    )
-
-    for order in orders:
-        if (order.status == "complete" or order.status == "cancelled") and order.completed_by:
-            order.completed_by_name = order.user.first_name
-        if order.account_id:
-            order.account_name = order.account.name
-        if order.shop_id:
-            order.shop_name = order.shop.name
-
-    response.headers["Content-Range"] = header_range
-    return orders
+    return _list_orders(request, response, common, query)
 
 
 @router.get("/{id}")
 def get_by_id(id: UUID) -> OrderSchema:
-    order = order_crud.get(id)
+    order = order_crud.get(id, profile=LoaderProfile.detail)
     if not order:
         raise_status(HTTPStatus.NOT_FOUND, f"Order with id {id} not found")
 
@@ -1,15 +1,24 @@
 import json
 from datetime import datetime
 from enum import Enum
+from http import HTTPStatus
 from typing import List, Optional
 from uuid import UUID
 
 import structlog
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Select, select
 
+from server.api.compression import negotiate
+from server.api.error_handling import raise_status
+from server.api.responses import prevalidated_response
+from server.api.streaming import response_headers
+from server.crud.catalog import catalog_snapshot, store_catalog_snapshot
 from server.crud.crud_product import product_crud
 from server.crud.crud_shop import shop_crud
+from server.crud.loaders import LoaderProfile
 from server.db import ProductTable, db
 from server.db.models import (
     AttributeOptionTable,
@@ -21,6 +30,7 @@ from server.db.models import (
     ProductTranslationTable,
 )
 from server.schemas.product_attribute import ProductAttributeItem
+from server.settings import app_settings
 
 router = APIRouter()
 
@@ -72,6 +82,9 @@ class Cart(BaseModel):
     products: list[UUID]
 
 
+product_list = TypeAdapter(list[ProductResponse])
+
+
 # Note: the "product" will have some Joined attributes that are not avail on the type itself
 def to_response_model(product: ProductTable, lang: Lang, shop) -> ProductResponse:
     tax = getattr(shop, product.tax_category)
@@ -163,61 +176,99 @@ def to_response_model(product: ProductTable, lang: Lang, shop) -> ProductRespons
 
 
 @router.get("/", response_model=list[ProductResponse])
-def get_products(
+async def get_products(
     shop_id: UUID,
     lang: Lang,
-    # response: Response,
-) -> list[dict]:
-    products = (
-        ProductTable.query.join(ProductTranslationTable)
+    request: Request,
+    response: Response,
+) -> Response:
+    encoding = negotiate(request.headers.get("accept-encoding"), app_settings.COMPRESSION_ENCODINGS)
+    return await db.run_sync(_get_products, shop_id, lang, response, encoding)
+
+
+def products_statement(shop_id: UUID, lang: Lang) -> Select:
+    statement = (
+        select(ProductTable)
+        .join(ProductTranslationTable)
         .join(CategoryTable)
         .join(CategoryTranslationTable)
-        .filter(ProductTable.shop_id == shop_id)
+        .where(ProductTable.shop_id == shop_id)
     )
 
     if lang == Lang.ALT1:
         # filter out products and categories with missing translations
-        products = (
-            products.filter(ProductTranslationTable.alt1_name.is_not(None))
-            .filter(ProductTranslationTable.alt1_description.is_not(None))
-            .filter(ProductTranslationTable.alt1_description_short.is_not(None))
-            .filter(CategoryTranslationTable.alt1_name.is_not(None))
+        statement = statement.where(
+            ProductTranslationTable.alt1_name.is_not(None),
+            ProductTranslationTable.alt1_description.is_not(None),
+            ProductTranslationTable.alt1_description_short.is_not(None),
+            CategoryTranslationTable.alt1_name.is_not(None),
         )
     if lang == Lang.ALT2:
         # filter out products and categories with missing translations
-        products = (
-            products.filter(ProductTranslationTable.alt2_name.is_not(None))
-            .filter(ProductTranslationTable.alt2_description.is_not(None))
-            .filter(ProductTranslationTable.alt2_description_short.is_not(None))
-            .filter(CategoryTranslationTable.alt2_name.is_not(None))
+        statement = statement.where(
+            ProductTranslationTable.alt2_name.is_not(None),
+            ProductTranslationTable.alt2_description.is_not(None),
+            ProductTranslationTable.alt2_description_short.is_not(None),
+            CategoryTranslationTable.alt2_name.is_not(None),
         )
 
+    return statement.options(*product_crud.loader_options(LoaderProfile.storefront_list))
+
+
+def _get_products(
+    shop_id: UUID, lang: Lang, response: Optional[Response] = None, encoding: Optional[str] = None
+) -> Response:
+    # The snapshot is served as is, compressed with `encoding` if given, see `server.crud.catalog`
+    version, body = catalog_snapshot(shop_id, lang.value, encoding)
+    if version is None:
+        raise_status(HTTPStatus.NOT_FOUND, "Shop not found")
+    if body is None:
+        # Only compressed with the encoding of this request, the others follow when they are asked for
+        encodings = [encoding] if encoding else []
+        body = store_catalog_snapshot(shop_id, lang.value, version, build_catalog(shop_id, lang), encodings)[encoding]
+
+    headers = response_headers(response) if response else {}
+    if encoding is not None:
+        # Passed on as is by the `CompressionMiddleware`
+        headers["Content-Encoding"] = encoding
+        headers["Vary"] = "Accept-Encoding"
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def build_catalog(shop_id: UUID, lang: Lang) -> bytes:
+    """Return the price list of the shop in `lang`, serialized."""
+    products = db.session.scalars(products_statement(shop_id, lang))
     shop = shop_crud.get(shop_id)
 
-    if isinstance(shop.config, str):
-        shop.config = json.loads(shop.config)
+    # Not assigned back: a changed config would raise the catalog version on the next flush
+    config = json.loads(shop.config) if isinstance(shop.config, str) else shop.config
 
     products = [to_response_model(product, lang, shop) for product in products]
 
-    if shop.config.get("toggles", {}).get("enable_stock_on_products"):
+    if config.get("toggles", {}).get("enable_stock_on_products"):
         products = [p for p in products if p.stock and p.stock > 0]
 
-    return products
+    return product_list.dump_json(products)
 
 
 @router.post("/", response_model=list[ProductResponse])
-def get_cart_products(
+async def get_cart_products(
     shop_id: UUID,
     lang: Lang,
     cart: Cart,
     # response: Response,
-) -> list[dict]:
+) -> Response:
+    return prevalidated_response(await db.run_sync(_get_cart_products, shop_id, lang, cart))
+
+
+def _get_cart_products(shop_id: UUID, lang: Lang, cart: Cart) -> list[ProductResponse]:
     products = (
         ProductTable.query.join(ProductTranslationTable)
         .join(CategoryTable)
         .join(CategoryTranslationTable)
         .filter(ProductTable.shop_id == shop_id)
         .filter(ProductTable.id.in_(cart.products))
+        .options(*product_crud.loader_options(LoaderProfile.storefront_list))
     )
 
     response_products = []
@@ -5,15 +5,17 @@ All routes are scoped by shop_id to ensure resources belong to the specified sho
 
 from http import HTTPStatus
 from typing import Any, List, Set, Union
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import structlog
 from fastapi import APIRouter
 from fastapi.param_functions import Body, Depends
+from sqlalchemy import delete, insert
 from starlette.responses import Response
 
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.api.error_handling import raise_status
+from server.crud.catalog import raise_catalog_versions
 from server.crud.crud_attribute import attribute_crud
 from server.crud.crud_attribute_option import attribute_option_crud
 from server.crud.crud_product import product_crud
@@ -55,8 +57,11 @@ def list_product_attribute_values(
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
         query_parameter=query,
+        cursor=common["cursor"],
+        count=common["count"],
     )
     response.headers["Content-Range"] = content_range
+    set_next_cursor(response, product_attribute_value_crud, results, common)
     return results
 
 
@@ -282,8 +287,8 @@ def put_selected_product_attribute_values_by_product(
     for pav in existing_pavs:
         attr_to_existing_pavs.setdefault(pav.attribute_id, []).append(pav)
 
-    to_add_objs = []
-    to_delete_objs = []
+    to_add_rows: list[dict[str, UUID]] = []
+    to_delete_ids: list[UUID] = []
 
     # Process each attribute group
     for inferred_attribute_id, option_ids_for_attr in attr_to_option_ids.items():
@@ -300,7 +305,7 @@ def put_selected_product_attribute_values_by_product(
                     option_id=str(row.option_id),
                     pav_id=str(row.id),
                 )
-                to_delete_objs.append(row)
+                to_delete_ids.append(row.id)
 
         for option_id in to_add:
             logger.info(
@@ -309,21 +314,22 @@ def put_selected_product_attribute_values_by_product(
                 attribute_id=str(inferred_attribute_id),
                 option_id=str(option_id),
             )
-            to_add_objs.append(
-                ProductAttributeValueTable(
-                    product_id=product_id,
-                    attribute_id=inferred_attribute_id,
-                    option_id=option_id,
-                )
+            to_add_rows.append(
+                {"id": uuid4(), "product_id": product_id, "attribute_id": inferred_attribute_id, "option_id": option_id}
             )
 
-    # Batch execute changes
-    if to_add_objs:
-        db.session.add_all(to_add_objs)
-    for obj in to_delete_objs:
-        db.session.delete(obj)
-
-    if to_add_objs or to_delete_objs:
+    # Batch execute changes: one INSERT and one DELETE statement, which share a round trip in pipeline mode. Neither
+    # returns rows, so the keys of the new rows are generated here instead of by the database.
+    if to_add_rows or to_delete_ids:
+        with db.pipeline():
+            if to_add_rows:
+                db.session.execute(insert(ProductAttributeValueTable), to_add_rows)
+            if to_delete_ids:
+                db.session.execute(
+                    delete(ProductAttributeValueTable).where(ProductAttributeValueTable.id.in_(to_delete_ids))
+                )
+        # Core statements do not flush, so the catalog version is raised here
+        raise_catalog_versions(db.session, [shop_id])
         db.session.commit()
 
     return None
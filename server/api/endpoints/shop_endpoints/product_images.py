@@ -7,7 +7,7 @@ from fastapi.param_functions import Depends
 from starlette.responses import Response
 
 from server.api.api_v1.router_fix import APIRouter
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.api.error_handling import raise_status
 from server.api.helpers import name_file, upload_file
 from server.crud.crud_product import product_crud
@@ -25,8 +25,11 @@ def get_multi(response: Response, common: dict = Depends(common_parameters)):
         limit=common["limit"],
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
+        cursor=common["cursor"],
+        count=common["count"],
     )
     response.headers["Content-Range"] = header_range
+    set_next_cursor(response, product_crud, products, common)
     return products
 
 
@@ -5,17 +5,27 @@ from typing import Any, List, Optional
 from uuid import UUID
 
 import structlog
-from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from starlette.responses import Response
 
 from server.api import deps
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.api.error_handling import raise_status
+from server.api.responses import prevalidated_response
+from server.api.streaming import json_response, streaming_response
 from server.crud import crud_shop
+from server.crud.base import NotFound
 from server.crud.crud_product import product_crud
+from server.crud.fieldsets import sparse_fieldset
+from server.crud.loaders import LoaderProfile
+from server.crud.ordering import next_order_number
+from server.db import db
 from server.db.models import ProductTable, UserTable
 from server.schemas.product import (
     AttributeFilters,
+    ProductBulkUpdate,
     ProductCreate,
     ProductOrder,
     ProductSchema,
@@ -25,6 +35,7 @@ from server.schemas.product import (
     ProductWithDetailsAndPrices,
 )
 from server.schemas.product_attribute import ProductAttributeItem
+from server.settings import app_settings
 
 logger = structlog.get_logger(__name__)
 
@@ -39,26 +50,53 @@ def get_shop(shop_id: UUID):
     return shop
 
 
+IMAGE_COLUMNS = [f"image_{i}" for i in [1, 2, 3, 4, 5, 6]]
+
+
+def _with_images_amount(product: ProductTable) -> ProductTable:
+    product.images_amount = 0
+    for column in IMAGE_COLUMNS:
+        if getattr(product, column):
+            product.images_amount += 1
+    return product
+
+
 @router.get("/", response_model=List[ProductWithDefaultPrice])
 def get_multi(
-    shop_id: UUID, response: Response, common: dict = Depends(common_parameters)
+    shop_id: UUID, request: Request, response: Response, common: dict = Depends(common_parameters)
 ) -> List[ProductWithDefaultPrice]:
+    stream = not common["limit"]
+    fieldset = sparse_fieldset(
+        ProductTable,
+        ProductWithDefaultPrice,
+        common["fields"],
+        common["include"],
+        derived={"images_amount": IMAGE_COLUMNS},
+    )
     products, header_range = product_crud.get_multi_by_shop_id(
         shop_id=shop_id,
         skip=common["skip"],
         limit=common["limit"],
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
+        stream=stream,
+        cursor=common["cursor"],
+        count=common["count"],
+        profile=LoaderProfile.admin_list,
+        fieldset=fieldset,
     )
-    response.headers["Content-Range"] = header_range
-
-    for product in products:
-        product.images_amount = 0
-        for i in [1, 2, 3, 4, 5, 6]:
-            if getattr(product, f"image_{i}"):
-                product.images_amount += 1
+    schema = fieldset.schema if fieldset else ProductWithDefaultPrice
+    rows = products
+    if fieldset is None or "images_amount" in fieldset.fields:
+        rows = map(_with_images_amount, products)
+    if stream:
+        return streaming_response(request, rows, schema, headers={"Content-Range": header_range})
 
-    return products
+    response.headers["Content-Range"] = header_range
+    set_next_cursor(response, product_crud, products, common)
+    if fieldset:
+        return json_response(rows, schema, response)
+    return list(rows)
 
 
 @router.get(
@@ -109,9 +147,13 @@ def get_multi_with_attributes(
         limit=common["limit"],
         filter_parameters=filter_parameters,
         sort_parameters=common["sort"],
+        cursor=common["cursor"],
+        count=common["count"],
+        profile=LoaderProfile.admin_list,
     )
     # We will update Content-Range if filtering by option_id changes the visible count
     response.headers["Content-Range"] = header_range
+    set_next_cursor(response, product_crud, products, common)
 
     if not products:
         return []
@@ -171,9 +213,35 @@ def get_multi_with_attributes(
     return out
 
 
+@public_router.get(
+    "/search",
+    response_model=List[ProductWithDefaultPrice],
+    summary="Search products",
+    description="""
+Full-text search in the names and descriptions of the products of a shop, in all its languages, best matches first.
+
+`q` takes web search syntax: words (all must match), `"quoted phrases"`, `or` and `-excluded` words.
+""",
+)
+def search(
+    shop_id: UUID,
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+) -> List[ProductWithDefaultPrice]:
+    products = product_crud.search_by_shop_id(
+        shop_id=shop_id, text=q, skip=skip, limit=limit, profile=LoaderProfile.storefront_list
+    )
+    return [_with_images_amount(product) for product in products]
+
+
 @public_router.get("/{product_id}/with_attributes", response_model=ProductWithAttributes)
-def get_by_id_with_attributes(product_id: UUID, shop_id: UUID) -> ProductWithAttributes:
-    product = product_crud.get_id_by_shop_id(shop_id, product_id)
+async def get_by_id_with_attributes(product_id: UUID, shop_id: UUID, response: Response) -> Response:
+    return prevalidated_response(await db.run_sync(_get_by_id_with_attributes, product_id, shop_id), response)
+
+
+def _get_by_id_with_attributes(product_id: UUID, shop_id: UUID) -> ProductWithAttributes:
+    product = product_crud.get_id_by_shop_id(shop_id, product_id, profile=LoaderProfile.detail)
     if not product:
         raise_status(HTTPStatus.NOT_FOUND, f"Product with id {product_id} not found")
 
@@ -204,8 +272,12 @@ def get_by_id_with_attributes(product_id: UUID, shop_id: UUID) -> ProductWithAtt
 
 
 @public_router.get("/{product_id}", response_model=ProductWithDetailsAndPrices)
-def get_by_id(product_id: UUID, shop_id: UUID) -> ProductWithDetailsAndPrices:
-    product = product_crud.get_id_by_shop_id(shop_id, product_id)
+async def get_by_id(product_id: UUID, shop_id: UUID, response: Response) -> Response:
+    return prevalidated_response(await db.run_sync(_get_by_id, product_id, shop_id), response)
+
+
+def _get_by_id(product_id: UUID, shop_id: UUID) -> ProductWithDetailsAndPrices:
+    product = product_crud.get_id_by_shop_id(shop_id, product_id, profile=LoaderProfile.detail)
     if not product:
         raise_status(HTTPStatus.NOT_FOUND, f"Product with id {product_id} not found")
 
@@ -235,18 +307,79 @@ def get_by_id(product_id: UUID, shop_id: UUID) -> ProductWithDetailsAndPrices:
         if getattr(product, f"image_{i}"):
             product.images_amount += 1
 
-    return product
+    # Validate inside the session: with the async engine lazy loads are not possible after `run_sync` returns
+    return ProductWithDetailsAndPrices.model_validate(product)
+
+
+@router.post("/bulk", response_model=List[UUID], status_code=HTTPStatus.CREATED)
+def create_many(
+    shop_id: UUID, data: List[ProductCreate] = Body(..., max_length=app_settings.BULK_MAX_ITEMS)
+) -> List[UUID]:
+    """Create products in one transaction, appended to their categories in the given order, and return their ids."""
+    order_numbers = dict(
+        db.session.query(ProductTable.category_id, func.max(ProductTable.order_number))
+        .filter(ProductTable.shop_id == shop_id, ProductTable.category_id.in_({item.category_id for item in data}))
+        .group_by(ProductTable.category_id)
+        .all()
+    )
+    for item in data:
+        item.order_number = order_numbers[item.category_id] = next_order_number(order_numbers.get(item.category_id))
+
+    logger.info("Saving products", amount=len(data))
+    try:
+        return product_crud.create_many(shop_id=shop_id, objs_in=data)
+    except IntegrityError:
+        raise_status(HTTPStatus.CONFLICT, "Products could not be created")
+
+
+@router.put("/bulk", response_model=None, status_code=HTTPStatus.NO_CONTENT)
+def update_many(
+    shop_id: UUID, data: List[ProductBulkUpdate] = Body(..., max_length=app_settings.BULK_MAX_ITEMS)
+) -> None:
+    """Update products in one transaction: all of them, or none when one of the ids is no product of the shop."""
+    modified_at = datetime.now(timezone.utc)
+    for item in data:
+        item.modified_at = modified_at
+
+    logger.info("Updating products", amount=len(data))
+    try:
+        product_crud.update_many(shop_id=shop_id, objs_in=data)
+    except NotFound:
+        raise_status(HTTPStatus.NOT_FOUND, "Products not found")
+    except IntegrityError:
+        raise_status(HTTPStatus.CONFLICT, "Products could not be updated")
+
+
+@router.delete("/bulk", response_model=None, status_code=HTTPStatus.NO_CONTENT)
+def delete_many(shop_id: UUID, ids: List[UUID] = Body(..., max_length=app_settings.BULK_MAX_ITEMS)) -> None:
+    """Delete products, with their translations, attribute values and tags, in one transaction."""
+    try:
+        product_crud.delete_many(shop_id=shop_id, ids=ids)
+    except NotFound:
+        raise_status(HTTPStatus.NOT_FOUND, "Products not found")
+    except IntegrityError:
+        raise_status(HTTPStatus.CONFLICT, "Products are in use and cannot be deleted")
+
+
+@router.put("/reorder", response_model=None, status_code=HTTPStatus.NO_CONTENT)
+def reorder(
+    shop_id: UUID,
+    category_id: UUID,
+    ids: List[UUID] = Body(..., max_length=app_settings.BULK_MAX_ITEMS),
+) -> None:
+    """Put the products of a category in the order of `ids`, which lists all of them, in one statement."""
+    try:
+        changed = product_crud.reorder(shop_id=shop_id, ids=ids, category_id=category_id)
+    except NotFound:
+        raise_status(HTTPStatus.NOT_FOUND, "Products not found in the category")
+    except ValueError as error:
+        raise_status(HTTPStatus.BAD_REQUEST, str(error))
+    logger.info("Reordered products", category_id=category_id, amount=len(ids), changed=changed)
 
 
 @router.post("/", response_model=None, status_code=HTTPStatus.CREATED)
 def create(shop_id: UUID, data: ProductCreate = Body(...)) -> None:
-    product = (
-        ProductTable.query.filter_by(shop_id=shop_id)
-        .filter_by(category_id=data.category_id)
-        .order_by(ProductTable.order_number.desc())
-        .first()
-    )
-    data.order_number = (product.order_number + 1) if product is not None else 0
+    data.order_number = next_order_number(product_crud.last_order_number(shop_id=shop_id, category_id=data.category_id))
 
     logger.info("Saving product", data=data)
     product = product_crud.create_by_shop_id(obj_in=data, shop_id=shop_id)
@@ -260,8 +393,7 @@ def update(*, product_id: UUID, shop_id: UUID, item_in: ProductUpdate) -> Any:
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    item_in.modified_at = datetime.now(timezone.utc)
-
+    # Sets modified_at when the product changed
     product = product_crud.update(
         db_obj=product,
         obj_in=item_in,
@@ -275,42 +407,27 @@ def swap(shop_id: UUID, product_id: UUID, move_up: bool):
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    last_product = (
-        ProductTable.query.filter_by(shop_id=shop_id)
-        .filter_by(category_id=product.category_id)
-        .order_by(ProductTable.order_number.desc())
-        .first()
-    )
-
-    first_product = (
-        ProductTable.query.filter_by(shop_id=shop_id)
-        .filter_by(category_id=product.category_id)
-        .order_by(ProductTable.order_number.asc())
-        .first()
-    )
-
-    old_order_number = product.order_number
-    new_order_number = None
-
+    # The neighbour in the category: with sparse order numbers it is not the one numbered one more or less
+    siblings = ProductTable.query.filter_by(shop_id=shop_id).filter_by(category_id=product.category_id)
     if move_up:
-        if old_order_number == first_product.order_number:
+        product_to_swap = (
+            siblings.filter(ProductTable.order_number < product.order_number)
+            .order_by(ProductTable.order_number.desc())
+            .first()
+        )
+        if product_to_swap is None:
             raise HTTPException(status_code=400, detail="Cannot move up further - Minimum order number achieved.")
-        new_order_number = old_order_number - 1
     else:
-        if old_order_number == last_product.order_number:
+        product_to_swap = (
+            siblings.filter(ProductTable.order_number > product.order_number)
+            .order_by(ProductTable.order_number.asc())
+            .first()
+        )
+        if product_to_swap is None:
             raise HTTPException(status_code=400, detail="Cannot move down further - Maximum order number achieved.")
-        new_order_number = old_order_number + 1
-
-    product_to_swap = (
-        ProductTable.query.filter_by(shop_id=shop_id)
-        .filter_by(category_id=product.category_id)
-        .filter_by(order_number=new_order_number)
-        .first()
-    )
-
-    if product_to_swap is not None:
-        product_crud.update(db_obj=product_to_swap, obj_in=ProductOrder(order_number=old_order_number), commit=False)
 
+    old_order_number, new_order_number = product.order_number, product_to_swap.order_number
+    product_crud.update(db_obj=product_to_swap, obj_in=ProductOrder(order_number=old_order_number), commit=False)
     product_crud.update(db_obj=product, obj_in=ProductOrder(order_number=new_order_number))
 
     return HTTPStatus.CREATED
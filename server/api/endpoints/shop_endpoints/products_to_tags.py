@@ -7,7 +7,7 @@ from fastapi import APIRouter, HTTPException
 from fastapi.param_functions import Body, Depends
 from starlette.responses import Response
 
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.api.error_handling import raise_status
 from server.crud.crud_product import product_crud
 from server.crud.crud_product_to_tag import product_to_tag_crud
@@ -27,8 +27,11 @@ def get_multi(response: Response, common: dict = Depends(common_parameters)) ->
         limit=common["limit"],
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
+        cursor=common["cursor"],
+        count=common["count"],
     )
     response.headers["Content-Range"] = content_range
+    set_next_cursor(response, product_to_tag_crud, query_result, common)
     return query_result
 
 
@@ -2,13 +2,15 @@ from enum import Enum
 from http import HTTPStatus
 from uuid import UUID
 
-import stripe
 import structlog
 from fastapi import APIRouter
 
 from server.crud.crud_shop import shop_crud
 from server.db.models import Account
 from server.services import stripe_client
+from server.utils.imports import lazy_import
+
+stripe = lazy_import("stripe")
 
 router = APIRouter()
 logger = structlog.get_logger(__name__)
@@ -7,10 +7,15 @@ from fastapi import APIRouter, HTTPException
 from fastapi.param_functions import Body, Depends
 from starlette.responses import Response
 
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.api.error_handling import raise_status
+from server.api.streaming import json_response
+from server.crud.base import NotFound
 from server.crud.crud_tag import tag_crud
-from server.schemas.tag import TagCreate, TagSchema, TagUpdate
+from server.crud.fieldsets import sparse_fieldset
+from server.db.models import TagTable
+from server.schemas.tag import TagBulkUpdate, TagCreate, TagSchema, TagUpdate
+from server.settings import app_settings
 
 logger = structlog.get_logger(__name__)
 
@@ -19,14 +24,21 @@ router = APIRouter()
 
 @router.get("/", response_model=List[TagSchema])
 def get_multi(shop_id: UUID, response: Response, common: dict = Depends(common_parameters)) -> List[TagSchema]:
+    fieldset = sparse_fieldset(TagTable, TagSchema, common["fields"], common["include"])
     tags, header_range = tag_crud.get_multi_by_shop_id(
         shop_id=shop_id,
         skip=common["skip"],
         limit=common["limit"],
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
+        cursor=common["cursor"],
+        count=common["count"],
+        fieldset=fieldset,
     )
     response.headers["Content-Range"] = header_range
+    set_next_cursor(response, tag_crud, tags, common)
+    if fieldset:
+        return json_response(tags, fieldset.schema, response)
     return tags
 
 
@@ -47,6 +59,32 @@ def get_by_name(name: str, shop_id: UUID) -> TagSchema:
     return tag
 
 
+@router.post("/bulk", response_model=List[UUID], status_code=HTTPStatus.CREATED)
+def create_many(shop_id: UUID, data: List[TagCreate] = Body(..., max_length=app_settings.BULK_MAX_ITEMS)) -> List[UUID]:
+    """Create tags in one transaction and return their ids, in the given order."""
+    logger.info("Saving tags", amount=len(data))
+    return tag_crud.create_many(shop_id=shop_id, objs_in=data)
+
+
+@router.put("/bulk", response_model=None, status_code=HTTPStatus.NO_CONTENT)
+def update_many(shop_id: UUID, data: List[TagBulkUpdate] = Body(..., max_length=app_settings.BULK_MAX_ITEMS)) -> None:
+    """Update tags in one transaction: all of them, or none when one of the ids is no tag of the shop."""
+    logger.info("Updating tags", amount=len(data))
+    try:
+        tag_crud.update_many(shop_id=shop_id, objs_in=data)
+    except NotFound:
+        raise_status(HTTPStatus.NOT_FOUND, "Tags not found")
+
+
+@router.delete("/bulk", response_model=None, status_code=HTTPStatus.NO_CONTENT)
+def delete_many(shop_id: UUID, ids: List[UUID] = Body(..., max_length=app_settings.BULK_MAX_ITEMS)) -> None:
+    """Delete tags, and their links to products, in one transaction."""
+    try:
+        tag_crud.delete_many(shop_id=shop_id, ids=ids)
+    except NotFound:
+        raise_status(HTTPStatus.NOT_FOUND, "Tags not found")
+
+
 @router.post("/", response_model=None, status_code=HTTPStatus.CREATED)
 def create(shop_id: UUID, data: TagCreate = Body(...)) -> None:
     logger.info("Saving tag", data=data)
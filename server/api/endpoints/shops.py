@@ -9,7 +9,8 @@ from fastapi.param_functions import Body, Depends
 from starlette.responses import Response
 
 from server.api import deps
-from server.api.deps import common_parameters
+from server.api.conditional import conditional, shop_version
+from server.api.deps import common_parameters, set_next_cursor
 from server.api.error_handling import raise_status
 from server.api.helpers import load
 from server.crud.crud_shop import shop_crud
@@ -43,8 +44,11 @@ def get_multi(
         limit=common["limit"],
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
+        cursor=common["cursor"],
+        count=common["count"],
     )
     response.headers["Content-Range"] = header_range
+    set_next_cursor(response, shop_crud, shops, common)
     return shops
 
 
@@ -108,7 +112,7 @@ def delete(shop_id: UUID, current_user: UserTable = Depends(auth_required)) -> N
     return shop_crud.delete(id=shop_id)
 
 
-@router.get("/config/{id}", response_model=ShopConfig)
+@router.get("/config/{id}", response_model=ShopConfig, dependencies=[Depends(conditional(shop_version))])
 def get_config(
     id: UUID,
 ) -> ShopConfig:
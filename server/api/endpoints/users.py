@@ -6,7 +6,7 @@ from pydantic.networks import EmailStr
 from starlette.responses import Response
 
 from server.api import deps
-from server.api.deps import common_parameters
+from server.api.deps import common_parameters, set_next_cursor
 from server.crud.crud_user import user_crud
 from server.db.models import UserTable
 from server.schemas import User, UserCreate, UserUpdate
@@ -30,8 +30,11 @@ def get_multi(
         limit=common["limit"],
         filter_parameters=common["filter"],
         sort_parameters=common["sort"],
+        cursor=common["cursor"],
+        count=common["count"],
     )
     response.headers["Content-Range"] = header_range
+    set_next_cursor(response, user_crud, users, common)
     return users
 
 
@@ -16,10 +16,9 @@ import os
 from ast import literal_eval
 from datetime import datetime
 from http import HTTPStatus
-from typing import List, Optional
+from typing import Any, List, Optional
 from uuid import UUID
 
-import boto3 as boto3
 from fastapi import HTTPException
 from more_itertools import chunked
 from sqlalchemy import String, cast
@@ -36,6 +35,7 @@ from server.db.database import BaseModel
 from server.db.models import ShopUserTable
 from server.schemas import ShopUpdate
 from server.schemas.shop_user import ShopUserSchema
+from server.services.aws import aws_clients
 from server.settings import app_settings
 
 logger = get_logger(__name__)
@@ -50,40 +50,14 @@ VALID_SORT_KEYS = {
     "modified": "modified_at",
 }
 
-s3 = boto3.resource(
-    "s3",
-    aws_access_key_id=app_settings.S3_BUCKET_IMAGES_ACCESS_KEY_ID,
-    aws_secret_access_key=app_settings.S3_BUCKET_IMAGES_SECRET_ACCESS_KEY,
-    region_name="eu-central-1",
-)
-
-s3_client = boto3.client(
-    "s3",
-    aws_access_key_id=app_settings.S3_BUCKET_IMAGES_ACCESS_KEY_ID,
-    aws_secret_access_key=app_settings.S3_BUCKET_IMAGES_SECRET_ACCESS_KEY,
-    region_name="eu-central-1",
-)
-
-s3_client_downloads = boto3.client(
-    "s3",
-    aws_access_key_id=app_settings.S3_BUCKET_DOWNLOADS_ACCESS_KEY_ID,
-    aws_secret_access_key=app_settings.S3_BUCKET_DOWNLOADS_SECRET_ACCESS_KEY,
-    region_name="eu-central-1",
-)
-
-s3_temporary = boto3.resource(
-    "s3",
-    aws_access_key_id=app_settings.S3_TEMPORARY_ACCESS_KEY_ID,
-    aws_secret_access_key=app_settings.S3_TEMPORARY_ACCESS_KEY,
-    region_name="eu-central-1",
-)
-
-sendMessageLambda = boto3.client(
-    "lambda",
-    aws_access_key_id=app_settings.LAMBDA_ACCESS_KEY_ID,
-    aws_secret_access_key=app_settings.LAMBDA_SECRET_ACCESS_KEY,
-    region_name="eu-central-1",
-)
+# The boto3 clients used to be created here at import time, keep the names working
+_AWS_CLIENTS = {"s3", "s3_client", "s3_client_downloads", "s3_temporary", "sendMessageLambda"}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _AWS_CLIENTS:
+        return aws_clients.get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_range_from_args(args):
@@ -251,7 +225,7 @@ def upload_file(blob, file_name):
     image = base64.b64decode(image_base64)
 
     # Todo: make dynamic
-    s3_object = s3.Object(os.getenv("S3_BUCKET_IMAGES_NAME"), file_name)
+    s3_object = aws_clients.get("s3").Object(os.getenv("S3_BUCKET_IMAGES_NAME"), file_name)
     resp = s3_object.put(Body=image, ContentType="image/png")
 
     if resp["ResponseMetadata"]["HTTPStatusCode"] == 200:
@@ -281,7 +255,7 @@ def name_file(column_name, record_name, image_name=""):
 
 def sendMessageToWebSocketServer(payload):
     try:
-        sendMessageLambda.invoke(
+        aws_clients.get("sendMessageLambda").invoke(
             FunctionName="sendMessage", InvocationType="RequestResponse", Payload=json.dumps(payload)
         )
         logger.info("Sending websocket message")
@@ -354,7 +328,7 @@ def invalidatePendingOrdersCache(order_id):
 def create_presigned_url(object_name, expiration=7200):
     bucket_name = app_settings.S3_BUCKET_IMAGES_NAME
     try:
-        response = s3_client.generate_presigned_url(
+        response = aws_clients.get("s3_client").generate_presigned_url(
             "get_object", Params={"Bucket": bucket_name, "Key": object_name}, ExpiresIn=expiration
         )
     except Exception as e:
@@ -366,7 +340,7 @@ def create_presigned_url(object_name, expiration=7200):
 def create_download_url(object_name, expiration):
     bucket_name = app_settings.S3_BUCKET_DOWNLOADS_NAME
     try:
-        response = s3_client_downloads.generate_presigned_url(
+        response = aws_clients.get("s3_client_downloads").generate_presigned_url(
             "get_object", Params={"Bucket": bucket_name, "Key": object_name}, ExpiresIn=expiration
         )
     except Exception as e:
@@ -381,7 +355,9 @@ def move_between_buckets():
     prefix = "upload/"
 
     try:
-        list_objects_response = s3_client.list_objects_v2(Bucket=temp_bucket_name, Prefix=prefix, Delimiter="/")
+        list_objects_response = aws_clients.get("s3_client").list_objects_v2(
+            Bucket=temp_bucket_name, Prefix=prefix, Delimiter="/"
+        )
         folder_content_info = list_objects_response.get("Contents")
 
         if list_objects_response.get("KeyCount") < 1:
@@ -390,8 +366,8 @@ def move_between_buckets():
         for file in folder_content_info:
             copy_source = {"Bucket": temp_bucket_name, "Key": file.get("Key")}
             new_key = file.get("Key").replace(prefix, "")
-            s3.meta.client.copy(copy_source, prod_bucket_name, new_key)
-            s3_temporary.Object(temp_bucket_name, file.get("Key")).delete()
+            aws_clients.get("s3").meta.client.copy(copy_source, prod_bucket_name, new_key)
+            aws_clients.get("s3_temporary").Object(temp_bucket_name, file.get("Key")).delete()
 
         return {"message": "Moved files from temporary bucket to production bucket"}
     except Exception as e:
@@ -403,14 +379,16 @@ def delete_from_temporary_bucket():
     prefix = "upload/"
 
     try:
-        list_objects_response = s3_client.list_objects_v2(Bucket=temp_bucket_name, Prefix=prefix, Delimiter="/")
+        list_objects_response = aws_clients.get("s3_client").list_objects_v2(
+            Bucket=temp_bucket_name, Prefix=prefix, Delimiter="/"
+        )
         folder_content_info = list_objects_response.get("Contents")
 
         if list_objects_response.get("KeyCount") < 1:
             return {"message": "No files to delete"}
 
         for file in folder_content_info:
-            s3_temporary.Object(temp_bucket_name, file.get("Key")).delete()
+            aws_clients.get("s3_temporary").Object(temp_bucket_name, file.get("Key")).delete()
 
         return {"message": "Deleted files from temporary bucket"}
     except Exception as e:
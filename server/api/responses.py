@@ -0,0 +1,53 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""JSON responses serialized in C instead of with the standard library.
+
+`FastJSONResponse` is the app's default response class: what FastAPI made of the endpoint's result is serialized with
+rapidjson. FastAPI still checks that result against the `response_model` first: models the endpoint built are dumped
+and validated again. Hot endpoints skip that by returning a `PrevalidatedResponse` of the models they validated
+themselves, which pydantic-core serializes directly, or a `FastJSONResponse` of plain dicts and lists; keep the
+`response_model` on the route for the OpenAPI schema.
+"""
+
+from typing import Any, Optional
+
+import rapidjson
+from pydantic_core import to_json
+from starlette.responses import JSONResponse, Response
+
+from server.api.streaming import response_headers
+from server.utils.json import to_serializable
+
+
+class FastJSONResponse(JSONResponse):
+    """`JSONResponse` serialized with rapidjson, with UUIDs, datetimes and models handled like `json_dumps`."""
+
+    def render(self, content: Any) -> bytes:
+        # NaN and infinity are refused, like the `allow_nan=False` of Starlette's `JSONResponse`
+        return rapidjson.dumps(
+            content, default=to_serializable, ensure_ascii=False, number_mode=rapidjson.NM_NATIVE
+        ).encode()
+
+
+class PrevalidatedResponse(FastJSONResponse):
+    """Response of models the endpoint already validated, or lists and dicts of them, serialized by pydantic-core."""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def prevalidated_response(
+    content: Any, response: Optional[Response] = None, status_code: int = 200
+) -> PrevalidatedResponse:
+    """Return `content` as a `PrevalidatedResponse` with the headers set on the endpoint's `response`."""
+    return PrevalidatedResponse(content, status_code, headers=response_headers(response) if response else None)
@@ -0,0 +1,80 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Stream unlimited listings (`limit=0`) as a JSON array or NDJSON instead of building one big response.
+
+`json_response` serializes a page the same way, for listings whose schema is chosen per request.
+"""
+
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from more_itertools import chunked
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from server.crud.base import STREAM_CHUNK_SIZE
+
+NDJSON = "application/x-ndjson"
+
+
+def json_array_chunks(
+    items: Iterable[Any], schema: type[BaseModel], chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Serialize `items` with `schema` into a JSON array, one chunk of bytes per `chunk_size` items."""
+    yield b"["
+    separator = b""
+    for chunk in chunked(items, chunk_size):
+        yield separator + b",".join(
+            schema.model_validate(item, from_attributes=True).model_dump_json().encode() for item in chunk
+        )
+        separator = b","
+    yield b"]"
+
+
+def ndjson_chunks(
+    items: Iterable[Any], schema: type[BaseModel], chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Serialize `items` with `schema` as newline delimited JSON, one chunk of bytes per `chunk_size` items."""
+    for chunk in chunked(items, chunk_size):
+        yield b"".join(
+            schema.model_validate(item, from_attributes=True).model_dump_json().encode() + b"\n" for item in chunk
+        )
+
+
+def streaming_response(
+    request: Request, items: Iterable[Any], schema: type[BaseModel], headers: dict[str, str] | None = None
+) -> StreamingResponse:
+    """Stream `items` as NDJSON when the client accepts it, otherwise as one JSON array.
+
+    Both are consumed chunk by chunk, so pass a streaming result, e.g. `get_multi(..., stream=True)`, to serve any
+    number of rows in constant memory.
+    """
+    if NDJSON in request.headers.get("accept", ""):
+        return StreamingResponse(ndjson_chunks(items, schema), media_type=NDJSON, headers=headers)
+    return StreamingResponse(json_array_chunks(items, schema), media_type="application/json", headers=headers)
+
+
+def json_response(items: Iterable[Any], schema: type[BaseModel], response: Response) -> Response:
+    """Return `items` serialized with `schema` as a JSON array, with the headers set on the endpoint's `response`.
+
+    For listings whose schema is only known per request, like a sparse fieldset, which `response_model` can't check.
+    """
+    return Response(
+        b"".join(json_array_chunks(items, schema)), media_type="application/json", headers=response_headers(response)
+    )
+
+
+def response_headers(response: Response) -> dict[str, str]:
+    """Return the headers set on the endpoint's `response`, to pass on to a response the endpoint returns itself."""
+    return {name: value for name, value in response.headers.items() if name != "content-length"}
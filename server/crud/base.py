@@ -10,17 +10,33 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Any, Generic, List, Optional, Tuple, Type, TypeVar, Union
-from uuid import UUID
+import base64
+import json
+from collections import defaultdict
+from http import HTTPStatus
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
+from uuid import UUID, uuid4
 
 import structlog
 from fastapi.encoders import jsonable_encoder
-from more_itertools import one
-from sqlalchemy import String, cast, or_
+from pydantic import ValidationError
+from sqlalchemy import Column, Table, and_, bindparam, column
+from sqlalchemy import delete as sa_delete
+from sqlalchemy import false, func, insert, lambda_stmt, or_, select, tuple_
+from sqlalchemy import update as sa_update
+from sqlalchemy import values
 from sqlalchemy.inspection import inspect as sa_inspect
+from sqlalchemy.orm import ONETOMANY
 from sqlalchemy.sql import expression
 
+from server.api.error_handling import raise_status
 from server.api.models import transform_json
+from server.crud.catalog import CATALOG_MODELS, raise_catalog_versions
+from server.crud.count import CountMode, count_cache, count_rows
+from server.crud.fieldsets import Fieldset
+from server.crud.filters import compile_filter, type_adapter
+from server.crud.loaders import LoaderProfile
+from server.crud.ordering import sparse_order_numbers
 from server.db import db
 from server.db.database import BaseModel
 
@@ -31,9 +47,13 @@ from server.db.models import (
     ProductTranslationTable,
     TagTranslationTable,
 )
+from server.utils.date_utils import nowtz
 
 logger = structlog.getLogger()
 
+# Rows per round trip of `get_multi(..., stream=True)`
+STREAM_CHUNK_SIZE = 1000
+
 ModelType = TypeVar("ModelType", bound=BaseModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
@@ -43,7 +63,44 @@ class NotFound(Exception):
     pass
 
 
+def _cursor_value(column: Any, value: Any) -> Any:
+    """Return a value decoded from a cursor as the Python type of `column`, e.g. a datetime from its ISO string."""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    return None if value is None else type_adapter(python_type).validate_python(value)
+
+
+def _set_changed(obj: Any, values: Dict[str, Any]) -> bool:
+    """Set the attributes of `obj` that differ from `values`; return whether any did."""
+    changed = False
+    for field, value in values.items():
+        if getattr(obj, field) != value:
+            setattr(obj, field, value)
+            changed = True
+    return changed
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Return an opaque cursor for the sort key `values` of the last row of a page."""
+    return base64.urlsafe_b64encode(json.dumps(jsonable_encoder(values)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise_status(HTTPStatus.BAD_REQUEST, "Invalid cursor")
+    if not isinstance(values, list):
+        raise_status(HTTPStatus.BAD_REQUEST, "Invalid cursor")
+    return values
+
+
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Loader options of the profiles the read paths of the model can ask for, see `server.crud.loaders`
+    loader_profiles: Dict[LoaderProfile, Tuple[Any, ...]] = {}
+
     def __init__(self, model: Type[ModelType]):
         """
         CRUD object with default methods to Create, Read, Update, Delete (CRUD).
@@ -54,14 +111,125 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
 
-    def get(self, id: UUID | str) -> Optional[ModelType]:
-        return db.session.get(self.model, id)
+    def loader_options(self, profile: Optional[LoaderProfile]) -> Tuple[Any, ...]:
+        """Return the loader options of `profile`: none without a profile, a KeyError for one the model lacks."""
+        if profile is None:
+            return ()
+        return self.loader_profiles[profile]
+
+    def get(self, id: UUID | str, profile: Optional[LoaderProfile] = None) -> Optional[ModelType]:
+        return db.session.get(self.model, id, options=self.loader_options(profile))
 
     def get_id(self, id: UUID | str) -> Optional[ModelType]:
         return db.session.get(self.model, id)
 
-    def get_id_by_shop_id(self, shop_id: UUID, id: UUID) -> Optional[ModelType]:
-        return db.session.query(self.model).filter(self.model.shop_id == shop_id, self.model.id == id).first()
+    def get_id_by_shop_id(
+        self, shop_id: UUID, id: UUID, profile: Optional[LoaderProfile] = None
+    ) -> Optional[ModelType]:
+        model = self.model
+        # Lambda statement: built and compiled once per model and profile, later calls only bind the ids
+        statement = lambda_stmt(lambda: select(model).where(model.shop_id == shop_id, model.id == id).limit(1))
+        options = self.loader_options(profile)
+        if options:
+            statement = statement.add_criteria(lambda s: s.options(*options), track_on=[options])
+        return db.session.scalars(statement).first()
+
+    def _sort_columns(self, sort_parameters: Optional[List[str]]) -> List[Tuple[str, bool]]:
+        """Return the `(column, descending)` pairs of the sort parameters that name a column of the model."""
+        columns = []
+        for sort_parameter in sort_parameters or []:
+            try:
+                sort_col, sort_order = sort_parameter.split(":")
+                if sort_col in sa_inspect(self.model).columns.keys():
+                    columns.append((sort_col, sort_order.upper() == "DESC"))
+                else:
+                    logger.debug(f"Sort col does not exist sort_col={sort_col}")
+            except ValueError:
+                if sort_parameter in sa_inspect(self.model).columns.keys():
+                    columns.append((sort_parameter, False))
+                else:
+                    logger.debug(f"Sort param does not exist sort_parameter={sort_parameter}")
+        return columns
+
+    def _keyset_columns(self, sort_parameters: Optional[List[str]]) -> List[Tuple[str, bool]]:
+        """Return the sort columns of keyset pagination: the sort parameters with the id as a tiebreaker.
+
+        The id follows the direction of the last sort column, so a sort in one direction pages with a row comparison.
+        """
+        columns = self._sort_columns(sort_parameters)
+        if "id" not in (column for column, _ in columns):
+            columns.append(("id", columns[-1][1] if columns else False))
+        return columns
+
+    def _after_cursor(self, columns: List[Tuple[str, bool]], cursor: str) -> Any:
+        """Return the condition for the rows after `cursor` in the order of `columns`.
+
+        Postgres sorts NULL last in ascending and first in descending order; the conditions follow that.
+        """
+        values = decode_cursor(cursor)
+        if len(values) != len(columns):
+            raise_status(HTTPStatus.BAD_REQUEST, "Cursor does not match the sort parameters")
+        model_columns = sa_inspect(self.model).columns
+        attributes = [self.model.__dict__[column] for column, _ in columns]
+        try:
+            values = [_cursor_value(model_columns[column], value) for (column, _), value in zip(columns, values)]
+        except ValidationError:
+            raise_status(HTTPStatus.BAD_REQUEST, "Invalid cursor")
+
+        descending = {descending for _, descending in columns}
+        nullable = any(model_columns[column].nullable for column, _ in columns)
+        if len(descending) == 1 and None not in values and (descending == {True} or not nullable):
+            # One direction and no NULL to pass: a row comparison, which an index on the columns can serve
+            if descending == {True}:
+                return tuple_(*attributes) < tuple_(*values)
+            return tuple_(*attributes) > tuple_(*values)
+
+        conditions = []
+        for index, ((column, descending), attribute, value) in enumerate(zip(columns, attributes, values)):
+            if value is None:
+                after = attribute.isnot(None) if descending else false()
+            elif descending:
+                after = attribute < value
+            elif model_columns[column].nullable:
+                after = or_(attribute > value, attribute.is_(None))
+            else:
+                after = attribute > value
+            equal = [
+                previous.is_(None) if previous_value is None else previous == previous_value
+                for previous, previous_value in zip(attributes[:index], values[:index])
+            ]
+            conditions.append(and_(*equal, after))
+        return or_(*conditions)
+
+    def next_cursor(self, items: List[ModelType], *, limit: int, sort_parameters: Optional[List[str]]) -> Optional[str]:
+        """Return the cursor of the page after `items`, or None when `items` is the last page."""
+        if not limit or len(items) < limit:
+            return None
+        last = items[-1]
+        return encode_cursor([getattr(last, column) for column, _ in self._keyset_columns(sort_parameters)])
+
+    def _filter_and_sort(
+        self,
+        query: Optional[Any],
+        filter_parameters: Optional[List[str]],
+        sort_parameters: Optional[List[str]],
+    ) -> Any:
+        if query is None:
+            query = db.session.query(self.model)
+
+        logger.debug(
+            f"Filter and Sort parameters model={self.model}, sort_parameters={sort_parameters}, filter_parameters={filter_parameters}",
+        )
+        for filter_parameter in filter_parameters or []:
+            condition = compile_filter(self.model, filter_parameter)
+            if condition is not None:
+                query = query.filter(condition)
+
+        for sort_col, descending in self._sort_columns(sort_parameters):
+            column = self.model.__dict__[sort_col]
+            query = query.order_by(expression.desc(column) if descending else expression.asc(column))
+
+        return query
 
     def get_multi(
         self,
@@ -71,67 +239,63 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         filter_parameters: Optional[List[str]],
         sort_parameters: Optional[List[str]],
         query_parameter: Optional[Any] = None,
+        stream: bool = False,
+        cursor: Optional[str] = None,
+        count: CountMode = CountMode.exact,
+        profile: Optional[LoaderProfile] = None,
+        fieldset: Optional[Fieldset] = None,
     ) -> Tuple[List[ModelType], str]:
-        query = query_parameter
-        if query is None:
-            query = db.session.query(self.model)
+        """Return a page of `limit` rows (all rows for a `limit` of 0) and the matching Content-Range header.
 
-        logger.debug(
-            f"Filter and Sort parameters model={self.model}, sort_parameters={sort_parameters}, filter_parameters={filter_parameters}",
-        )
-        conditions = []
+        `count` decides the total in the header: `exact` counts (served from `count_cache` for a few seconds),
+        `estimate` takes the table statistics or the planner's row estimate, `none` skips the count and puts `*`.
 
-        if filter_parameters:
-            for filter_parameter in filter_parameters:
-                key, *value = filter_parameter.split(":", 1)
-
-                # Use this branch if we detect a key value search (key:value) if it is just a single string (value)
-                # treat the key as the value
-                if len(value) > 0:
-                    if key in sa_inspect(self.model).columns.keys():
-                        conditions.append(cast(self.model.__dict__[key], String).ilike("%" + one(value) + "%"))
-                    else:
-                        logger.info(f"Key: not found in database model key={key}, model={self.model}")
-                    query = query.filter(or_(*conditions))
-                else:
-                    if isinstance(value, list):
-                        logger.info("Query parameters set to GET_MANY, ID column only", value=value)
-                        conditions = []
-                        for item in value:
-                            conditions.append(self.model.__dict__["id"] == item)
-                        query = query.filter(or_(*conditions))
-                    else:
-                        for column in sa_inspect(self.model).columns.keys():
-                            conditions.append(cast(self.model.__dict__[column], String).ilike("%" + key + "%"))
-                            query = query.filter(or_(*conditions))
-
-        if sort_parameters and len(sort_parameters):
-            for sort_parameter in sort_parameters:
-                try:
-                    sort_col, sort_order = sort_parameter.split(":")
-                    if sort_col in sa_inspect(self.model).columns.keys():
-                        if sort_order.upper() == "DESC":
-                            query = query.order_by(expression.desc(self.model.__dict__[sort_col]))
-                        else:
-                            query = query.order_by(expression.asc(self.model.__dict__[sort_col]))
-                    else:
-                        logger.debug(f"Sort col does not exist sort_col={sort_col}")
-                except ValueError:
-                    if sort_parameter in sa_inspect(self.model).columns.keys():
-                        query = query.order_by(expression.asc(self.model.__dict__[sort_parameter]))
-                    else:
-                        logger.debug(f"Sort param does not exist sort_parameter={sort_parameter}")
+        With a `cursor` the page is found by keyset instead of `skip`: it starts after the row the cursor points to,
+        in the order of the sort parameters with the id as a tiebreaker, so deep pages cost as much as the first one.
+        An empty cursor starts at the first row. `next_cursor` returns the cursor of the page after.
+
+        With `stream` an unlimited result is not loaded at once: an iterator is returned that fetches the rows
+        `STREAM_CHUNK_SIZE` at a time from a server side cursor. Consume it while the session is open, e.g. in a
+        `StreamingResponse` (see `server.api.streaming`), and don't keep references to the objects: the identity map
+        holds them weakly, so memory use stays constant. The connection stays checked out until it is exhausted.
+
+        `profile` picks the relationships loaded with the rows (see `server.crud.loaders`), per page or per chunk.
+        A `fieldset` (see `server.crud.fieldsets`) replaces it: only its columns and relationships are loaded.
+        """
+        query = self._filter_and_sort(query_parameter, filter_parameters, sort_parameters)
 
         # Generate Content Range Header Values
-        count = query.count()
+        total = count_rows(query, self.model.__tablename__, count)
+        if total is None:
+            total = "*"
+
+        if cursor is not None:
+            columns = self._keyset_columns(sort_parameters)
+            if len(columns) > len(self._sort_columns(sort_parameters)):
+                # The id tiebreaker
+                query = query.order_by(
+                    expression.desc(self.model.id) if columns[-1][1] else expression.asc(self.model.id)
+                )
+            if cursor:
+                query = query.filter(self._after_cursor(columns, cursor))
+            skip = 0
+
+        if fieldset is not None:
+            # The sort columns of a cursor page too, for the cursor of the next page
+            keyset = [column for column, _ in self._keyset_columns(sort_parameters)] if cursor is not None else []
+            query = query.options(*fieldset.loader_options(self.model, keyset))
+        else:
+            query = query.options(*self.loader_options(profile))
 
         if limit:
             # Limit is not 0: use limit
-            response_range = "{}s {}-{}/{}".format(self.model.__name__.lower(), skip, skip + limit, count)
+            response_range = "{}s {}-{}/{}".format(self.model.__name__.lower(), skip, skip + limit, total)
             return query.offset(skip).limit(limit).all(), response_range
         else:
             # Limit is 0: unlimited
-            response_range = "{}s {}/{}".format(self.model.__name__.lower(), skip, count)
+            response_range = "{}s {}/{}".format(self.model.__name__.lower(), skip, total)
+            if stream:
+                return iter(query.offset(skip).yield_per(STREAM_CHUNK_SIZE)), response_range
             return query.offset(skip).all(), response_range
 
     def get_multi_by_shop_id(
@@ -143,6 +307,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         filter_parameters: Optional[List[str]],
         sort_parameters: Optional[List[str]],
         query_parameter: Optional[Any] = None,
+        stream: bool = False,
+        cursor: Optional[str] = None,
+        count: CountMode = CountMode.exact,
+        profile: Optional[LoaderProfile] = None,
+        fieldset: Optional[Fieldset] = None,
     ) -> Tuple[List[ModelType], str]:
         query = query_parameter
         if query is None:
@@ -153,6 +322,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             filter_parameters=filter_parameters,
             sort_parameters=sort_parameters,
             query_parameter=query,
+            stream=stream,
+            cursor=cursor,
+            count=count,
+            profile=profile,
+            fieldset=fieldset,
         )
 
     def create(self, *, obj_in: CreateSchemaType) -> ModelType:
@@ -213,39 +387,37 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return db_obj
 
     def update(self, *, db_obj: ModelType, obj_in: UpdateSchemaType, commit: bool = True) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
-        update_data = obj_in.model_dump(exclude_unset=True)
-
-        # # Handle int based foreign key types:
-        # for k, v in update_data.items():
-        #     if isinstance(v, int):
-        #         update_data[k] = v
+        """Set the fields set in `obj_in` on `db_obj`, and those of its `translation` on its translation.
 
-        # Update translations
-        if "translation" in update_data:
-            translation_data = update_data.pop("translation")
-            translation_name = db_obj.__class__.__name__.split("Table")[0]
-            translation_model = globals().get(translation_name + "TranslationTable", None)
-            translation = (
-                db.session.query(translation_model).filter_by(**{translation_name.lower() + "_id": db_obj.id}).first()
+        Only values that differ are set, so the UPDATE names the changed columns only, and an update that changes
+        nothing is not flushed or committed (unless the session has other changes). Columns with a `server_onupdate`
+        (`modified_at`), which the database doesn't maintain, are set to now when something changed.
+        """
+        update_data = obj_in.model_dump(exclude_unset=True)
+        mapper = sa_inspect(self.model)
+        changed = False
+
+        # Update translations: through the relationship, which is often loaded already
+        translation_data = update_data.pop("translation", None)
+        if translation_data and "translation" in mapper.relationships and db_obj.translation:
+            changed |= _set_changed(
+                db_obj.translation,
+                {field: None if value == "" else value for field, value in translation_data.items()},
             )
-            if translation:
-                for field in translation_data:
-                    if translation_data[field] != "":
-                        setattr(translation, field, translation_data[field])
-                    else:
-                        setattr(translation, field, None)
-                db.session.add(translation)
 
         # Update DB record
-        for field in obj_data:
-            if field != "id" and field in update_data:
-                setattr(db_obj, field, update_data[field])
-
-        db.session.add(db_obj)
+        values = {
+            field: value for field, value in update_data.items() if field in mapper.column_attrs and field != "id"
+        }
+        changed |= _set_changed(db_obj, values)
+        if changed:
+            for attribute in mapper.column_attrs:
+                if attribute.columns[0].server_onupdate is not None and attribute.key not in values:
+                    setattr(db_obj, attribute.key, nowtz())
+            db.session.add(db_obj)
 
         # Set to false if you make two or more updates consecutively
-        if commit:
+        if commit and (changed or db.session.dirty or db.session.new or db.session.deleted):
             db.session.commit()
 
         return db_obj
@@ -277,3 +449,182 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.session.delete(obj)
         db.session.commit()
         return None
+
+    def _translation(self) -> Tuple[Optional[Type[BaseModel]], str]:
+        """Return the translation model of the model, if it has one, and the name of its column with the owner id."""
+        translation_name = self.model.__name__.split("Table")[0]
+        return globals().get(translation_name + "TranslationTable", None), translation_name.lower() + "_id"
+
+    def _dependents(self) -> List[Tuple[Table, Column]]:
+        """Return the tables, and their column with the id of a row, whose rows are deleted along with the row.
+
+        The rows `db.session.delete` removes: the translation, the rows of relationships that cascade deletes and the
+        association rows of many-to-many relationships. Other references are left to the foreign keys.
+        """
+        dependents = {}
+        translation_model, owner_key = self._translation()
+        if translation_model is not None:
+            dependents[translation_model.__table__.c[owner_key]] = translation_model.__table__
+        for relationship in sa_inspect(self.model).relationships:
+            if relationship.viewonly:
+                continue
+            if relationship.secondary is not None:
+                for _, column in relationship.synchronize_pairs:
+                    dependents[column] = relationship.secondary
+            elif relationship.direction is ONETOMANY and relationship.cascade.delete:
+                for _, column in relationship.local_remote_pairs:
+                    dependents[column] = column.table
+        return [(table, column) for column, table in dependents.items()]
+
+    def _raise_catalog_version(self, shop_id: UUID) -> None:
+        # The bulk writes skip the flush that raises it for the other writes, see `server.crud.catalog`
+        if issubclass(self.model, CATALOG_MODELS):
+            raise_catalog_versions(db.session, [shop_id])
+
+    def create_many(self, *, shop_id: UUID, objs_in: Sequence[CreateSchemaType]) -> List[UUID]:
+        """Create the rows of `objs_in` and their translations in one transaction, returning the new ids in order.
+
+        The rows are written with one multi-row `INSERT` and the translations with one more (per 1000 rows), instead of
+        a few round trips per row like `create_by_shop_id`. The ids are generated here: with ids from the database's
+        default, the rows of an `INSERT ... RETURNING` can't be matched to the items and go in one at a time.
+        """
+        if not objs_in:
+            return []
+        rows, translations = [], []
+        for obj_in in objs_in:
+            obj_in_data = transform_json(obj_in.model_dump())
+            translations.append(obj_in_data.pop("translation", None))
+            rows.append({**obj_in_data, "id": uuid4(), "shop_id": shop_id})
+
+        translation_model, owner_key = self._translation()
+        try:
+            db.session.execute(insert(self.model), rows)
+            ids = [row["id"] for row in rows]
+            translation_rows = [
+                {**{field: None if value == "" else value for field, value in translation_data.items()}, owner_key: id}
+                for id, translation_data in zip(ids, translations)
+                if translation_data
+            ]
+            if translation_model is not None and translation_rows:
+                db.session.execute(insert(translation_model), translation_rows)
+            self._raise_catalog_version(shop_id)
+            db.session.commit()
+        except:
+            db.session.rollback()
+            raise
+        count_cache.invalidate(self.model.__tablename__)
+        return ids
+
+    def update_many(self, *, shop_id: UUID, objs_in: Sequence[UpdateSchemaType]) -> None:
+        """Update the rows of `objs_in`, each with the `id` of a row of the shop, in one transaction.
+
+        Like `update`, only the fields set in an item are written, and its `translation` updates the translation. The
+        rows are written with one executemany `UPDATE` per set of fields. Raises NotFound, and writes nothing, when an
+        id is no row of the shop. Rows can't be moved to another shop.
+        """
+        if not objs_in:
+            return
+        ids = {obj_in.id for obj_in in objs_in}
+        found = db.session.scalars(select(self.model.id).where(self.model.shop_id == shop_id, self.model.id.in_(ids)))
+        if len(set(found)) != len(ids):
+            raise NotFound
+
+        columns = sa_inspect(self.model).columns.keys()
+        rows: Dict[frozenset, List[Dict[str, Any]]] = defaultdict(list)
+        translation_rows: Dict[frozenset, List[Dict[str, Any]]] = defaultdict(list)
+        for obj_in in objs_in:
+            update_data = obj_in.model_dump(exclude_unset=True)
+            translation_data = update_data.pop("translation", None)
+            update_data = {
+                field: value for field, value in update_data.items() if field in columns and field != "shop_id"
+            }
+            if translation_data:
+                translation_data = {field: None if value == "" else value for field, value in translation_data.items()}
+                translation_rows[frozenset(translation_data)].append({**translation_data, "owner_id": obj_in.id})
+            if len(update_data) > 1:
+                rows[frozenset(update_data)].append(update_data)
+
+        translation_model, owner_key = self._translation()
+        try:
+            for batch in rows.values():
+                # By primary key: the `id` of each row
+                db.session.execute(sa_update(self.model), batch)
+            if translation_model is not None:
+                table = translation_model.__table__
+                for batch in translation_rows.values():
+                    db.session.execute(sa_update(table).where(table.c[owner_key] == bindparam("owner_id")), batch)
+            self._raise_catalog_version(shop_id)
+            db.session.commit()
+        except:
+            db.session.rollback()
+            raise
+        # Filtered counts change with the values
+        tables = [self.model.__tablename__]
+        if translation_model is not None and translation_rows:
+            tables.append(translation_model.__tablename__)
+        count_cache.invalidate(*tables)
+
+    def delete_many(self, *, shop_id: UUID, ids: Sequence[UUID]) -> None:
+        """Delete the rows of the shop with `ids`, and the rows that go with them (see `_dependents`), in one transaction.
+
+        One `DELETE` per table. Raises NotFound, and deletes nothing, when an id is no row of the shop.
+        """
+        ids = set(ids)
+        if not ids:
+            return
+        found = db.session.scalars(select(self.model.id).where(self.model.shop_id == shop_id, self.model.id.in_(ids)))
+        if len(set(found)) != len(ids):
+            raise NotFound
+
+        dependents = self._dependents()
+        try:
+            for table, column in dependents:
+                db.session.execute(sa_delete(table).where(column.in_(ids)))
+            db.session.execute(sa_delete(self.model).where(self.model.id.in_(ids)))
+            self._raise_catalog_version(shop_id)
+            db.session.commit()
+        except:
+            db.session.rollback()
+            raise
+        count_cache.invalidate(self.model.__tablename__, *(table.name for table, _ in dependents))
+
+    def last_order_number(self, *, shop_id: UUID, **scope: Any) -> Optional[int]:
+        """Return the highest `order_number` of the rows of the shop with the column values of `scope`, if any.
+
+        An index-only scan of the end of the model's order index, e.g. `ix_products_shop_id_category_id_order_number`.
+        """
+        return db.session.scalar(select(func.max(self.model.order_number)).filter_by(shop_id=shop_id, **scope))
+
+    def reorder(self, *, shop_id: UUID, ids: Sequence[UUID], **scope: Any) -> int:
+        """Put the rows of the shop with the column values of `scope` in the order of `ids`, in one transaction.
+
+        `ids` has to list all those rows. They get sparse order numbers (see `server.crud.ordering`), so usually only
+        the moved rows change; they are written with one `UPDATE ... FROM (VALUES ...)`. Returns the number of rows
+        written. Raises NotFound when an id is no such row and ValueError when `ids` lists a row twice or misses one.
+        """
+        current = dict(
+            db.session.execute(select(self.model.id, self.model.order_number).filter_by(shop_id=shop_id, **scope)).all()
+        )
+        if any(id not in current for id in ids):
+            raise NotFound
+        if len(set(ids)) != len(ids) or len(ids) != len(current):
+            raise ValueError("The order has to list every row once")
+
+        order_numbers = sparse_order_numbers([current[id] for id in ids])
+        changed = [(id, number) for id, number in zip(ids, order_numbers) if number != current[id]]
+        if not changed:
+            return 0
+        table = self.model.__table__
+        order = values(
+            column("id", table.c.id.type), column("order_number", table.c.order_number.type), name="new_order"
+        ).data(changed)
+        try:
+            db.session.execute(
+                sa_update(table).where(table.c.id == order.c.id).values(order_number=order.c.order_number)
+            )
+            self._raise_catalog_version(shop_id)
+            db.session.commit()
+        except:
+            db.session.rollback()
+            raise
+        return len(changed)
@@ -0,0 +1,195 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Catalog versions of the shops and the snapshots of their storefront price lists.
+
+The price list of a shop (`GET /shops/{shop_id}/prices`) serializes every product with its translation, category,
+tags and attributes, which takes long for a big shop while the catalog rarely changes. The serialized list is kept in
+`catalog_snapshots` per shop and language, with the `catalog_version` of the shop it was built from.
+
+Every flush that writes what the storefront shows (products with their translations, attribute values and tag links,
+categories, tags and attributes with their translations, attribute options, and the VAT rates and config of the shop)
+raises the `catalog_version` of the shops involved, in the same transaction. Core statements do not flush: the bulk
+writes of `CRUDBase` and other Core writes to these tables call `raise_catalog_versions` themselves.
+A snapshot of an older version is rebuilt by the first request that reads it, or ahead of time by
+`server/scripts/rebuild_catalog.py`. The version is also the ETag of the catalog endpoints, see `server.api.conditional`.
+"""
+
+from collections import defaultdict
+from itertools import chain
+from typing import Any, Dict, Iterable, Optional, Sequence, Set, Tuple, Type
+from uuid import UUID
+
+from sqlalchemy import and_, event, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.inspection import inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from server.api.compression import STORED_LEVELS, compress
+from server.db import db
+from server.db.models import (
+    AttributeOptionTable,
+    AttributeTable,
+    AttributeTranslationTable,
+    CatalogSnapshotTable,
+    CategoryTable,
+    CategoryTranslationTable,
+    ProductAttributeValueTable,
+    ProductTable,
+    ProductToTagTable,
+    ProductTranslationTable,
+    ShopTable,
+    TagTable,
+    TagTranslationTable,
+)
+
+# Catalog rows, by their shop
+CATALOG_MODELS = (ProductTable, CategoryTable, TagTable, AttributeTable)
+
+# Rows the price list shows with a catalog row, by the foreign key of that row
+CATALOG_CHILDREN: Dict[Type[Any], Tuple[Type[Any], str]] = {
+    ProductTranslationTable: (ProductTable, "product_id"),
+    ProductAttributeValueTable: (ProductTable, "product_id"),
+    ProductToTagTable: (ProductTable, "product_id"),
+    CategoryTranslationTable: (CategoryTable, "category_id"),
+    TagTranslationTable: (TagTable, "tag_id"),
+    AttributeTranslationTable: (AttributeTable, "attribute_id"),
+    AttributeOptionTable: (AttributeTable, "attribute_id"),
+}
+
+# Columns of the snapshot body by its `Content-Encoding`, None for the plain body
+SNAPSHOT_BODIES = {
+    None: CatalogSnapshotTable.body,
+    "zstd": CatalogSnapshotTable.body_zstd,
+    "br": CatalogSnapshotTable.body_br,
+    "gzip": CatalogSnapshotTable.body_gzip,
+}
+
+# Columns of the shop the price list depends on: the tax percentages and the stock toggle of the config
+SHOP_COLUMNS = ("config", "vat_standard", "vat_lower_1", "vat_lower_2", "vat_lower_3", "vat_special", "vat_zero")
+
+
+def raise_catalog_versions(
+    session: Session, shop_ids: Iterable[UUID], parent_ids: Optional[Dict[Type[Any], Set[UUID]]] = None
+) -> None:
+    """Raise the catalog version of `shop_ids` and of the shops of the catalog rows in `parent_ids`.
+
+    Also sets their `catalog_modified_at`, to the start of the transaction.
+    """
+    conditions = []
+    shop_ids = [shop_id for shop_id in shop_ids if shop_id is not None]
+    if shop_ids:
+        conditions.append(ShopTable.id.in_(shop_ids))
+    for parent, ids in (parent_ids or {}).items():
+        conditions.append(ShopTable.id.in_(select(parent.shop_id).where(parent.id.in_(ids))))
+    if not conditions:
+        return
+    shops = ShopTable.__table__
+    session.connection().execute(
+        update(shops)
+        .where(or_(*conditions))
+        .values(catalog_version=shops.c.catalog_version + 1, catalog_modified_at=func.now())
+    )
+
+
+def _shop_changed(shop: ShopTable) -> bool:
+    state = sa_inspect(shop)
+    return any(state.attrs[column].history.has_changes() for column in SHOP_COLUMNS)
+
+
+@event.listens_for(Session, "after_flush")
+def _raise_catalog_versions(session: Session, flush_context: Any) -> None:
+    shop_ids = set()
+    parent_ids: Dict[Type[Any], Set[UUID]] = defaultdict(set)
+    for instance in chain(session.new, session.dirty, session.deleted):
+        if isinstance(instance, CATALOG_MODELS):
+            shop_ids.add(instance.shop_id)
+        elif type(instance) in CATALOG_CHILDREN:
+            parent, key = CATALOG_CHILDREN[type(instance)]
+            if (parent_id := getattr(instance, key)) is not None:
+                parent_ids[parent].add(parent_id)
+        elif isinstance(instance, ShopTable) and instance in session.dirty and _shop_changed(instance):
+            shop_ids.add(instance.id)
+    raise_catalog_versions(session, shop_ids, parent_ids)
+
+
+def catalog_snapshot(shop_id: UUID, lang: str, encoding: Optional[str] = None) -> Tuple[Optional[int], Optional[bytes]]:
+    """Return the catalog version of the shop and its snapshot in `lang` when that is of this version.
+
+    The snapshot is compressed with `encoding`, if given: a snapshot that is not compressed with it yet is compressed
+    now and stored (see `store_snapshot_encoding`). It is None when it is missing or older, both are None when there
+    is no such shop.
+    """
+    body_column = SNAPSHOT_BODIES[encoding]
+    row = db.session.execute(
+        # Only one body is read: the compressed one, or the plain one to compress when there is none yet
+        select(
+            ShopTable.catalog_version,
+            CatalogSnapshotTable.version,
+            func.coalesce(body_column, CatalogSnapshotTable.body),
+            body_column.is_(None),
+        )
+        .outerjoin(
+            CatalogSnapshotTable, and_(CatalogSnapshotTable.shop_id == ShopTable.id, CatalogSnapshotTable.lang == lang)
+        )
+        .where(ShopTable.id == shop_id)
+    ).first()
+    if row is None:
+        return None, None
+    catalog_version, version, body, missing = row
+    if version != catalog_version:
+        return catalog_version, None
+    if missing:
+        body = store_snapshot_encoding(shop_id, lang, version, encoding, body)
+    return catalog_version, body
+
+
+def store_catalog_snapshot(
+    shop_id: UUID, lang: str, version: int, body: bytes, encodings: Sequence[str] = ()
+) -> Dict[Optional[str], bytes]:
+    """Store the snapshot of the shop in `lang` built from catalog `version`, unless a newer one was stored meanwhile.
+
+    The body is stored as is and compressed with `encodings`, at the levels for stored responses; the other encodings
+    are compressed by the first request for them. Returns the bodies by encoding. Read the version before the catalog:
+    a write in between then only makes the snapshot look older than it is.
+    """
+    bodies = {None: body, **{encoding: compress(body, encoding, STORED_LEVELS[encoding]) for encoding in encodings}}
+    values = {column.key: bodies.get(encoding) for encoding, column in SNAPSHOT_BODIES.items()}
+    statement = insert(CatalogSnapshotTable).values(shop_id=shop_id, lang=lang, version=version, **values)
+    db.session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[CatalogSnapshotTable.shop_id, CatalogSnapshotTable.lang],
+            set_={"version": version, **values, "built_at": statement.excluded.built_at},
+            where=CatalogSnapshotTable.version <= version,
+        )
+    )
+    db.session.commit()
+    return bodies
+
+
+def store_snapshot_encoding(shop_id: UUID, lang: str, version: int, encoding: str, body: bytes) -> bytes:
+    """Compress the snapshot `body` of catalog `version` with `encoding` and store it, unless it was rebuilt meanwhile.
+
+    Returns the compressed body.
+    """
+    compressed = compress(body, encoding, STORED_LEVELS[encoding])
+    db.session.execute(
+        update(CatalogSnapshotTable)
+        .where(
+            CatalogSnapshotTable.shop_id == shop_id,
+            CatalogSnapshotTable.lang == lang,
+            CatalogSnapshotTable.version == version,
+        )
+        .values({SNAPSHOT_BODIES[encoding].key: compressed})
+    )
+    db.session.commit()
+    return compressed
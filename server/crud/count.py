@@ -0,0 +1,143 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Total row counts for the `Content-Range` header of listings.
+
+`query.count()` wraps the filtered query in a subquery and reads every matching row, which on a big table often
+takes longer than fetching the page. `count_rows` can instead estimate the count from the table statistics or the
+planner, skip it, or serve an exact count from a short lived per process cache.
+"""
+
+from enum import Enum
+from itertools import chain
+from time import monotonic
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from server.db import db
+from server.settings import app_settings
+from server.utils.json import json_loads
+
+
+class CountMode(str, Enum):
+    exact = "exact"
+    estimate = "estimate"
+    none = "none"
+
+
+class CountCache:
+    """Exact counts by table and query fingerprint, kept for `ttl` seconds.
+
+    A flush (or a bulk write of `CRUDBase`) that writes rows of a table drops its counts in this process, so a listing
+    right after a write in the same worker is exact; other workers may show the old count until it expires.
+    """
+
+    max_size = 10_000
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._counts: Dict[Tuple[str, Hashable], Tuple[float, int]] = {}
+
+    def get(self, table: str, fingerprint: Hashable) -> Optional[int]:
+        cached = self._counts.get((table, fingerprint))
+        if cached is None or cached[0] < monotonic():
+            return None
+        return cached[1]
+
+    def set(self, table: str, fingerprint: Hashable, count: int) -> None:
+        if self.ttl <= 0:
+            return
+        if len(self._counts) >= self.max_size:
+            now = monotonic()
+            self._counts = {key: value for key, value in self._counts.items() if value[0] >= now}
+            if len(self._counts) >= self.max_size:
+                self._counts.clear()
+        self._counts[(table, fingerprint)] = (monotonic() + self.ttl, count)
+
+    def invalidate(self, *tables: str) -> None:
+        self._counts = {key: value for key, value in self._counts.items() if key[0] not in tables}
+
+    def clear(self) -> None:
+        self._counts.clear()
+
+
+count_cache = CountCache(ttl=app_settings.COUNT_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_counts(session: Session, flush_context: Any) -> None:
+    tables = {
+        table.name
+        for instance in chain(session.new, session.dirty, session.deleted)
+        if (table := getattr(instance, "__table__", None)) is not None
+    }
+    if tables:
+        count_cache.invalidate(*tables)
+
+
+class Explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` of `statement`, compiled with it so its parameters are bound the way the dialect does."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Any) -> None:
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler: Any, **kw: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _compile(query: Query) -> Any:
+    return query.order_by(None).statement.compile(dialect=db.session.get_bind().dialect)
+
+
+def _fingerprint(compiled: Any) -> Hashable:
+    """The SQL and the parameters (shop id, filters) of the query."""
+    return compiled.string, tuple(sorted((key, repr(value)) for key, value in compiled.params.items()))
+
+
+def estimate_rows(query: Query, table: str) -> int:
+    """Return the row count of an unfiltered `query` from the table statistics, else the planner's estimate."""
+    if query.whereclause is None:
+        reltuples = db.session.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+        )
+        # -1: the table was never vacuumed or analyzed
+        if reltuples is not None and reltuples >= 0:
+            return reltuples
+    plan = db.session.scalar(Explain(query.order_by(None).statement))
+    # Untyped json: parsed by psycopg2, text with asyncpg
+    if isinstance(plan, str):
+        plan = json_loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_rows(query: Query, table: str, mode: CountMode = CountMode.exact) -> Optional[int]:
+    """Return the number of rows of `query` the way `mode` asks, None for `CountMode.none`."""
+    if mode == CountMode.none:
+        return None
+    if mode == CountMode.estimate:
+        return estimate_rows(query, table)
+    if count_cache.ttl <= 0:
+        return query.count()
+    fingerprint = _fingerprint(_compile(query))
+    count = count_cache.get(table, fingerprint)
+    if count is None:
+        count = query.count()
+        count_cache.set(table, fingerprint, count)
+    return count
@@ -13,13 +13,18 @@
 from typing import Optional
 from uuid import UUID
 
+from sqlalchemy.orm import joinedload
+
 from server.crud.base import CRUDBase
+from server.crud.loaders import LoaderProfile
 from server.db.models import CategoryTable
 from server.schemas.category import CategoryCreate, CategoryUpdate
 
 
 class CRUDCategory(CRUDBase[CategoryTable, CategoryCreate, CategoryUpdate]):
-    pass
+    # Every category response shows the translation
+    loader_profiles = {profile: (joinedload(CategoryTable.translation),) for profile in LoaderProfile}
+
     # def get_by_name(self, *, name: str, shop_id: UUID) -> Optional[Category]:
     #     return Category.query.filter(Category.shop_id == shop_id).filter(Category.name == name).first()
 
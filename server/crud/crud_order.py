@@ -12,16 +12,38 @@
 # limitations under the License.
 from uuid import UUID
 
+from sqlalchemy import func, lambda_stmt, select
+from sqlalchemy.orm import joinedload, selectinload
+
 from server.crud.base import CRUDBase
+from server.crud.loaders import LoaderProfile
+from server.db import db
 from server.db.models import OrderTable
 from server.schemas.order import OrderCreate, OrderUpdate
 from server.utils.json import json_dumps
 
 
 class CRUDOrder(CRUDBase[OrderTable, OrderCreate, OrderUpdate]):
+    # The names of the user who completed the order, its account and its shop. Selected per page in lists: the orders
+    # of a page share a few accounts and often one shop
+    loader_profiles = {
+        LoaderProfile.admin_list: (
+            selectinload(OrderTable.user),
+            selectinload(OrderTable.account),
+            selectinload(OrderTable.shop),
+        ),
+        LoaderProfile.detail: (
+            joinedload(OrderTable.user),
+            joinedload(OrderTable.account),
+            joinedload(OrderTable.shop),
+        ),
+    }
+
     def get_newest_order_id(self, *, shop_id: UUID) -> int:
-        order_id = OrderTable.query.filter_by(shop_id=str(shop_id)).count() + 1
-        return order_id
+        order_count = db.session.scalar(
+            lambda_stmt(lambda: select(func.count(OrderTable.id)).where(OrderTable.shop_id == shop_id))
+        )
+        return order_count + 1
 
     def get_all_orders_filtered_by(self, **kwargs):
         order = OrderTable.query.filter_by(**kwargs).all()
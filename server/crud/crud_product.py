@@ -12,22 +12,50 @@
 # limitations under the License.
 from typing import Any, List, Optional, Tuple
 
-from sqlalchemy import or_
-from sqlalchemy.orm import aliased
+from sqlalchemy import desc, or_, select
+from sqlalchemy.orm import aliased, joinedload, lazyload, selectinload
 
 from server.crud.base import CRUDBase
+from server.crud.count import CountMode
+from server.crud.fieldsets import Fieldset
+from server.crud.loaders import LoaderProfile
 from server.db import db
 from server.db.models import (
     AttributeOptionTable,
     AttributeTable,
     AttributeTranslationTable,
+    CategoryTable,
     ProductAttributeValueTable,
     ProductTable,
+    ProductTranslationTable,
+    TagTable,
 )
+from server.db.search import matches, rank, search_query
 from server.schemas.product import ProductCreate, ProductUpdate
 
+# The translation and the attribute values with the name of their attribute and their option, which every product
+# response with attributes shows; `attributes_rel` is shown by none
+_PRODUCT_OPTIONS = (
+    joinedload(ProductTable.translation),
+    selectinload(ProductTable.attribute_values).options(
+        joinedload(ProductAttributeValueTable.attribute).joinedload(AttributeTable.translation),
+        joinedload(ProductAttributeValueTable.option),
+    ),
+    lazyload(ProductTable.attributes_rel),
+)
+
 
 class CRUDProduct(CRUDBase[ProductTable, ProductCreate, ProductUpdate]):
+    loader_profiles = {
+        LoaderProfile.storefront_list: (
+            *_PRODUCT_OPTIONS,
+            selectinload(ProductTable.category).joinedload(CategoryTable.translation),
+            selectinload(ProductTable.tags).joinedload(TagTable.translation),
+        ),
+        LoaderProfile.admin_list: _PRODUCT_OPTIONS,
+        LoaderProfile.detail: _PRODUCT_OPTIONS,
+    }
+
     def get_multi_by_shop_id(
         self,
         *,
@@ -37,6 +65,11 @@ class CRUDProduct(CRUDBase[ProductTable, ProductCreate, ProductUpdate]):
         filter_parameters: Optional[List[str]],
         sort_parameters: Optional[List[str]],
         query_parameter: Optional[Any] = None,
+        stream: bool = False,
+        cursor: Optional[str] = None,
+        count: CountMode = CountMode.exact,
+        profile: Optional[LoaderProfile] = None,
+        fieldset: Optional[Fieldset] = None,
     ) -> Tuple[List[ProductTable], str]:
         query = query_parameter
         if query is None:
@@ -95,6 +128,35 @@ class CRUDProduct(CRUDBase[ProductTable, ProductCreate, ProductUpdate]):
             filter_parameters=filter_parameters,
             sort_parameters=sort_parameters,
             query_parameter=query,
+            stream=stream,
+            cursor=cursor,
+            count=count,
+            profile=profile,
+            fieldset=fieldset,
+        )
+
+    def search_by_shop_id(
+        self, *, shop_id: Any, text: str, skip: int = 0, limit: int = 20, profile: Optional[LoaderProfile] = None
+    ) -> List[ProductTable]:
+        """Return the products of the shop whose translation matches the search `text`, best match first."""
+        query = search_query(text)
+        vector = ProductTranslationTable.search_vector
+        # Rank and page the ids first: sorting every match with all its columns takes longer than the search
+        ranked = (
+            select(ProductTranslationTable.product_id, rank(vector, query).label("rank"))
+            .join(self.model, self.model.id == ProductTranslationTable.product_id)
+            .where(self.model.shop_id == shop_id, matches(vector, query))
+            .order_by(desc("rank"), ProductTranslationTable.product_id)
+            .offset(skip)
+            .limit(limit)
+            .subquery()
+        )
+        return (
+            db.session.query(self.model)
+            .join(ranked, ranked.c.product_id == self.model.id)
+            .options(*self.loader_options(profile))
+            .order_by(ranked.c.rank.desc(), ranked.c.product_id)
+            .all()
         )
 
 
@@ -0,0 +1,98 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Sparse fieldsets of listings: only the requested fields of each row, in SQL and in the response.
+
+`fields=id,price` returns those fields of the listing's schema (the id always), `include=translation` the relationship
+fields listed. The query loads only the columns behind them (`load_only`) and batch loads only the included
+relationships with `selectinload`; every other relationship stays unloaded. The rows are serialized with a schema of
+just those fields. Without either parameter a listing returns its full schema, loaded as before.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from http import HTTPStatus
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy.inspection import inspect as sa_inspect
+from sqlalchemy.orm import lazyload, load_only, selectinload
+
+from server.api.error_handling import raise_status
+
+
+@dataclass(frozen=True)
+class Fieldset:
+    # Schema of the requested fields, in the order of the full schema
+    schema: Type[BaseModel]
+    fields: FrozenSet[str]
+    # Columns behind the fields and relationships to load with them
+    columns: Tuple[str, ...]
+    include: Tuple[str, ...]
+
+    def loader_options(self, model: Any, columns: Iterable[str] = ()) -> Tuple[Any, ...]:
+        """Return the options loading the fieldset of `model` rows, and `columns` besides (e.g. for a cursor)."""
+        return (
+            load_only(*(getattr(model, column) for column in sorted({*self.columns, *columns}))),
+            *(selectinload(getattr(model, relationship)) for relationship in self.include),
+            lazyload("*"),
+        )
+
+
+@lru_cache(maxsize=256)
+def _schema(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{field: (schema.model_fields[field].annotation, schema.model_fields[field]) for field in fields},
+    )
+
+
+def sparse_fieldset(
+    model: Any,
+    schema: Type[BaseModel],
+    fields: Optional[List[str]],
+    include: Optional[List[str]],
+    derived: Optional[Dict[str, Sequence[str]]] = None,
+) -> Optional[Fieldset]:
+    """Return the fieldset of a listing of `model` rows serialized with `schema`, or None for the full schema.
+
+    Schema fields that are a relationship of `model` can only be asked for with `include`, the others with `fields`;
+    `fields` defaults to all of them. `derived` maps the fields an endpoint computes from other columns to those
+    columns, e.g. `images_amount` of products to the image columns. Unknown names give a 400.
+    """
+    if fields is None and include is None:
+        return None
+
+    mapper = sa_inspect(model)
+    relationships = [name for name in schema.model_fields if name in mapper.relationships]
+    attributes = [name for name in schema.model_fields if name not in relationships]
+    for parameter, names, allowed in (("fields", fields, attributes), ("include", include, relationships)):
+        unknown = [name for name in names or [] if name not in allowed]
+        if unknown:
+            raise_status(
+                HTTPStatus.BAD_REQUEST,
+                f"Unknown {parameter}: {', '.join(unknown)}. Choose from: {', '.join(allowed) or 'none'}",
+            )
+
+    primary_key = [column.key for column in mapper.primary_key]
+    selected = {*(attributes if fields is None else fields), *(include or []), *primary_key} & set(schema.model_fields)
+    ordered = tuple(name for name in schema.model_fields if name in selected)
+    columns = {name for name in ordered if name in mapper.column_attrs}
+    for name in ordered:
+        columns.update((derived or {}).get(name, ()))
+    return Fieldset(
+        schema=_schema(schema, ordered),
+        fields=frozenset(ordered),
+        columns=tuple(sorted({*columns, *primary_key})),
+        include=tuple(name for name in ordered if name in relationships),
+    )
@@ -0,0 +1,148 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Compile the `filter` parameters of listings into typed predicates that an index can serve.
+
+`key:value` on a text column is a case insensitive substring match (`ILIKE '%value%'`, served by a trigram index where
+the column has one). On any other column the value is parsed as the column's type and compared as is: no cast, so a
+btree index on the column applies. A suffix on the key picks another operator, like in `_query_with_filters`:
+
+- `total_gt:10`, `total_gte:10`, `total_lt:10`, `total_lte:10`, `status_ne:complete`
+- `status_in:pending,complete`: one of the comma separated values
+- `name_prefix:Sho`: text starting with the value (`ILIKE 'Sho%'`)
+- `completed_at_null:true`: `IS NULL`, or `IS NOT NULL` for `false`
+
+A bare value (no `:`) matches rows where one of the searched text columns of the table contains it (`SEARCH_COLUMNS`,
+all trigram indexed), or whose id it is. Filters are combined with AND. Keys that are no column of the model are left
+to the caller (e.g. the attribute filters of products); a value that doesn't parse as the column's type gives a 400.
+"""
+
+import operator
+from datetime import datetime, timezone
+from functools import cache
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+import structlog
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import Column, String, cast, false, or_
+from sqlalchemy.inspection import inspect as sa_inspect
+from sqlalchemy.sql.elements import ColumnElement
+
+from server.api.error_handling import raise_status
+from server.db.search import SEARCH_COLUMNS
+
+logger = structlog.getLogger()
+
+COMPARISONS: Dict[str, Callable[[Any, Any], Any]] = {
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "ne": operator.ne,
+}
+OPERATORS = {*COMPARISONS, "in", "prefix", "null"}
+
+
+@cache
+def type_adapter(python_type: type) -> TypeAdapter:
+    return TypeAdapter(python_type)
+
+
+def python_type(column: Column) -> Optional[type]:
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return None
+
+
+def is_text(column: Column) -> bool:
+    return isinstance(column.type, String)
+
+
+def like_escape(value: str) -> str:
+    """Escape the LIKE wildcards in `value`, with the default escape character of Postgres."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def parse_value_as(value_type: type, key: str, value: str) -> Any:
+    """Return `value` parsed as `value_type`, a 400 if it isn't one."""
+    try:
+        return type_adapter(value_type).validate_python(value)
+    except ValidationError:
+        raise_status(HTTPStatus.BAD_REQUEST, f"Invalid filter value for {key}: {value}")
+
+
+def parse_value(column: Column, key: str, value: str) -> Any:
+    column_type = python_type(column)
+    if column_type is None or is_text(column):
+        return value
+    parsed = parse_value_as(column_type, key, value)
+    if isinstance(parsed, datetime) and parsed.tzinfo is None:
+        # Timestamps without a zone are UTC, as `UtcTimestamp` columns accept no naive ones
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _condition(column: Column, key: str, op: Optional[str], value: str) -> ColumnElement:
+    if op is None:
+        if is_text(column):
+            return column.ilike(f"%{like_escape(value)}%")
+        if python_type(column) in (dict, list, None):
+            # JSON: there is no typed comparison to offer, match its text as before
+            return cast(column, String).ilike(f"%{like_escape(value)}%")
+        return column == parse_value(column, key, value)
+    if op == "null":
+        return column.is_(None) if parse_value_as(bool, key, value) else column.is_not(None)
+    if op == "in":
+        return column.in_([parse_value(column, key, item) for item in value.split(",")])
+    if op == "prefix":
+        if not is_text(column):
+            raise_status(HTTPStatus.BAD_REQUEST, f"Filter {key} needs a text column")
+        return column.ilike(f"{like_escape(value)}%")
+    return COMPARISONS[op](column, parse_value(column, key, value))
+
+
+def search_condition(model: Any, value: str) -> ColumnElement:
+    """Return a condition matching `value` anywhere in the searched text columns of `model`, or as its id.
+
+    Only indexed columns are OR-ed: one branch without an index makes Postgres scan the whole table.
+    """
+    mapper = sa_inspect(model)
+    conditions = [
+        mapper.columns[name].ilike(f"%{like_escape(value)}%")
+        for name in SEARCH_COLUMNS.get(mapper.local_table.name, ())
+    ]
+    for column in mapper.primary_key:
+        if python_type(column) is UUID:
+            try:
+                conditions.append(column == type_adapter(UUID).validate_python(value))
+            except ValidationError:
+                pass
+    return or_(*conditions) if conditions else false()
+
+
+def compile_filter(model: Any, filter_parameter: str) -> Optional[ColumnElement]:
+    """Return the condition of one `filter` parameter on `model`, None for a key that is no column of it."""
+    key, *value = filter_parameter.split(":", 1)
+    if not value:
+        return search_condition(model, key)
+
+    columns = sa_inspect(model).columns
+    name, op = key, None
+    if key not in columns:
+        name, _, op = key.rpartition("_")
+        if op not in OPERATORS or name not in columns:
+            logger.info(f"Key: not found in database model key={key}, model={model}")
+            return None
+    return _condition(columns[name], key, op, value[0])
@@ -0,0 +1,34 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Named sets of loader options for the read paths of the CRUD classes.
+
+Relationships are lazy by default: serializing a page of N rows that shows a relationship costs N more queries, and a
+relationship of that relationship N more again. A read path asks its CRUD class for a `LoaderProfile` instead, which
+loads everything its responses show up front: one-to-one and many-to-one relationships with `joinedload` (in the same
+query), collections with `selectinload` (one query per page, or per chunk of a stream). A page then costs the same
+number of queries whatever its size.
+
+Each CRUD class maps the profiles it supports to its options in `CRUDBase.loader_profiles`; asking a class for a
+profile it does not define is a programming error and raises a `KeyError`.
+"""
+
+from enum import Enum
+
+
+class LoaderProfile(str, Enum):
+    # Rows of the public catalogue, with everything a storefront shows of them
+    storefront_list = "storefront_list"
+    # Rows of a listing in the admin
+    admin_list = "admin_list"
+    # One row, with everything its detail responses show
+    detail = "detail"
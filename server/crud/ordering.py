@@ -0,0 +1,84 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Sparse `order_number`s of the products of a category and of the categories of a shop.
+
+New rows are appended `ORDER_NUMBER_GAP` after the last one, so a row moved between two others gets a number between
+theirs and nothing else is renumbered. `sparse_order_numbers` numbers a new order of rows that way, keeping the number
+of the rows that stay in place; only when two neighbours have run out of room between them is everything renumbered.
+"""
+
+from bisect import bisect_left
+from itertools import pairwise
+from typing import List, Optional, Sequence
+
+ORDER_NUMBER_GAP = 1024
+
+
+def next_order_number(last: Optional[int]) -> int:
+    """Return the order number of a row appended after the row numbered `last` (None: there are no rows yet)."""
+    return 0 if last is None else last + ORDER_NUMBER_GAP
+
+
+def _kept(numbers: Sequence[Optional[int]]) -> List[int]:
+    """Return the indexes of a longest strictly increasing run of `numbers`, skipping the None's: the rows to keep."""
+    # Patience sorting: the last number of the shortest run of each length, the index it is at and its predecessor
+    tails: List[int] = []
+    tail_indexes: List[int] = []
+    previous: List[Optional[int]] = [None] * len(numbers)
+    for index, number in enumerate(numbers):
+        if number is None:
+            continue
+        length = bisect_left(tails, number)
+        previous[index] = tail_indexes[length - 1] if length else None
+        if length == len(tails):
+            tails.append(number)
+            tail_indexes.append(index)
+        else:
+            tails[length], tail_indexes[length] = number, index
+
+    kept, index = [], tail_indexes[-1] if tail_indexes else None
+    while index is not None:
+        kept.append(index)
+        index = previous[index]
+    return kept[::-1]
+
+
+def sparse_order_numbers(numbers: Sequence[Optional[int]]) -> List[int]:
+    """Return increasing order numbers for rows, in their new order, that are numbered `numbers` now.
+
+    The rows that keep their place relative to each other keep their number; the others get numbers spread between
+    those of their new neighbours, or `ORDER_NUMBER_GAP` apart before the first or after the last kept row. When there
+    is no room between two neighbours, all rows are numbered `ORDER_NUMBER_GAP` apart from 0.
+    """
+    kept = _kept(numbers)
+    if not kept:
+        return [index * ORDER_NUMBER_GAP for index in range(len(numbers))]
+
+    result = list(numbers)
+    for low, high in pairwise([-1, *kept, len(numbers)]):
+        moved = range(low + 1, high)
+        if not moved:
+            continue
+        if low < 0:
+            for offset, index in enumerate(reversed(moved), start=1):
+                result[index] = numbers[high] - offset * ORDER_NUMBER_GAP
+        elif high == len(numbers):
+            for offset, index in enumerate(moved, start=1):
+                result[index] = numbers[low] + offset * ORDER_NUMBER_GAP
+        else:
+            step = (numbers[high] - numbers[low]) // (len(moved) + 1)
+            if step < 1:
+                return [index * ORDER_NUMBER_GAP for index in range(len(numbers))]
+            for offset, index in enumerate(moved, start=1):
+                result[index] = numbers[low] + offset * step
+    return result
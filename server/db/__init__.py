@@ -15,8 +15,10 @@ from typing import Any, cast
 from structlog import get_logger
 
 from server.db.database import BaseModel as DbBaseModel
-from server.db.database import Database, transactional
+from server.db.database import Database, async_transactional, transactional
+from server.db.instrumentation import slow_query_log
 from server.db.models import ProductTable, ShopTable, UtcTimestamp, UtcTimestampException  # noqa: F401
+from server.db.pool import pool_arguments
 from server.settings import AppSettings
 
 logger = get_logger(__name__)
@@ -49,12 +51,37 @@ db = cast(Database, wrapped_db)
 
 # The Global Database is set after calling this function
 def init_database(settings: AppSettings) -> Database:
-    wrapped_db.update(Database(str(settings.DATABASE_URI)))
+    pool_options = pool_arguments(
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        timeout=settings.DATABASE_POOL_TIMEOUT,
+        recycle=settings.DATABASE_POOL_RECYCLE,
+        connection_budget=settings.DATABASE_CONNECTION_BUDGET,
+        workers=settings.MAX_WORKERS,
+        # The async engine opens its own connections to the same server
+        engines=2 if settings.DATABASE_ASYNC_ENABLED else 1,
+    )
+    slow_query_log.configure(
+        threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+        size=settings.SLOW_QUERY_LOG_SIZE,
+        explain=settings.SLOW_QUERY_EXPLAIN,
+    )
+    wrapped_db.update(
+        Database(
+            str(settings.DATABASE_URI),
+            async_enabled=settings.DATABASE_ASYNC_ENABLED,
+            replica_urls=settings.DATABASE_REPLICA_URIS,
+            replica_cooldown=settings.DATABASE_REPLICA_COOLDOWN,
+            pool_options=pool_options,
+            prepare_threshold=settings.DATABASE_PREPARE_THRESHOLD,
+        )
+    )
     return db
 
 
 __all__ = [
     "transactional",
+    "async_transactional",
     "ProductTable",
     "UtcTimestamp",
     "ShopTable",
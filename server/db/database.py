@@ -11,33 +11,51 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from collections.abc import Callable, Generator, Iterator
-from contextlib import contextmanager
+from collections.abc import AsyncGenerator, AsyncIterator, Callable, Generator, Iterator
+from contextlib import asynccontextmanager, contextmanager
 from contextvars import ContextVar
-from typing import Any, ClassVar, cast
+from functools import partial
+from itertools import count
+from time import monotonic
+from typing import Any, ClassVar, NamedTuple, TypeVar, cast
 from uuid import uuid4
 
 import structlog
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy import inspect as sa_inspect
+from sqlalchemy import make_url
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import DeclarativeMeta
 from sqlalchemy.orm import Query, Session, as_declarative, scoped_session, sessionmaker
+from sqlalchemy.orm.attributes import instance_state
 from sqlalchemy.sql.schema import MetaData
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.requests import Request
-from starlette.responses import Response
-from starlette.types import ASGIApp
+from sqlalchemy.sql.selectable import CompoundSelect, Select
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from structlog.stdlib import BoundLogger
 
+from server.db.instrumentation import instrument_engine
+from server.db.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool, pool_metrics
+from server.db.search import matches, search_query
 from server.utils.json import json_dumps, json_loads
 
 logger = structlog.get_logger(__name__)
 
+T = TypeVar("T")
+
 
 class SearchQuery(Query):
     """Custom Query class to have search() property."""
 
-    pass
+    def search(self, value: str) -> "SearchQuery":
+        """Filter on the full-text `search_vector` of the queried model, see `server.db.search`."""
+        entity = self.column_descriptions[0]["entity"]
+        vector = getattr(entity, "search_vector", None)
+        if vector is None:
+            raise ValueError(f"{entity.__name__} has no search_vector to search")
+        return self.filter(matches(vector, search_query(value)))
 
 
 class NoSessionError(RuntimeError):
@@ -57,6 +75,17 @@ class BaseModelMeta(DeclarativeMeta):
         raise NoSessionError("Cant get session. Please, call BaseModel.set_query() first")
 
 
+class _JsonPlan(NamedTuple):
+    columns: frozenset[str]
+    relationships: frozenset[str]
+    include: frozenset[str]
+    exclude: frozenset[str]
+    # Column and relationship keys in mapper order, minus `_json_exclude`
+    loadable: tuple[str, ...]
+    # `_json_include` minus `_json_exclude`
+    included: tuple[str, ...]
+
+
 @as_declarative(metaclass=BaseModelMeta)
 class _Base:
     """SQLAlchemy base class."""
@@ -66,21 +95,56 @@ class _Base:
     _json_include: list = []
     _json_exclude: list = []
 
-    def __json__(self, excluded_keys: set = set()) -> dict:  # noqa: B006
-        ins: Any = sa_inspect(self)
+    @classmethod
+    def _json_plan(cls) -> "_JsonPlan":
+        """Return the keys `__json__` considers for this class, computed once per mapped class."""
+        plan = cls.__dict__.get("_json_plan_cache")
+        if plan is None:
+            mapper: Any = sa_inspect(cls)
+            exclude = frozenset(cls._json_exclude)
+            columns = frozenset(mapper.column_attrs.keys())
+            relationships = frozenset(mapper.relationships.keys())
+            plan = _JsonPlan(
+                columns=columns,
+                relationships=relationships,
+                include=frozenset(cls._json_include),
+                exclude=exclude,
+                loadable=tuple(
+                    key for key in mapper.attrs.keys() if key in columns | relationships and key not in exclude
+                ),
+                included=tuple(key for key in cls._json_include if key not in exclude),
+            )
+            # Set on the class itself: subclasses get their own plan
+            type.__setattr__(cls, "_json_plan_cache", plan)
+        return plan
 
-        columns = set(ins.mapper.column_attrs.keys())
-        relationships = set(ins.mapper.relationships.keys())
+    def __json__(self, excluded_keys: set = set()) -> dict:  # noqa: B006
+        ins: Any = instance_state(self)
+        plan = self._json_plan()
+
+        # Fast path for the common case, a row loaded from the database: serialize what is loaded, straight from the
+        # instance dict, plus `_json_include`. Gives the same keys as the general case below.
+        if ins.persistent and not ins.expired and not excluded_keys:
+            loaded = ins.dict
+            modified = ins.committed_state
+            result = {key: loaded[key] for key in plan.loadable if key in loaded}
+            for key in modified.keys() - loaded.keys():
+                if key in plan.loadable:
+                    result[key] = getattr(self, key)
+            for key in plan.included:
+                result[key] = getattr(self, key)
+            return result
+
+        relationships = plan.relationships
         unloaded = ins.unloaded
         expired = ins.expired_attributes
-        include = set(self._json_include)
-        exclude = set(self._json_exclude) | set(excluded_keys)
+        exclude = plan.exclude | set(excluded_keys)
 
         # This set of keys determines which fields will be present in
         # the resulting JSON object.
         # Here we initialize it with properties defined by the model class,
         # and then add/delete some columns below in a tricky way.
-        keys = columns | relationships
+        keys = plan.columns | relationships
 
         # 1. Remove not yet loaded properties.
         # Basically this is needed to serialize only .join()'ed relationships
@@ -103,7 +167,7 @@ class _Base:
         # That allows you to override those attributes unloaded above.
         # For example, you may include some lazy-loaded relationship() there
         # (which is usually removed at the step 1).
-        keys |= include
+        keys |= plan.include
 
         # 4. For objects in `deleted` or `detached` state, remove all
         # relationships and lazy-loaded attributes, because they require
@@ -150,8 +214,17 @@ class BaseModel(_Base):
         return f"{self.__class__.__name__}({', '.join(attr_vals)})"
 
 
+def _is_read(clause: Any) -> bool:
+    return isinstance(clause, (Select, CompoundSelect)) and clause._for_update_arg is None
+
+
 class WrappedSession(Session):
-    """This Session class allows us to disable commit during steps."""
+    """This Session class allows us to disable commit during steps.
+
+    It also routes reads to the replica engine stored in `info["replica"]`, if any. Flushes, DML, `SELECT ... FOR
+    UPDATE` and anything that is not a plain select go to the primary; from then on the session keeps using the
+    primary, so it reads its own writes.
+    """
 
     def commit(self) -> None:
         if self.info.get("disabled", False):
@@ -161,15 +234,137 @@ class WrappedSession(Session):
         else:
             super().commit()
 
+    def get_bind(self, mapper: Any = None, clause: Any = None, bind: Any = None, **kwargs: Any) -> Any:
+        replica = self.info.get("replica")
+        if replica is not None and bind is None:
+            if not self._flushing and _is_read(clause):
+                return replica
+            del self.info["replica"]
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+class WrappedAsyncSession(AsyncSession):
+    """AsyncSession whose sync facade is a WrappedSession, so `disable_commit` applies to it as well."""
 
+    sync_session_class = WrappedSession
+
+
+# Pool sizes come from the settings, see `server.db.pool.pool_arguments`
 ENGINE_ARGUMENTS = {
     "connect_args": {"connect_timeout": 10, "options": "-c timezone=UTC"},
+    "poolclass": TimedQueuePool,
+    "pool_pre_ping": True,
+    "json_serializer": json_dumps,
+    "json_deserializer": json_loads,
+}
+# asyncpg does not understand the libpq style `connect_timeout` and `options` connect arguments.
+ASYNC_ENGINE_ARGUMENTS = {
+    "connect_args": {"timeout": 10, "server_settings": {"timezone": "UTC"}},
+    "poolclass": TimedAsyncAdaptedQueuePool,
     "pool_pre_ping": True,
-    "pool_size": 60,
     "json_serializer": json_dumps,
     "json_deserializer": json_loads,
 }
+
+
+def engine_arguments(db_url: str, prepare_threshold: int = 5) -> dict[str, Any]:
+    """Return the `create_engine` arguments for `db_url`.
+
+    With psycopg 3 (`postgresql+psycopg://...`) a statement is prepared server side once a connection has executed it
+    `prepare_threshold` times; later executions skip parsing and planning. 0 disables prepared statements, which is
+    needed behind a pooler in transaction mode such as PgBouncer. psycopg2 never prepares statements.
+
+    An executemany (e.g. the UPDATEs of `CRUDBase.update_many`) is a round trip per row with psycopg2, unless it runs
+    in `values_plus_batch` mode, which sends the rows in pages; psycopg 3 pipelines them.
+    """
+    driver = make_url(db_url).get_driver_name()
+    if driver == "psycopg2":
+        return {**ENGINE_ARGUMENTS, "executemany_mode": "values_plus_batch"}
+    if driver != "psycopg":
+        return ENGINE_ARGUMENTS
+    connect_args = {**ENGINE_ARGUMENTS["connect_args"], "prepare_threshold": prepare_threshold or None}
+    return {**ENGINE_ARGUMENTS, "connect_args": connect_args}
+
+
 SESSION_ARGUMENTS = {"class_": WrappedSession, "autocommit": False, "autoflush": True, "query_cls": SearchQuery}
+ASYNC_SESSION_ARGUMENTS = {"class_": WrappedAsyncSession, "autoflush": True, "query_cls": SearchQuery}
+
+
+def async_database_url(db_url: str) -> str:
+    """Return `db_url` with its driver swapped for asyncpg, e.g. postgresql://... -> postgresql+asyncpg://..."""
+    url = make_url(db_url)
+    return url.set(drivername=f"{url.get_backend_name()}+asyncpg").render_as_string(hide_password=False)
+
+
+class ReplicaSet:
+    """The read replica engines of a `Database`, handed out round-robin.
+
+    Health checks are passive: a replica whose connection fails or drops is skipped for `cooldown` seconds. When no
+    replica is healthy `choose()` returns None and reads go to the primary.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        async_enabled: bool = False,
+        cooldown: float = 30.0,
+        pool_options: dict[str, int] | None = None,
+        prepare_threshold: int = 5,
+    ) -> None:
+        pool_options = pool_options or {}
+        self.engines = [
+            instrument_engine(create_engine(url, **engine_arguments(url, prepare_threshold), **pool_options))
+            for url in urls
+        ]
+        self.async_engines = (
+            [create_async_engine(async_database_url(url), **ASYNC_ENGINE_ARGUMENTS, **pool_options) for url in urls]
+            if async_enabled
+            else []
+        )
+        for async_engine in self.async_engines:
+            instrument_engine(async_engine.sync_engine)
+        self.cooldown = cooldown
+        self._unhealthy_until = [0.0] * len(urls)
+        self._counter = count()
+
+        for index, engine in enumerate(self.engines):
+            event.listen(engine, "handle_error", partial(self._on_error, index))
+        for index, async_engine in enumerate(self.async_engines):
+            event.listen(async_engine.sync_engine, "handle_error", partial(self._on_error, index))
+
+    def choose(self) -> int | None:
+        """Return the index of the next healthy replica."""
+        now = monotonic()
+        for _ in range(len(self.engines)):
+            index = next(self._counter) % len(self.engines)
+            if self._unhealthy_until[index] <= now:
+                return index
+        return None
+
+    def mark_unhealthy(self, index: int) -> None:
+        self._unhealthy_until[index] = monotonic() + self.cooldown
+        logger.warning("Read replica unavailable", replica=str(self.engines[index].url), cooldown=self.cooldown)
+
+    def _on_error(self, index: int, context: ExceptionContext) -> None:
+        # No connection means connecting itself failed
+        if context.is_disconnect or context.connection is None:
+            self.mark_unhealthy(index)
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            engine.dispose()
+        for async_engine in self.async_engines:
+            await async_engine.dispose()
+
+
+class SessionQueryProperty:
+    """Class level `query` property that resolves to a Query on the current `Database.session`."""
+
+    def __init__(self, database: "Database") -> None:
+        self.database = database
+
+    def __get__(self, instance: Any, owner: type) -> SearchQuery:
+        return cast(SearchQuery, self.database.session.query(owner))
 
 
 class Database:
@@ -181,25 +376,147 @@ class Database:
     threading.local(). Contextvar does the right thing with respect to asyncio and behaves similar to threading.local().
     We only store a random string in the contextvar and let scoped session do the heavy lifting. This allows us to
     easily start a new session or get the existing one using the scoped_session mechanics.
+
+    When `async_enabled` is set an asyncpg engine and an ``async_scoped_session`` are built next to the sync ones,
+    sharing the same scopefunc. Code run through :meth:`run_sync` then uses the AsyncSession of the current scope
+    without a threadpool hop.
+
+    With `replica_urls` the sessions of a scope in which `use_replica` is set (the session middleware does that for
+    GET and HEAD requests) read from one of the replicas; see `WrappedSession.get_bind`.
+
+    `pool_options` (pool_size, max_overflow, pool_timeout, pool_recycle) apply to every engine, `prepare_threshold`
+    to the sync engines when they use psycopg 3; see `engine_arguments`.
     """
 
-    def __init__(self, db_url: str) -> None:
+    def __init__(
+        self,
+        db_url: str,
+        async_enabled: bool = False,
+        replica_urls: list[str] | None = None,
+        replica_cooldown: float = 30.0,
+        pool_options: dict[str, int] | None = None,
+        prepare_threshold: int = 5,
+    ) -> None:
+        pool_options = pool_options or {}
         self.request_context: ContextVar[str] = ContextVar("request_context", default="")
-        self.engine = create_engine(db_url, **ENGINE_ARGUMENTS)
+        self.bound_session: ContextVar[WrappedSession | None] = ContextVar("bound_session", default=None)
+        self.use_replica: ContextVar[bool] = ContextVar("use_replica", default=False)
+        self.engine = instrument_engine(
+            create_engine(db_url, **engine_arguments(db_url, prepare_threshold), **pool_options)
+        )
         self.session_factory = sessionmaker(
             bind=self.engine, class_=WrappedSession, autocommit=False, autoflush=True, query_cls=SearchQuery
         )
+        self.replicas = (
+            ReplicaSet(
+                replica_urls,
+                async_enabled=async_enabled,
+                cooldown=replica_cooldown,
+                pool_options=pool_options,
+                prepare_threshold=prepare_threshold,
+            )
+            if replica_urls
+            else None
+        )
 
-        self.scoped_session = scoped_session(self.session_factory, self._scopefunc)
-        BaseModel.set_query(cast(SearchQuery, self.scoped_session.query_property()))
+        self.scoped_session = scoped_session(self._create_session, self._scopefunc)
+
+        self.async_engine = None
+        self.async_scoped_session = None
+        if async_enabled:
+            self.async_engine = create_async_engine(
+                async_database_url(db_url), **ASYNC_ENGINE_ARGUMENTS, **pool_options
+            )
+            instrument_engine(self.async_engine.sync_engine)
+            self.async_session_factory = async_sessionmaker(bind=self.async_engine, **ASYNC_SESSION_ARGUMENTS)
+            self.async_scoped_session = async_scoped_session(self._create_async_session, self._scopefunc)
+
+        BaseModel.set_query(cast(SearchQuery, SessionQueryProperty(self)))
 
     def _scopefunc(self) -> str | None:
         return self.request_context.get()
 
+    def _choose_replica(self) -> int | None:
+        if self.replicas is None or not self.use_replica.get():
+            return None
+        return self.replicas.choose()
+
+    def _create_session(self, **kwargs: Any) -> WrappedSession:
+        session = self.session_factory(**kwargs)
+        if (index := self._choose_replica()) is not None:
+            session.info["replica"] = cast(ReplicaSet, self.replicas).engines[index]
+        return session
+
+    def _create_async_session(self, **kwargs: Any) -> WrappedAsyncSession:
+        session = self.async_session_factory(**kwargs)
+        if (index := self._choose_replica()) is not None:
+            session.sync_session.info["replica"] = cast(ReplicaSet, self.replicas).async_engines[index].sync_engine
+        return session
+
     @property
     def session(self) -> WrappedSession:
+        bound = self.bound_session.get()
+        if bound is not None:
+            return bound
         return self.scoped_session()
 
+    def pool_metrics(self) -> list[dict[str, Any]]:
+        """Metrics of the connection pools of this process: the primary, its async twin and the replicas."""
+        metrics = [pool_metrics("primary", self.engine)]
+        if self.async_engine is not None:
+            metrics.append(pool_metrics("primary-async", self.async_engine.sync_engine))
+        if self.replicas is not None:
+            metrics.extend(
+                pool_metrics(f"replica-{index}", engine) for index, engine in enumerate(self.replicas.engines)
+            )
+            metrics.extend(
+                pool_metrics(f"replica-{index}-async", engine.sync_engine)
+                for index, engine in enumerate(self.replicas.async_engines)
+            )
+        return metrics
+
+    @property
+    def async_session(self) -> WrappedAsyncSession:
+        if self.async_scoped_session is None:
+            raise NoSessionError("No async engine configured. Set DATABASE_ASYNC_ENABLED to use the async session.")
+        return cast(WrappedAsyncSession, self.async_scoped_session())
+
+    async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run the sync function `fn` for an `async def` endpoint without blocking the event loop.
+
+        With an async engine the function runs inside ``AsyncSession.run_sync``: `db.session` and `Model.query`
+        resolve to the sync facade of the scope's AsyncSession and lazy loads are awaited through greenlets, so no
+        threadpool worker is borrowed. Without one the function runs on the sync session in Starlette's threadpool,
+        exactly like a plain `def` endpoint.
+        """
+        if self.async_scoped_session is None:
+            return await run_in_threadpool(fn, *args, **kwargs)
+
+        def bound(session: WrappedSession) -> T:
+            token = self.bound_session.set(session)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.bound_session.reset(token)
+
+        return await self.async_session.run_sync(bound)
+
+    @contextmanager
+    def pipeline(self) -> Iterator[None]:
+        """Run the statements of the block in psycopg 3 pipeline mode.
+
+        The statements are sent without waiting for the result of the previous one, so the block costs about one
+        round trip. That only works for statements that return no rows: no SELECTs and no RETURNING, so no ORM flush
+        of objects with server generated keys or defaults; use Core `insert()`/`update()`/`delete()` with client
+        generated keys. An error of any statement is raised when the block ends. Other drivers run the block as usual.
+        """
+        dbapi_connection = self.session.connection().connection.dbapi_connection
+        if not hasattr(dbapi_connection, "pipeline"):
+            yield
+            return
+        with dbapi_connection.pipeline():
+            yield
+
     @contextmanager
     def database_scope(self, **kwargs: Any) -> Generator["Database", None, None]:
         """Create a new database session (scope).
@@ -218,35 +535,116 @@ class Database:
             self.scoped_session.remove()
             self.request_context.reset(token)
 
+    @asynccontextmanager
+    async def async_database_scope(self, **kwargs: Any) -> AsyncGenerator["Database", None]:
+        """Async variant of :meth:`database_scope` that also tears down the AsyncSession of the scope."""
+        token = self.request_context.set(str(uuid4()))
+        self.scoped_session(**kwargs)
+        try:
+            yield self
+        finally:
+            self.scoped_session.remove()
+            if self.async_scoped_session is not None:
+                await self.async_scoped_session.remove()
+            self.request_context.reset(token)
+
+
+READ_YOUR_WRITES_COOKIE = "read_your_writes"
+READ_YOUR_WRITES_HEADER = b"x-read-your-writes"
+SAFE_METHODS = frozenset({"GET", "HEAD"})
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+# Shared by all middleware instances: two of them in front of the same `Database` must not hand out the same scope id
+_request_scope_ids = count()
+
+
+def _wants_primary(scope: Scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == READ_YOUR_WRITES_HEADER:
+            return True
+        if name == b"cookie" and READ_YOUR_WRITES_COOKIE in cookie_parser(value.decode("latin-1")):
+            return True
+    return False
 
-class DBSessionMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp, database: Database, commit_on_exit: bool = False):
-        super().__init__(app)
+
+class DBSessionMiddleware:
+    """Pure ASGI middleware that gives every HTTP and websocket request its own database scope.
+
+    The scope is opened lazily: only a cheap scope id is stored in the contextvar and no session is created until a
+    handler first touches `db.session` (or `db.async_session`). On the way out the sessions of the scope, if any,
+    are closed. Requests that never use the database (CORS preflights, `/get_my_ip`, ...) therefore cost no more
+    than a contextvar set and reset.
+
+    When the database has read replicas, GET and HEAD requests read from a replica. A successful (2xx) POST, PUT,
+    PATCH or DELETE is answered with a short-lived `read_your_writes` cookie; requests carrying that cookie, or an
+    `X-Read-Your-Writes` header, keep reading from the primary so e.g. the order page right after `POST /orders` sees
+    the new order. The cookie is `SameSite=Lax`, so browsers don't send it along with cross-origin requests: a
+    storefront on another origin has to send the `X-Read-Your-Writes` header itself after a write.
+    """
+
+    def __init__(
+        self, app: ASGIApp, database: Database, commit_on_exit: bool = False, read_your_writes_seconds: int = 10
+    ) -> None:
+        self.app = app
         self.commit_on_exit = commit_on_exit
         self.database = database
+        self.read_your_writes_cookie = (
+            f"{READ_YOUR_WRITES_COOKIE}=1; Max-Age={read_your_writes_seconds}; Path=/; HttpOnly; SameSite=Lax"
+        ).encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        database = self.database
+        request_context = database.request_context
+        token = request_context.set(f"request-{next(_request_scope_ids)}")
+        replica_token = None
+        if database.replicas is not None and scope["type"] == "http":
+            if scope["method"] in SAFE_METHODS:
+                replica_token = database.use_replica.set(not _wants_primary(scope))
+            elif scope["method"] in WRITE_METHODS:
+                send = partial(self._send_with_read_your_writes_cookie, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # Both `remove()` calls are a dict lookup when the handler never created a session for this scope
+            database.scoped_session.remove()
+            if database.async_scoped_session is not None:
+                await database.async_scoped_session.remove()
+            if replica_token is not None:
+                database.use_replica.reset(replica_token)
+            request_context.reset(token)
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        with self.database.database_scope():
-            return await call_next(request)
+    async def _send_with_read_your_writes_cookie(self, send: Send, message: Message) -> None:
+        if message["type"] == "http.response.start" and 200 <= message["status"] < 300:
+            message["headers"] = [*message.get("headers", []), (b"set-cookie", self.read_your_writes_cookie)]
+        await send(message)
 
 
 @contextmanager
-def disable_commit(db: Database, log: BoundLogger) -> Iterator:
+def _commit_disabled(session: Session, log: BoundLogger) -> Iterator:
     restore = True
-    # If `db.session` already has its `commit` method disabled we won't try disabling *and* restoring it again.
-    if db.session.info.get("disabled", False):
+    # If `session` already has its `commit` method disabled we won't try disabling *and* restoring it again.
+    if session.info.get("disabled", False):
         restore = False
     else:
         log.debug("Temporarily disabling commit.")
-        db.session.info["disabled"] = True
-        db.session.info["logger"] = log
+        session.info["disabled"] = True
+        session.info["logger"] = log
     try:
         yield
     finally:
         if restore:
             log.debug("Re-enabling commit.")
-            db.session.info["disabled"] = False
-            db.session.info["logger"] = None
+            session.info["disabled"] = False
+            session.info["logger"] = None
+
+
+@contextmanager
+def disable_commit(db: Database, log: BoundLogger) -> Iterator:
+    with _commit_disabled(db.session, log):
+        yield
 
 
 @contextmanager
@@ -268,3 +666,23 @@ def transactional(db: Database, log: BoundLogger) -> Iterator:
         # Extra safeguard rollback. If the commit failed there is still a failed transaction open.
         # BTW: without a transaction in progress this method is a pass-through.
         db.session.rollback()
+
+
+@asynccontextmanager
+async def async_transactional(db: Database, log: BoundLogger) -> AsyncIterator:
+    """Async counterpart of `transactional` operating on `db.async_session`.
+
+    Commits made through the AsyncSession, or through its sync facade inside `db.run_sync`, are disabled for the
+    duration of the block.
+    """
+    session = db.async_session
+    try:
+        with _commit_disabled(session.sync_session, log):
+            yield
+        log.debug("Committing transaction.")
+        await session.commit()
+    except Exception:
+        log.warning("Rolling back transaction.")
+        raise
+    finally:
+        await session.rollback()
@@ -0,0 +1,286 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Per-request SQL statistics, N+1 detection and the slow query log.
+
+`instrument_engine` hooks the cursor execute events of an engine. While a request runs inside
+`SQLInstrumentationMiddleware` every statement is counted and timed, and its fingerprint (the SQL with expanded
+parameter lists collapsed) is tallied. The same fingerprint showing up many times in one request is the classic N+1:
+a lazy load per row of a list endpoint.
+
+Statements slower than the threshold of `slow_query_log` are kept, with their plan, in a ring buffer.
+"""
+
+import re
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import partial
+from time import monotonic, perf_counter
+from typing import Any
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExecutionContext
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = structlog.get_logger(__name__)
+
+_PARAMETER = r"(?:%\(\w+\)s|\$\d+)(?:::\w+)?"
+_PARAMETER_LIST = re.compile(rf"\(\s*{_PARAMETER}(?:\s*,\s*{_PARAMETER})*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class NPlusOneError(AssertionError):
+    """Raised in strict mode when a request repeats one statement more often than allowed."""
+
+
+def fingerprint(statement: str) -> str:
+    """Normalise `statement` so e.g. `IN (...)` lists of different length compare equal."""
+    return _WHITESPACE.sub(" ", _PARAMETER_LIST.sub("(...)", statement)).strip()
+
+
+class RequestStats:
+    """The SQL statements of one request."""
+
+    def __init__(self, scope: Scope | None = None, strict: bool = False, threshold: int = 10) -> None:
+        self.scope = scope
+        self.strict = strict
+        self.threshold = threshold
+        self.statements = 0
+        self.duration = 0.0
+        self.fingerprints: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.statements += 1
+        self.duration += duration
+        key = fingerprint(statement)
+        self.fingerprints[key] += 1
+        if self.strict and self.fingerprints[key] == self.threshold + 1:
+            raise NPlusOneError(f"Statement issued more than {self.threshold} times in one request: {key}")
+
+    @property
+    def max_repeats(self) -> int:
+        return max(self.fingerprints.values(), default=0)
+
+    def repeated(self, minimum: int = 2) -> dict[str, int]:
+        return {key: amount for key, amount in self.fingerprints.most_common(5) if amount >= minimum}
+
+
+request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+_SENSITIVE_PARAMETER = re.compile(r"password|secret|token|key|hash|email|iban", re.IGNORECASE)
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "VALUES")
+
+
+def _redact_value(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, str) and len(value) > 100:
+        return f"{value[:100]}..."
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Make bound parameters safe to show: secrets are masked, long strings and binary values shortened."""
+    if isinstance(parameters, dict):
+        return {
+            key: "<redacted>" if _SENSITIVE_PARAMETER.search(key) else _redact_value(value)
+            for key, value in parameters.items()
+        }
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(value) for value in parameters]
+    return _redact_value(parameters)
+
+
+class SlowQueryLog:
+    """Ring buffer with the statements that took longer than `threshold_ms`, newest last.
+
+    A `threshold_ms` of 0 disables the log. With `explain` the plan of a slow statement is captured on the same
+    connection, inside a savepoint that is rolled back, so a failing EXPLAIN cannot break the transaction. The same
+    statement is explained at most once a minute.
+    """
+
+    explain_interval = 60.0
+    explain_timeout_ms = 2000
+
+    def __init__(self, threshold_ms: float = 0, size: int = 100, explain: bool = True) -> None:
+        self.entries: deque[dict[str, Any]] = deque(maxlen=size)
+        self._explained_at: dict[str, float] = {}
+        self.configure(threshold_ms, size, explain)
+
+    def configure(self, threshold_ms: float, size: int = 100, explain: bool = True) -> None:
+        self.threshold = threshold_ms / 1000 if threshold_ms > 0 else None
+        self.explain = explain
+        if size != self.entries.maxlen:
+            self.entries = deque(self.entries, maxlen=size)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self._explained_at.clear()
+
+    def record(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+        duration: float,
+        stats: RequestStats | None,
+    ) -> None:
+        key = fingerprint(statement)
+        entry: dict[str, Any] = {
+            "timestamp": datetime.now(timezone.utc),
+            "duration_ms": round(duration * 1000, 3),
+            "statement": statement,
+            "fingerprint": key,
+            "parameters": redact_parameters(parameters),
+            "plan": None,
+            "explain_error": None,
+        }
+        scope = stats.scope if stats is not None else None
+        if scope is not None:
+            route = scope.get("route")
+            entry.update(
+                method=scope["method"],
+                path=scope["path"],
+                route=getattr(route, "path", None),
+                path_params={name: str(value) for name, value in scope.get("path_params", {}).items()},
+                query_string=scope["query_string"].decode("latin-1"),
+            )
+
+        now = monotonic()
+        if (
+            self.explain
+            and not executemany
+            and not conn.dialect.is_async
+            and statement.lstrip().upper().startswith(_EXPLAINABLE)
+            and now - self._explained_at.get(key, -self.explain_interval) >= self.explain_interval
+        ):
+            if len(self._explained_at) > 1000:
+                self._explained_at.clear()
+            self._explained_at[key] = now
+            try:
+                entry["plan"] = self._explain(cursor.connection, statement, parameters)
+            except Exception as e:
+                entry["explain_error"] = str(e).strip()
+
+        self.entries.append(entry)
+        logger.warning(
+            "Slow SQL statement",
+            duration_ms=entry["duration_ms"],
+            fingerprint=key[:200],
+            route=entry.get("route"),
+            path_params=entry.get("path_params"),
+        )
+
+    def _explain(self, dbapi_connection: Any, statement: str, parameters: Any) -> Any:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute(f"SET LOCAL statement_timeout = {self.explain_timeout_ms}")
+                cursor.execute(f"EXPLAIN (ANALYZE off, FORMAT JSON) {statement}", parameters)
+                return cursor.fetchone()[0]
+            finally:
+                # Also undoes the SET LOCAL
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        finally:
+            cursor.close()
+
+
+slow_query_log = SlowQueryLog()
+
+
+def _before_cursor_execute(
+    conn: Connection, cursor: Any, statement: str, parameters: Any, context: ExecutionContext, executemany: bool
+) -> None:
+    context._query_start = perf_counter()  # type: ignore[attr-defined]
+
+
+def _after_cursor_execute(
+    conn: Connection, cursor: Any, statement: str, parameters: Any, context: ExecutionContext, executemany: bool
+) -> None:
+    start = getattr(context, "_query_start", None)
+    if start is None:
+        return
+    duration = perf_counter() - start
+    stats = request_stats.get()
+    if slow_query_log.threshold is not None and duration >= slow_query_log.threshold:
+        slow_query_log.record(conn, cursor, statement, parameters, executemany, duration, stats)
+    if stats is not None:
+        stats.record(statement, duration)
+
+
+def instrument_engine(engine: Engine) -> Engine:
+    """Record the statements of `engine` in the stats of the current request and the slow query log. Idempotent."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
+
+class SQLInstrumentationMiddleware:
+    """Pure ASGI middleware collecting `RequestStats` for every HTTP request.
+
+    The summary is logged (as a warning when a statement repeats more than `threshold` times). With `debug_headers`
+    it is also returned as `X-DB-Statements`, `X-DB-Time-Ms` and `X-DB-Max-Repeats` response headers. In `strict` mode,
+    meant for the test suite, the statement that crosses the threshold raises `NPlusOneError`.
+    """
+
+    def __init__(self, app: ASGIApp, debug_headers: bool = False, strict: bool = False, threshold: int = 10) -> None:
+        self.app = app
+        self.debug_headers = debug_headers
+        self.strict = strict
+        self.threshold = threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope, strict=self.strict, threshold=self.threshold)
+        token = request_stats.set(stats)
+        if self.debug_headers:
+            send = partial(self._send_with_headers, stats, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_stats.reset(token)
+            self._log(scope, stats)
+
+    async def _send_with_headers(self, stats: RequestStats, send: Send, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            message["headers"] = [
+                *message.get("headers", []),
+                (b"x-db-statements", str(stats.statements).encode()),
+                (b"x-db-time-ms", f"{stats.duration * 1000:.1f}".encode()),
+                (b"x-db-max-repeats", str(stats.max_repeats).encode()),
+            ]
+        await send(message)
+
+    def _log(self, scope: Scope, stats: RequestStats) -> None:
+        if not stats.statements:
+            return
+        log = logger.warning if stats.max_repeats > self.threshold else logger.debug
+        log(
+            "SQL statements of request",
+            method=scope["method"],
+            path=scope["path"],
+            statements=stats.statements,
+            db_time_ms=round(stats.duration * 1000, 1),
+            repeated=stats.repeated(),
+        )
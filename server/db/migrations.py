@@ -0,0 +1,110 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Bring the database schema to the migration heads at startup.
+
+Importing alembic and loading every revision takes hundreds of milliseconds, and every worker process does it on
+every boot. `upgrade_to_heads` first compares `alembic_version` with the heads read from the revision files as text
+and only runs alembic when they differ, holding an advisory lock so one worker migrates while the others wait.
+"""
+
+import ast
+import re
+from configparser import ConfigParser
+from pathlib import Path
+
+import structlog
+from sqlalchemy import Connection, create_engine, pool, text
+
+logger = structlog.get_logger(__name__)
+
+# Key of the session level advisory lock held while migrating
+MIGRATION_LOCK_ID = 0x73686F70  # "shop"
+
+_REVISION_LINE = re.compile(r"^(revision|down_revision)\s*(?::[^=]+)?=\s*(.+?)\s*$", re.MULTILINE)
+
+
+def version_locations(alembic_ini: str | Path) -> list[Path]:
+    """Return the revision directories configured in `alembic_ini`, without importing alembic."""
+    path = Path(alembic_ini).resolve()
+    parser = ConfigParser(defaults={"here": str(path.parent)})
+    parser.read(path)
+    locations = parser.get("alembic", "version_locations", fallback="").split()
+    if not locations:
+        locations = [str(path.parent / parser.get("alembic", "script_location") / "versions")]
+    return [Path(location) for location in locations]
+
+
+def script_heads(locations: list[Path]) -> set[str]:
+    """Return the head revisions of the revision files in `locations`.
+
+    Only the `revision` and `down_revision` assignments are read, so this stays cheap however long the history gets.
+    """
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for location in locations:
+        for file in location.glob("*.py"):
+            assignments = dict(_REVISION_LINE.findall(file.read_text()))
+            if "revision" not in assignments:
+                continue
+            revisions.add(ast.literal_eval(assignments["revision"]))
+            down_revision = ast.literal_eval(assignments.get("down_revision", "None"))
+            if isinstance(down_revision, str):
+                parents.add(down_revision)
+            elif down_revision:
+                parents.update(down_revision)
+    return revisions - parents
+
+
+def database_heads(connection: Connection) -> set[str]:
+    """Return the revisions in `alembic_version`, nothing for a database that was never migrated."""
+    if connection.scalar(text("SELECT to_regclass('alembic_version')")) is None:
+        return set()
+    return set(connection.scalars(text("SELECT version_num FROM alembic_version")))
+
+
+def upgrade_to_heads(db_url: str, alembic_ini: str | Path = "alembic.ini") -> bool:
+    """Upgrade the database at `db_url` to the migration heads, unless it is already there.
+
+    Returns whether alembic ran. Workers starting at the same time queue on an advisory lock and check again once they
+    hold it, so the migrations run once.
+    """
+    heads = script_heads(version_locations(alembic_ini))
+    engine = create_engine(db_url, poolclass=pool.NullPool)
+    try:
+        with engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            if database_heads(connection) == heads:
+                logger.info("Database schema is up to date", heads=sorted(heads))
+                return False
+
+            logger.info("Waiting for the migration lock", heads=sorted(heads))
+            connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+            try:
+                if database_heads(connection) == heads:
+                    logger.info("Database schema was upgraded by another worker", heads=sorted(heads))
+                    return False
+
+                # Imported here: most boots don't need alembic
+                from alembic import command
+                from alembic.config import Config
+
+                logger.info("Running alembic upgrade heads")
+                config = Config(str(alembic_ini))
+                # The config interpolates values: a literal %, e.g. of an URL encoded password, is written as %%
+                config.set_main_option("sqlalchemy.url", db_url.replace("%", "%%"))
+                command.upgrade(config, "heads")
+                return True
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+    finally:
+        engine.dispose()
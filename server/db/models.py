@@ -20,13 +20,16 @@ import sqlalchemy
 import structlog
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     Column,
+    Computed,
     DateTime,
     Enum,
     Float,
     ForeignKey,
     Integer,
+    LargeBinary,
     String,
     TypeDecorator,
     func,
@@ -35,10 +38,11 @@ from sqlalchemy import (
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.engine import Dialect
 from sqlalchemy.exc import DontWrapMixin
-from sqlalchemy.orm import backref, relationship
+from sqlalchemy.orm import backref, deferred, relationship
 from sqlalchemy_utils import UUIDType
 
 from server.db.database import BaseModel, Database
+from server.db.search import search_vector_sql
 from server.schemas.shop import ShopType
 from server.settings import app_settings
 
@@ -63,7 +67,8 @@ class UtcTimestamp(TypeDecorator):
     """
 
     impl = sqlalchemy.types.TIMESTAMP(timezone=True)
-    cache_ok = False
+    # No constructor arguments, so every instance renders the same SQL: safe for the compiled statement cache
+    cache_ok = True
     python_type = datetime
 
     def process_bind_param(self, value: Optional[datetime], dialect: Dialect) -> datetime | None:
@@ -189,6 +194,9 @@ class ShopTable(BaseModel):
         server_default=text("CURRENT_TIMESTAMP"),
         server_onupdate=text("CURRENT_TIMESTAMP"),
     )
+    # Raised on every write to the storefront catalog of the shop, see `server.crud.catalog`
+    catalog_version = Column(BigInteger, nullable=False, server_default="0")
+    catalog_modified_at = Column(UtcTimestamp, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
     shop_to_category = relationship("CategoryTable", back_populates="shop", cascade="save-update, merge, delete")
 
     def __repr__(self):
@@ -268,6 +276,9 @@ class CategoryTable(BaseModel):
     alt2_image = Column(String(255), index=True)
     translation = relationship("CategoryTranslationTable", back_populates="category", uselist=False)
 
+    # The order of a shop's categories, see `server.crud.ordering`
+    __table_args__ = (sqlalchemy.Index("ix_categories_shop_id_order_number", "shop_id", "order_number"),)
+
     def __repr__(self):
         return f"{self.shop.name}: {self.translation.main_name}"
 
@@ -313,6 +324,9 @@ class OrderTable(BaseModel):
     user = relationship("UserTable", backref=backref("orders", uselist=False))
     account = relationship("Account", backref=backref("accounts", uselist=False))
 
+    # Keyset pagination of the order screens: the orders of a shop by date
+    __table_args__ = (sqlalchemy.Index("ix_orders_shop_id_created_at_id", "shop_id", "created_at", "id"),)
+
     def __repr__(self):
         return "<Order for shop: %s with total: %s>" % (self.shop.name, self.total)
 
@@ -379,6 +393,11 @@ class ProductTable(BaseModel):
         lazy="selectin",
     )
 
+    # The order of a category, and its last `order_number` read from the index alone, see `server.crud.ordering`
+    __table_args__ = (
+        sqlalchemy.Index("ix_products_shop_id_category_id_order_number", "shop_id", "category_id", "order_number"),
+    )
+
     def __repr__(self):
         return f"{self.shop.name}: {self.translation.main_name}"
 
@@ -391,7 +410,7 @@ class ProductTranslationTable(BaseModel):
         primary_key=True,
         index=True,
     )
-    product_id = Column("product_id", UUIDType, ForeignKey("products.id"))
+    product_id = Column("product_id", UUIDType, ForeignKey("products.id"), index=True)
     main_name = Column(String(255), index=True, nullable=False)
     main_description = Column(String(), index=True, nullable=False)
     main_description_short = Column(String(), index=True, nullable=False)
@@ -401,9 +420,20 @@ class ProductTranslationTable(BaseModel):
     alt2_name = Column(String(255), index=True, nullable=True)
     alt2_description = Column(String(), index=True, nullable=True)
     alt2_description_short = Column(String(), index=True, nullable=True)
+    # Full-text search over the names and descriptions, see `server.db.search`. Deferred: only searches need it
+    search_vector = deferred(Column(postgresql.TSVECTOR, Computed(search_vector_sql(), persisted=True)))
 
     product = relationship("ProductTable", back_populates="translation")
 
+    __table_args__ = (
+        sqlalchemy.Index(
+            "ix_product_translations_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_with={"fastupdate": "off"},
+        ),
+    )
+
 
 class ProductToTagTable(BaseModel):
     __tablename__ = "products_to_tags"
@@ -597,3 +627,19 @@ class ProductAttributeValueTable(BaseModel):
             name="uq_pav_product_attribute_option_value",
         ),
     )
+
+
+class CatalogSnapshotTable(BaseModel):
+    """The serialized storefront price list of a shop in one language, see `server.crud.catalog`."""
+
+    __tablename__ = "catalog_snapshots"
+    shop_id = Column(UUIDType, ForeignKey("shops.id", ondelete="CASCADE"), primary_key=True)
+    lang = Column(String(8), primary_key=True)
+    # The `catalog_version` of the shop it was built from
+    version = Column(BigInteger, nullable=False)
+    body = Column(LargeBinary, nullable=False)
+    # The body compressed per `Content-Encoding`, see `server.api.compression`
+    body_zstd = Column(LargeBinary)
+    body_br = Column(LargeBinary)
+    body_gzip = Column(LargeBinary)
+    built_at = Column(UtcTimestamp, nullable=False, server_default=text("CURRENT_TIMESTAMP"))
@@ -0,0 +1,145 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Connection pool sizing and metrics.
+
+Every gunicorn worker has its own pools, so the numbers reported here are per process; the `pid` in the metrics
+tells the workers apart.
+"""
+
+import os
+from collections import deque
+from time import monotonic, perf_counter
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+
+def pool_arguments(
+    pool_size: int,
+    max_overflow: int,
+    timeout: int,
+    recycle: int,
+    connection_budget: int,
+    workers: int,
+    engines: int = 1,
+) -> dict[str, int]:
+    """Return the `create_engine` pool arguments for one engine of one worker process.
+
+    A `pool_size` of 0 sizes the pool automatically: the `workers` processes, each with `engines` engines connected to
+    the same server, together stay within `connection_budget` connections, overflow included.
+    """
+    if not pool_size:
+        per_engine = max(2, connection_budget // (max(1, workers) * max(1, engines)))
+        max_overflow = min(max_overflow, per_engine // 2)
+        pool_size = per_engine - max_overflow
+    return {"pool_size": pool_size, "max_overflow": max_overflow, "pool_timeout": timeout, "pool_recycle": recycle}
+
+
+class PoolStats:
+    """Checkout wait times and connection churn of a pool since the process started."""
+
+    def __init__(self, window: int = 1000) -> None:
+        self.started_at = monotonic()
+        self.waits: deque[float] = deque(maxlen=window)
+        self.checkouts = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+
+    def record_wait(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.waits.append(seconds)
+
+    def on_connect(self, dbapi_connection: Any, connection_record: ConnectionPoolEntry) -> None:
+        self.connects += 1
+
+    def on_close(self, dbapi_connection: Any, *args: Any) -> None:
+        self.closes += 1
+
+    def on_invalidate(self, dbapi_connection: Any, connection_record: ConnectionPoolEntry, exception: Any) -> None:
+        self.invalidations += 1
+
+
+class TimedPoolMixin:
+    """Measures how long `connect()` waits for a connection; the wait includes opening a new one when needed."""
+
+    stats: PoolStats
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # `recreate()` (dispose, invalidation) hands its stats and event listeners to the new pool instead
+        if kwargs.get("_dispatch") is None:
+            self.stats = PoolStats()
+            event.listen(self, "connect", self.stats.on_connect)
+            event.listen(self, "close", self.stats.on_close)
+            event.listen(self, "close_detached", self.stats.on_close)
+            event.listen(self, "invalidate", self.stats.on_invalidate)
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        finally:
+            self.stats.record_wait(perf_counter() - start)
+
+    def recreate(self) -> Any:
+        pool = super().recreate()  # type: ignore[misc]
+        pool.stats = self.stats
+        return pool
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _milliseconds(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def pool_metrics(name: str, engine: Engine) -> dict[str, Any]:
+    """Describe the current state of the pool of `engine`."""
+    pool: Any = engine.pool
+    metrics: dict[str, Any] = {
+        "name": name,
+        "pid": os.getpid(),
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+    }
+
+    stats: PoolStats | None = getattr(pool, "stats", None)
+    if stats is None:
+        return metrics
+
+    waits = sorted(stats.waits)
+    uptime = monotonic() - stats.started_at
+    metrics.update(
+        checkouts=stats.checkouts,
+        avg_wait_ms=_milliseconds(sum(waits) / len(waits) if waits else None),
+        p99_wait_ms=_milliseconds(waits[min(len(waits) - 1, int(len(waits) * 0.99))] if waits else None),
+        max_wait_ms=_milliseconds(waits[-1] if waits else None),
+        connects=stats.connects,
+        closes=stats.closes,
+        invalidations=stats.invalidations,
+        connects_per_minute=round(stats.connects / uptime * 60, 3) if uptime else 0.0,
+        uptime_seconds=round(uptime),
+    )
+    return metrics
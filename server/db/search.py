@@ -0,0 +1,94 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Full-text search over the product translations, and the columns a bare `filter` value searches.
+
+`product_translations.search_vector` is a stored generated tsvector of the names (weight A), short descriptions (B) and
+descriptions (C) of the three languages, each parsed with the text search configuration of its language slot, with a
+GIN index on it. A search is parsed with every configuration and matches when one of them does, so a Dutch word finds
+the Dutch text and an English word the English text.
+
+A bare `filter` value of a listing (see `server.crud.filters`) is an `ILIKE '%value%'` over the `SEARCH_COLUMNS` of the
+table, each with a trigram index, so Postgres can combine the index scans of the branches.
+"""
+
+from sqlalchemy import Text, cast, distinct, func, literal, literal_column, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import TSQUERY
+from sqlalchemy.sql.elements import ColumnElement
+
+# Text search configuration of each language slot of the translations: the languages most shops use, in this order
+# (see `server.mail._map_language`). Changing them needs a migration that regenerates `search_vector`.
+SEARCH_CONFIGS = {"main": "dutch", "alt1": "english", "alt2": "german"}
+
+SEARCH_WEIGHTS = {"name": "A", "description_short": "B", "description": "C"}
+
+# Text columns a bare filter value searches, by table. The trigram indexes on exactly these columns are created by the
+# migration `9d41c7e2b5a3`: changing them needs a migration too. Secrets (passwords, hashes, keys) are never listed.
+SEARCH_COLUMNS = {
+    "accounts": ("name",),
+    "attributes": ("name",),
+    "attribute_options": ("value_key",),
+    "attribute_translations": ("main_name", "alt1_name", "alt2_name"),
+    "faq": ("question",),
+    "orders": ("notes",),
+    "shops": ("name",),
+    "tags": ("name",),
+    "users": ("email", "username", "first_name", "last_name"),
+}
+
+
+def search_vector_sql() -> str:
+    """Return the SQL expression of the generated `search_vector` column of `product_translations`."""
+    return " || ".join(
+        f"setweight(to_tsvector('{config}'::regconfig, coalesce({slot}_{field}, '')), '{weight}')"
+        for slot, config in SEARCH_CONFIGS.items()
+        for field, weight in SEARCH_WEIGHTS.items()
+    )
+
+
+def search_query(value: str) -> ColumnElement:
+    """Return the tsquery of a search box `value`: web search syntax (`"red shirt" -blue`), in every language.
+
+    The parsed queries are OR-ed once per distinct result: most words parse the same in every language, and a repeated
+    query makes both the index scan and the ranking do the work again.
+    """
+    parsed = (
+        func.unnest(
+            postgresql.array(
+                [
+                    func.websearch_to_tsquery(literal_column(f"'{config}'::regconfig"), value)
+                    for config in SEARCH_CONFIGS.values()
+                ]
+            )
+        )
+        .table_valued("query")
+        .render_derived(name="parsed")
+    )
+    query = parsed.c.query
+    return (
+        select(
+            cast(func.string_agg(distinct(literal("(") + cast(query, Text) + literal(")")), literal(" | ")), TSQUERY)
+        )
+        .select_from(parsed)
+        .where(func.numnode(query) > 0)
+        .scalar_subquery()
+    )
+
+
+def matches(vector: ColumnElement, query: ColumnElement) -> ColumnElement:
+    return vector.bool_op("@@")(query)
+
+
+def rank(vector: ColumnElement, query: ColumnElement) -> ColumnElement:
+    """Return the relevance of a match: how often the words of `query` occur, weighted by where (name first)."""
+    return func.ts_rank(vector, query)
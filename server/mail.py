@@ -5,24 +5,32 @@ from email.mime.base import MIMEBase
 from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from functools import singledispatch
+from functools import cache, singledispatch
 from itertools import filterfalse
 from smtplib import SMTP
 from typing import Any, Callable, NoReturn
 from zoneinfo import ZoneInfo
 
-import html2text
-import jinja2
 import structlog
 
 from server.schemas.product import ProductBase
 from server.settings import mail_settings, template_environment
 from server.utils.date_utils import nowtz
+from server.utils.imports import lazy_import
 
 # from formatics.utils.singledispatch import single_dispatch_base
 from server.utils.types import ConfirmationMail, InlineImage, MailAddress, MailAttachment, MailType
 
-loader = jinja2.FileSystemLoader(os.path.join(os.path.dirname(__file__), "mail_templates"))
+html2text = lazy_import("html2text")
+jinja2 = lazy_import("jinja2")
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "mail_templates")
+
+
+@cache
+def template_loader() -> "jinja2.FileSystemLoader":
+    return jinja2.FileSystemLoader(TEMPLATE_DIR)
+
 
 logger = structlog.get_logger(__name__)
 
@@ -36,8 +44,8 @@ IMAGES_SHOP_VIRGE = [
 ]
 
 
-def get_template_for_product_summary(filename: str) -> jinja2.Template:
-    env = template_environment(loader)
+def get_template_for_product_summary(filename: str) -> "jinja2.Template":
+    env = template_environment(template_loader())
     return env.get_template(
         f"product_types/{filename}",
         globals={
@@ -185,7 +193,7 @@ def make_mime_mail(
 def _generate_mail_intro_for_product_info(
     contact_names: str, product: ProductBase, language: str, summary: str, date: datetime
 ) -> str:
-    env = template_environment(loader)
+    env = template_environment(template_loader())
     template_file = "mail_intro_product_info.html.j2"
     template = env.get_template(f"{language.lower()}/{template_file}")
     return template.render(
@@ -199,7 +207,7 @@ def _generate_mail_intro_for_product_info(
 # def _generate_mail_intro_for_create_workflow(
 #     contact_names: str, model: SubscriptionModel, language: str, summary: str, date: datetime
 # ) -> str:
-#     env = template_environment(loader)
+#     env = template_environment(template_loader())
 #     template_file = "mail_intro_create_workflow.html.j2"
 #     template = env.get_template(os.path.join(language.lower(), template_file))
 #
@@ -215,7 +223,7 @@ def _generate_mail_intro_for_product_info(
 # def _generate_mail_intro_for_modify_workflow(
 #     contact_names: str, model: SubscriptionModel, language: str, summary: str, date: datetime
 # ) -> str:
-#     env = template_environment(loader)
+#     env = template_environment(template_loader())
 #
 #     template = env.get_template(os.path.join(language.lower(), "mail_intro_modify_workflow.html.j2"))
 #     return template.render(
@@ -229,7 +237,7 @@ def _generate_mail_intro_for_product_info(
 # def _generate_mail_intro_for_terminate_workflow(
 #     contact_names: str, model: SubscriptionModel, language: str, summary: str
 # ) -> str:
-#     env = template_environment(loader)
+#     env = template_environment(template_loader())
 #     template = env.get_template(os.path.join(language.lower(), "mail_intro_terminate_workflow.html.j2"))
 #     return template.render(subscription=model.model_dump(), contact_names=contact_names, summary=summary)
 
@@ -500,7 +508,7 @@ def send_order_confirmation_emails(order: Any, shop: Any, account: Any) -> None:
             "completed_at": completed_at_str,
         }
 
-        env = template_environment(loader)
+        env = template_environment(template_loader())
         lang_folder = language.lower()
 
         # Send customer email
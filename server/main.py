@@ -15,23 +15,22 @@
 import logging
 from contextlib import asynccontextmanager
 
-import sentry_sdk
 import structlog
-from alembic import command
-from alembic.config import Config
 from fastapi import Request
 from fastapi.applications import FastAPI
 from pydantic_forms.exception_handlers.fastapi import form_error_handler
 from pydantic_forms.exceptions import FormException
-from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
-from starlette.responses import JSONResponse
 
 from server.api.api import api_router
+from server.api.compression import CompressionMiddleware
 from server.api.error_handling import ProblemDetailException
+from server.api.responses import FastJSONResponse
 from server.db import db, init_database
 from server.db.database import DBSessionMiddleware
+from server.db.instrumentation import SQLInstrumentationMiddleware
+from server.db.migrations import upgrade_to_heads
 from server.exception_handlers.generic_exception_handlers import problem_detail_handler
 from server.settings import app_settings
 
@@ -56,18 +55,17 @@ logger = structlog.get_logger(__name__)
 
 
 def run_migrations():
-    alembic_cfg = Config("alembic.ini")
-    command.upgrade(alembic_cfg, "head")
+    upgrade_to_heads(str(app_settings.DATABASE_URI), "alembic.ini")
 
 
 @asynccontextmanager
 async def lifespan(app_: FastAPI):
-    logger.info("run alembic upgrade head...")
+    logger.info("Check database migrations...")
     run_migrations()
     yield
 
 
-APP_VERSION = "0.2.7"
+APP_VERSION = "0.2.16"
 
 app = FastAPI(
     title="ShopVirge API",
@@ -76,7 +74,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     version=APP_VERSION,
-    default_response_class=JSONResponse,
+    default_response_class=FastJSONResponse,
     # root_path="/backend",
     # servers=[
     #     {"url": "/"},
@@ -84,19 +82,32 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-sentry_sdk.init(
-    dsn=app_settings.SENTRY_DSN,
-    traces_sample_rate=1.0,
-    environment=app_settings.ENVIRONMENT,
-    release=f"shopvirge@{APP_VERSION}",
-)
+if app_settings.SENTRY_DSN:
+    # Without a DSN sentry does nothing, so don't spend the import time on it
+    import sentry_sdk
+    from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
+
+    sentry_sdk.init(
+        dsn=app_settings.SENTRY_DSN,
+        traces_sample_rate=1.0,
+        environment=app_settings.ENVIRONMENT,
+        release=f"shopvirge@{APP_VERSION}",
+    )
 
 init_database(app_settings)
 
 app.include_router(api_router)
 
 app.add_middleware(SessionMiddleware, secret_key=app_settings.SESSION_SECRET)
-app.add_middleware(DBSessionMiddleware, database=db)
+app.add_middleware(
+    DBSessionMiddleware, database=db, read_your_writes_seconds=app_settings.DATABASE_READ_YOUR_WRITES_SECONDS
+)
+app.add_middleware(
+    SQLInstrumentationMiddleware,
+    debug_headers=app_settings.SQL_DEBUG_HEADERS,
+    strict=app_settings.SQL_REPEAT_STRICT,
+    threshold=app_settings.SQL_REPEAT_THRESHOLD,
+)
 origins = app_settings.CORS_ORIGINS.split(",")
 app.add_middleware(
     CORSMiddleware,
@@ -105,14 +116,20 @@ app.add_middleware(
     allow_headers=app_settings.CORS_ALLOW_HEADERS,
     expose_headers=app_settings.CORS_EXPOSE_HEADERS,
 )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=app_settings.COMPRESSION_MINIMUM_SIZE,
+    encodings=app_settings.COMPRESSION_ENCODINGS,
+)
 
 app.add_exception_handler(FormException, form_error_handler)
 app.add_exception_handler(ProblemDetailException, problem_detail_handler)
 
-app.add_middleware(SentryAsgiMiddleware)
+if app_settings.SENTRY_DSN:
+    app.add_middleware(SentryAsgiMiddleware)
 
 
-@app.router.get("/", response_model=str, response_class=JSONResponse, include_in_schema=False)
+@app.router.get("/", response_model=str, response_class=FastJSONResponse, include_in_schema=False)
 def index() -> str:
     return "FastAPI boilerplate backend root"
 
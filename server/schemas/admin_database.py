@@ -0,0 +1,52 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Schemas for the admin database endpoints."""
+
+from datetime import datetime
+from typing import Any, Optional
+
+from server.schemas.base import BoilerplateBaseModel
+
+
+class PoolMetrics(BoilerplateBaseModel):
+    name: str
+    pid: int
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: Optional[int] = None
+    avg_wait_ms: Optional[float] = None
+    p99_wait_ms: Optional[float] = None
+    max_wait_ms: Optional[float] = None
+    connects: Optional[int] = None
+    closes: Optional[int] = None
+    invalidations: Optional[int] = None
+    connects_per_minute: Optional[float] = None
+    uptime_seconds: Optional[int] = None
+
+
+class SlowQuery(BoilerplateBaseModel):
+    timestamp: datetime
+    duration_ms: float
+    statement: str
+    fingerprint: str
+    parameters: Any = None
+    method: Optional[str] = None
+    path: Optional[str] = None
+    route: Optional[str] = None
+    path_params: Optional[dict[str, str]] = None
+    query_string: Optional[str] = None
+    plan: Optional[Any] = None
+    explain_error: Optional[str] = None
@@ -44,6 +44,10 @@ class AttributeUpdate(BoilerplateBaseModel):
     translation: Optional[AttributeTranslationBase] = None
 
 
+class AttributeBulkUpdate(AttributeUpdate):
+    id: UUID
+
+
 class AttributeInDBBase(AttributeBase):
     id: UUID
 
@@ -51,6 +51,10 @@ class CategoryUpdate(CategoryBase):
     pass
 
 
+class CategoryBulkUpdate(CategoryUpdate):
+    id: UUID
+
+
 class CategoryInDBBase(CategoryBase):
     id: UUID
 
@@ -80,6 +80,10 @@ class ProductUpdate(ProductBase):
     modified_at: Optional[datetime] = None
 
 
+class ProductBulkUpdate(ProductUpdate):
+    id: UUID
+
+
 class ProductInDBBase(ProductBase):
     id: UUID
     # created_at: datetime
@@ -39,6 +39,10 @@ class TagUpdate(TagBase):
     pass
 
 
+class TagBulkUpdate(TagUpdate):
+    id: UUID
+
+
 class TagInDBBase(TagBase):
     id: UUID
 
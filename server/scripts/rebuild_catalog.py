@@ -0,0 +1,55 @@
+from typing import List, Optional
+from uuid import UUID
+
+import structlog
+import typer
+from sqlalchemy import select
+
+from server.api.compression import ENCODINGS
+from server.api.endpoints.shop_endpoints.prices import Lang, build_catalog
+from server.crud.catalog import catalog_snapshot, store_catalog_snapshot
+from server.db import db, init_database
+from server.db.models import ShopTable
+from server.settings import app_settings
+
+logger = structlog.get_logger(__name__)
+
+
+def rebuild_catalogs(shop_ids: Optional[List[UUID]] = None, langs: Optional[List[Lang]] = None, force: bool = False):
+    """Build the catalog snapshots that are missing or older than their shop's catalog, or all of them with `force`."""
+    if not shop_ids:
+        shop_ids = db.session.scalars(select(ShopTable.id).order_by(ShopTable.name)).all()
+    built = 0
+    for shop_id in shop_ids:
+        for lang in langs or list(Lang):
+            version, body = catalog_snapshot(shop_id, lang.value)
+            if version is None:
+                logger.warning("Shop not found, skipping", id=shop_id)
+                break
+            if body is not None and not force:
+                logger.info("Catalog snapshot is up to date", id=shop_id, lang=lang.value, version=version)
+                continue
+            # Off the request path, so compressed with every encoding right away
+            bodies = store_catalog_snapshot(shop_id, lang.value, version, build_catalog(shop_id, lang), ENCODINGS)
+            sizes = {encoding or "identity": len(body) for encoding, body in bodies.items()}
+            logger.info("Catalog snapshot built", id=shop_id, lang=lang.value, version=version, sizes=sizes)
+            built += 1
+    return built
+
+
+app = typer.Typer()
+
+
+@app.command()
+def main(
+    shop_id: Optional[List[UUID]] = typer.Option(None, help="Shops to build the snapshots of, all shops by default."),
+    lang: Optional[List[Lang]] = typer.Option(None, help="Languages to build the snapshots in, all by default."),
+    force: bool = typer.Option(False, help="Also rebuild the snapshots that are up to date."),
+):
+    built = rebuild_catalogs(shop_ids=shop_id, langs=lang, force=force)
+    logger.info("Done", built=built)
+
+
+if __name__ == "__main__":
+    init_database(app_settings)
+    app()
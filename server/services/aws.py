@@ -0,0 +1,89 @@
+# Copyright 2024 René Dohmen <acidjunk@gmail.com>
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""boto3 clients and resources, created on first use and cached per process.
+
+Building a boto3 client loads its service model and costs tens of milliseconds, so nothing is created at import time:
+``aws_clients.get("s3_client")`` builds the client the first time and returns the same one afterwards.
+"""
+
+from threading import Lock
+from typing import Any, Callable, Dict
+
+from server.settings import app_settings
+
+AWS_REGION = "eu-central-1"
+
+
+class ClientRegistry:
+    """Named factories of clients; each client is created once, on first use."""
+
+    def __init__(self) -> None:
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._clients: Dict[str, Any] = {}
+        self._lock = Lock()
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        self._factories[name] = factory
+        self._clients.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        try:
+            return self._clients[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._clients:
+                self._clients[name] = self._factories[name]()
+            return self._clients[name]
+
+    def reset(self) -> None:
+        """Forget the created clients, e.g. after the credentials in the settings changed."""
+        with self._lock:
+            self._clients.clear()
+
+
+def _boto3_factory(kind: str, service: str, key_id_setting: str, secret_setting: str) -> Callable[[], Any]:
+    def factory() -> Any:
+        import boto3
+
+        return getattr(boto3, kind)(
+            service,
+            aws_access_key_id=getattr(app_settings, key_id_setting),
+            aws_secret_access_key=getattr(app_settings, secret_setting),
+            region_name=AWS_REGION,
+        )
+
+    return factory
+
+
+aws_clients = ClientRegistry()
+aws_clients.register(
+    "s3", _boto3_factory("resource", "s3", "S3_BUCKET_IMAGES_ACCESS_KEY_ID", "S3_BUCKET_IMAGES_SECRET_ACCESS_KEY")
+)
+aws_clients.register(
+    "s3_client", _boto3_factory("client", "s3", "S3_BUCKET_IMAGES_ACCESS_KEY_ID", "S3_BUCKET_IMAGES_SECRET_ACCESS_KEY")
+)
+aws_clients.register(
+    "s3_client_downloads",
+    _boto3_factory("client", "s3", "S3_BUCKET_DOWNLOADS_ACCESS_KEY_ID", "S3_BUCKET_DOWNLOADS_SECRET_ACCESS_KEY"),
+)
+aws_clients.register(
+    "s3_client_upload",
+    _boto3_factory("client", "s3", "S3_BUCKET_UPLOAD_ACCESS_KEY_ID", "S3_BUCKET_UPLOAD_SECRET_ACCESS_KEY"),
+)
+aws_clients.register(
+    "s3_temporary", _boto3_factory("resource", "s3", "S3_TEMPORARY_ACCESS_KEY_ID", "S3_TEMPORARY_ACCESS_KEY")
+)
+aws_clients.register(
+    "sendMessageLambda", _boto3_factory("client", "lambda", "LAMBDA_ACCESS_KEY_ID", "LAMBDA_SECRET_ACCESS_KEY")
+)
@@ -23,9 +23,10 @@ endpoints share one path.
 from types import ModuleType
 from typing import Any, Dict
 
-import stripe
-
 from server.db.models import Account, ShopTable
+from server.utils.imports import lazy_import
+
+stripe = lazy_import("stripe")
 
 
 class StripeNotConfigured(Exception):
@@ -125,6 +125,15 @@ def test_admin_accounts_list_sets_content_range_header(test_client, account_with
     assert "Content-Range" in response.headers
 
 
+def test_admin_accounts_list_unlimited_is_streamed(test_client, account_with_stripe, account_no_stripe):
+    paged = test_client.get("/admin/accounts?limit=200").json()
+
+    response = test_client.get("/admin/accounts?limit=0")
+    assert response.status_code == 200
+    assert response.headers["Content-Range"].endswith(f"/{len(paged)}")
+    assert response.json() == paged
+
+
 # ---------------------------------------------------------------------------
 # Detail + 404
 # ---------------------------------------------------------------------------
@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+import pytest
+
+from server.db import db
+from server.db.instrumentation import redact_parameters, slow_query_log
+
+
+def test_get_pool_metrics(test_client):
+    # Make sure the pool has handed out at least one connection
+    db.engine.connect().close()
+
+    response = test_client.get("/admin/database/pool")
+    assert HTTPStatus.OK == response.status_code
+
+    metrics = {pool["name"]: pool for pool in response.json()}
+    primary = metrics["primary"]
+    assert primary["checked_out"] >= 1  # The connection of the test transaction
+    assert primary["checkouts"] >= 1
+    assert primary["p99_wait_ms"] >= primary["avg_wait_ms"] >= 0
+    assert primary["connects"] >= 1
+
+
+@pytest.fixture
+def log_all_queries():
+    threshold_ms = (slow_query_log.threshold or 0) * 1000
+    slow_query_log.clear()
+    slow_query_log.configure(threshold_ms=0.001)
+    try:
+        yield slow_query_log
+    finally:
+        slow_query_log.configure(threshold_ms=threshold_ms)
+        slow_query_log.clear()
+
+
+def test_slow_queries(test_client, shop_with_config, product, log_all_queries):
+    # No queries of the test itself: a statement is explained once a minute, the route's one would get no plan
+    shop_id = shop_with_config
+    response = test_client.get(f"/shops/{shop_id}/products/{product}")
+    assert HTTPStatus.OK == response.status_code
+
+    response = test_client.get("/admin/database/slow-queries")
+    assert HTTPStatus.OK == response.status_code
+    entries = [entry for entry in response.json() if entry["route"] == "/shops/{shop_id}/products/{product_id}"]
+    assert entries
+    entry = entries[0]
+    assert entry["method"] == "GET"
+    assert entry["path_params"] == {"shop_id": str(shop_id), "product_id": str(product)}
+    assert entry["explain_error"] is None
+    assert entry["plan"][0]["Plan"]["Node Type"]
+
+    response = test_client.delete("/admin/database/slow-queries")
+    assert HTTPStatus.NO_CONTENT == response.status_code
+    assert not log_all_queries.entries
+
+
+def test_redact_parameters():
+    assert redact_parameters({"name_1": "Shop", "password_1": "hunter2", "image": b"1234"}) == {
+        "name_1": "Shop",
+        "password_1": "<redacted>",
+        "image": "<4 bytes>",
+    }
+    assert redact_parameters(("x" * 150, 1)) == ["x" * 100 + "...", 1]
@@ -167,3 +167,33 @@ def test_update_attribute_valid_data(test_client, shop_with_products_and_attribu
     attr = db.session.query(AttributeTable).get(attr_id)
     assert attr.name == "New Name"
     assert attr.unit == "new unit"
+
+
+def test_attributes_bulk(test_client, shop_with_products_and_attributes):
+    shop_id = shop_with_products_and_attributes["shop_id"]
+
+    new_attrs = [{"name": "Material", "unit": "string"}, {"name": "Weight", "unit": "kg"}]
+    resp = test_client.post(f"/shops/{shop_id}/attributes/bulk", json=new_attrs)
+    assert resp.status_code == HTTPStatus.CREATED
+    attr_ids = resp.json()
+    attrs = [db.session.get(AttributeTable, attr_id) for attr_id in attr_ids]
+    assert [(attr.name, attr.translation.main_name) for attr in attrs] == [
+        ("Material", "Material"),
+        ("Weight", "Weight"),
+    ]
+
+    resp = test_client.put(f"/shops/{shop_id}/attributes/bulk", json=[{"id": attr_ids[1], "unit": "g"}])
+    assert resp.status_code == HTTPStatus.NO_CONTENT
+    db.session.expire_all()
+    assert (attrs[1].name, attrs[1].unit) == ("Weight", "g")
+
+    resp = test_client.request("DELETE", f"/shops/{shop_id}/attributes/bulk", json=attr_ids)
+    assert resp.status_code == HTTPStatus.NO_CONTENT
+    assert db.session.query(AttributeTable).filter(AttributeTable.id.in_(attr_ids)).count() == 0
+
+
+def test_attributes_bulk_duplicate(test_client, shop_with_products_and_attributes):
+    shop_id = shop_with_products_and_attributes["shop_id"]
+
+    resp = test_client.post(f"/shops/{shop_id}/attributes/bulk", json=[{"name": "Material"}, {"name": "Material"}])
+    assert resp.status_code == HTTPStatus.CONFLICT
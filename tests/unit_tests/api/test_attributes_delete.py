@@ -50,3 +50,21 @@ def test_delete_attribute_scoping(test_client, shop_with_products_and_attributes
 
     # Ensure it's still there
     assert db.session.query(AttributeTable).filter_by(id=attr_id).first() is not None
+
+
+def test_bulk_delete_attributes_blocked_by_products(test_client, shop_with_products_and_attributes):
+    ids = shop_with_products_and_attributes
+    shop_id = ids["shop_id"]
+    make_pav(ids["product_id"], ids["attr1_id"], ids["opt1a_id"])
+
+    resp = test_client.request("DELETE", f"/shops/{shop_id}/attributes/bulk", json=[str(ids["attr1_id"])])
+    assert resp.status_code == 409
+    assert resp.json()["detail"]["message"] == "Attributes are in use and cannot be deleted"
+
+
+def test_bulk_delete_attributes_scoping(test_client, shop_with_products_and_attributes):
+    ids = shop_with_products_and_attributes
+
+    resp = test_client.request("DELETE", f"/shops/{ids['other_shop_id']}/attributes/bulk", json=[str(ids["attr1_id"])])
+    assert resp.status_code == 404
+    assert db.session.get(AttributeTable, ids["attr1_id"]) is not None
@@ -1,5 +1,6 @@
 from server.db.models import CategoryTable
 from server.utils.json import json_dumps
+from tests.unit_tests.factories.product import make_product
 
 
 def test_categories_get_multi(shop_with_categories, test_client):
@@ -63,6 +64,47 @@ def test_categories_delete(shop, category, test_client):
     assert response.status_code == 204
 
 
+def category_body(shop_id, name):
+    return {
+        "shop_id": shop_id,
+        "color": "#FFFFFF",
+        "translation": {"main_name": name, "main_description": f"{name} Description", "alt1_name": ""},
+        "main_image": "",
+        "alt1_image": "",
+        "alt2_image": "",
+    }
+
+
+def test_categories_bulk(shop, category, test_client):
+    body = [category_body(shop, "Bulk 1"), category_body(shop, "Bulk 2")]
+    response = test_client.post(f"/shops/{shop}/categories/bulk", data=json_dumps(body))
+    assert response.status_code == 201
+    ids = response.json()
+    categories = [CategoryTable.query.filter_by(id=id).first() for id in ids]
+    assert [category.translation.main_name for category in categories] == ["Bulk 1", "Bulk 2"]
+    assert [category.order_number for category in categories] == [1024, 2048]
+
+    body = [{**category_body(shop, "Updated"), "id": ids[0], "color": "#000000"}]
+    response = test_client.put(f"/shops/{shop}/categories/bulk", data=json_dumps(body))
+    assert response.status_code == 204
+    category = CategoryTable.query.filter_by(id=ids[0]).populate_existing().first()
+    assert (category.color, category.translation.main_name, category.translation.alt1_name) == (
+        "#000000",
+        "Updated",
+        None,
+    )
+
+    response = test_client.request("DELETE", f"/shops/{shop}/categories/bulk", data=json_dumps(ids))
+    assert response.status_code == 204
+    assert CategoryTable.query.filter(CategoryTable.id.in_(ids)).count() == 0
+
+
+def test_categories_bulk_delete_in_use(shop, category, test_client):
+    make_product(shop, category)
+    response = test_client.request("DELETE", f"/shops/{shop}/categories/bulk", data=json_dumps([category]))
+    assert response.status_code == 409
+
+
 # from http import HTTPStatus
 # from uuid import uuid4
 #
@@ -131,3 +173,21 @@ def test_categories_delete(shop, category, test_client):
 #     assert HTTPStatus.NO_CONTENT == response.status_code
 #     categories = test_client.get("/api/categories", headers=superuser_token_headers).json()
 #     assert 1 == len(categories)
+
+
+def test_categories_reorder(shop, test_client):
+    body = [category_body(shop, f"Category {i}") for i in range(3)]
+    ids = test_client.post(f"/shops/{shop}/categories/bulk", data=json_dumps(body)).json()
+    assert [CategoryTable.query.filter_by(id=id).first().order_number for id in ids] == [0, 1024, 2048]
+
+    response = test_client.put(f"/shops/{shop}/categories/reorder", data=json_dumps(ids[::-1]))
+    assert response.status_code == 204
+    categories = CategoryTable.query.filter_by(shop_id=shop).order_by(CategoryTable.order_number).all()
+    assert [str(category.id) for category in categories] == ids[::-1]
+
+    response = test_client.put(f"/shops/{shop}/categories/{ids[0]}/swap?move_up=false", data=json_dumps({}))
+    assert response.status_code == 400
+    response = test_client.put(f"/shops/{shop}/categories/{ids[0]}/swap?move_up=true", data=json_dumps({}))
+    assert response.status_code == 201
+    categories = CategoryTable.query.filter_by(shop_id=shop).order_by(CategoryTable.order_number).all()
+    assert [str(category.id) for category in categories] == [ids[2], ids[0], ids[1]]
@@ -0,0 +1,135 @@
+import gzip
+import json
+
+import brotli
+import pytest
+import zstandard
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from server.api.compression import CompressionMiddleware, negotiate
+from server.db import db
+from server.db.models import CatalogSnapshotTable
+from tests.unit_tests.factories.categories import make_category
+from tests.unit_tests.factories.product import make_product
+
+DECOMPRESS = {
+    "gzip": gzip.decompress,
+    "br": brotli.decompress,
+    "zstd": lambda body: zstandard.ZstdDecompressor().decompressobj().decompress(body),
+}
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, encoding",
+    [
+        (None, None),
+        ("identity", None),
+        ("gzip, deflate", "gzip"),
+        ("gzip, deflate, br, zstd", "zstd"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("zstd;q=0, br", "br"),
+        ("*", "zstd"),
+        ("*, zstd;q=0", "br"),
+        ("deflate", None),
+    ],
+)
+def test_negotiate(accept_encoding, encoding):
+    assert negotiate(accept_encoding) == encoding
+
+
+def test_negotiate_encodings():
+    assert negotiate("gzip, br, zstd", ["gzip", "br"]) == "gzip"
+    assert negotiate("gzip, deflate", ["deflate"]) is None
+    assert negotiate("gzip", []) is None
+
+
+@pytest.fixture()
+def products(shop_with_config):
+    category_id = make_category(shop_id=shop_with_config)
+    for number in range(5):
+        make_product(shop_id=shop_with_config, category_id=category_id, main_name=f"Shirt {number}")
+    return shop_with_config, category_id
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+def test_prices_stored_compressed(test_client, products, encoding):
+    shop_id, _ = products
+    url = f"/shops/{shop_id}/prices/?lang=main"
+    plain = test_client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+
+    response = test_client.get(url, headers={"Accept-Encoding": encoding})
+    assert response.headers["Content-Encoding"] == encoding
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.json() == plain.json()
+
+    snapshot = db.session.get(CatalogSnapshotTable, (shop_id, "main"))
+    stored = getattr(snapshot, f"body_{encoding}")
+    assert int(response.headers["Content-Length"]) == len(stored) < len(snapshot.body)
+    assert DECOMPRESS[encoding](stored) == snapshot.body
+
+
+def test_prices_compressed_per_encoding_requested(test_client, products):
+    shop_id, _ = products
+    url = f"/shops/{shop_id}/prices/?lang=main"
+    assert test_client.get(url, headers={"Accept-Encoding": "br"}).headers["Content-Encoding"] == "br"
+    snapshot = db.session.get(CatalogSnapshotTable, (shop_id, "main"))
+    assert (snapshot.body_br is not None, snapshot.body_gzip, snapshot.body_zstd) == (True, None, None)
+
+    assert test_client.get(url, headers={"Accept-Encoding": "gzip"}).headers["Content-Encoding"] == "gzip"
+    db.session.refresh(snapshot)
+    assert (snapshot.body_gzip is not None, snapshot.body_zstd) == (True, None)
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+def test_compressed_per_request(test_client, products, encoding):
+    shop_id, category_id = products
+    url = f"/shops/{shop_id}/categories/{category_id}/products"
+    plain = test_client.get(url, headers={"Accept-Encoding": "identity"})
+    assert len(plain.content) >= 1000
+    assert plain.headers["Vary"] == "Accept-Encoding"
+
+    response = test_client.get(url, headers={"Accept-Encoding": encoding})
+    assert response.headers["Content-Encoding"] == encoding
+    assert int(response.headers["Content-Length"]) < len(plain.content)
+    assert response.json() == plain.json()
+    assert response.headers["Content-Range"] == plain.headers["Content-Range"]
+
+
+def test_streamed_response_compressed(test_client, products):
+    shop_id, _ = products
+    response = test_client.get(f"/shops/{shop_id}/products/?limit=0", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert len(response.json()) == 5
+
+
+def test_small_and_not_modified_responses_uncompressed(test_client, products):
+    shop_id, _ = products
+    response = test_client.get("/faq/", headers={"Accept-Encoding": "gzip"})
+    assert response.content == b"[]"
+    assert "Content-Encoding" not in response.headers
+
+    url = f"/shops/{shop_id}/categories/{products[1]}/products"
+    etag = test_client.get(url).headers["ETag"]
+    response = test_client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert response.status_code == 304
+    assert "Content-Encoding" not in response.headers
+
+
+def test_strong_etag_weakened():
+    body = json.dumps({"text": "x" * 2000})
+
+    async def endpoint(request):
+        return Response(body, media_type="application/json", headers={"ETag": '"abc"'})
+
+    app = CompressionMiddleware(Starlette(routes=[Route("/", endpoint)]), minimum_size=1000)
+    client = TestClient(app)
+    response = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == 'W/"abc"'
+    assert response.text == body
+    assert client.get("/", headers={"Accept-Encoding": "identity"}).headers["ETag"] == '"abc"'
@@ -0,0 +1,141 @@
+from http import HTTPStatus
+from inspect import iscoroutinefunction
+from uuid import uuid4
+
+import pytest
+
+from server.api.conditional import catalog_version, conditional, etag_matches
+from server.crud.crud_shop import shop_crud
+from server.db import db
+from server.db.models import ProductTable, ShopTable
+from server.settings import app_settings
+from server.utils.json import json_dumps
+
+
+def test_etag_matches():
+    assert etag_matches('W/"7"', 'W/"7"')
+    assert etag_matches('"6", W/"7"', 'W/"7"')
+    assert etag_matches("*", 'W/"7"')
+    assert not etag_matches('W/"6"', 'W/"7"')
+    assert not etag_matches(None, 'W/"7"')
+
+
+def test_dependency_skips_threadpool():
+    # A plain `def` dependency would borrow a threadpool worker and a sync connection in front of async endpoints
+    assert iscoroutinefunction(conditional(catalog_version))
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/shops/{shop_id}/prices/?lang=main",
+        "/shops/{shop_id}/products/{product_id}",
+        "/shops/{shop_id}/products/{product_id}/with_attributes",
+        "/shops/{shop_id}/products/search?q=testing",
+        "/shops/{shop_id}/categories/{category_id}/products",
+    ],
+)
+def test_catalog_not_modified(test_client, shop_with_config, product, url):
+    category_id = db.session.get(ProductTable, product).category_id
+    url = url.format(shop_id=shop_with_config, product_id=product, category_id=category_id)
+    response = test_client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert response.headers["Cache-Control"] == "public, no-cache"
+    assert response.headers["Last-Modified"].endswith(" GMT")
+
+    not_modified = test_client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+    # Only the version
+    assert not_modified.headers["X-DB-Statements"] == "1"
+
+    db.session.get(ProductTable, product).price = 5
+    db.session.commit()
+    response = test_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["ETag"] != etag
+
+
+def test_catalog_unknown_shop(test_client):
+    response = test_client.get(f"/shops/{uuid4()}/prices/?lang=main")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert "ETag" not in response.headers
+    assert test_client.get("/shops/nope/prices/?lang=main").status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_cart_is_not_conditional(test_client, shop_with_config, product):
+    response = test_client.post(
+        f"/shops/{shop_with_config}/prices/?lang=main", data=json_dumps({"products": [product]})
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert "ETag" not in response.headers
+
+
+def test_shop_config_not_modified(test_client, shop_with_config):
+    # The factory's shop type is no valid `ShopType`
+    shop_crud.get(shop_with_config).shop_type = {
+        "max_languages": 3,
+        "max_products": 100,
+        "stripe_access": True,
+        "trial_mode": False,
+        "name": "small",
+    }
+    db.session.commit()
+    url = f"/shops/config/{shop_with_config}"
+    response = test_client.get(url)
+    etag = response.headers["ETag"]
+    assert test_client.get(url, headers={"If-None-Match": etag}).status_code == HTTPStatus.NOT_MODIFIED
+
+    body = {"config": response.json()["config"], "config_version": response.json()["config_version"] + 1}
+    assert test_client.put(url, data=json_dumps(body)).status_code == HTTPStatus.CREATED
+    response = test_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("created_at", ["CURRENT_TIMESTAMP", "NULL"])
+def test_shop_config_never_modified(test_client, shop_with_config, created_at):
+    shop_crud.get(shop_with_config).shop_type = {
+        "max_languages": 3,
+        "max_products": 100,
+        "stripe_access": True,
+        "trial_mode": False,
+        "name": "small",
+    }
+    db.session.commit()
+    db.session.execute(
+        ShopTable.__table__.update()
+        .where(ShopTable.id == shop_with_config)
+        .values(modified_at=None, created_at=None if created_at == "NULL" else ShopTable.created_at)
+    )
+    db.session.commit()
+    response = test_client.get(f"/shops/config/{shop_with_config}")
+    assert response.status_code == HTTPStatus.OK
+    if created_at == "NULL":
+        # No version at all: no ETag rather than one that never changes
+        assert "ETag" not in response.headers
+    else:
+        assert response.headers["ETag"] != 'W/"None"'
+
+
+def test_faq_not_modified(test_client):
+    body = {"question": "Do you ship abroad?", "answer": "Within the EU.", "category": "Shipping"}
+    etag = test_client.get("/faq/").headers["ETag"]
+    assert test_client.get("/faq/", headers={"If-None-Match": etag}).status_code == HTTPStatus.NOT_MODIFIED
+
+    assert test_client.post("/faq", data=json_dumps(body)).status_code == HTTPStatus.CREATED
+    response = test_client.get("/faq/", headers={"If-None-Match": etag})
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()) == 1
+
+
+def test_route_policy_settings(test_client, shop_with_config, product, monkeypatch):
+    monkeypatch.setattr(app_settings, "HTTP_CACHE_CONTROL", {"/shops/{shop_id}/prices/": "public, max-age=60"})
+    monkeypatch.setattr(app_settings, "HTTP_LAST_MODIFIED", {"/shops/{shop_id}/prices/": False})
+    response = test_client.get(f"/shops/{shop_with_config}/prices/?lang=main")
+    assert response.headers["Cache-Control"] == "public, max-age=60"
+    assert "Last-Modified" not in response.headers
+    assert "ETag" in response.headers
@@ -1,7 +1,12 @@
 from http import HTTPStatus
+from importlib import import_module
 
 from server.db.models import ProductTable
+from server.db.search import search_vector_sql
 from server.utils.json import json_dumps
+from tests.unit_tests.factories.categories import make_category
+from tests.unit_tests.factories.product import make_product, make_translated_product
+from tests.unit_tests.factories.shop import make_shop
 
 
 def test_products_get_multi(shop_with_products, test_client):
@@ -115,6 +120,83 @@ def test_products_delete_cascade_cleanup(shop_with_config, product, category, te
     assert db.session.get(AttributeTable, attr_id) is not None
 
 
+def product_body(shop_id, category_id, name):
+    return {
+        "shop_id": shop_id,
+        "category_id": category_id,
+        "price": 1.0,
+        "tax_category": "vat_zero",
+        "max_one": False,
+        "shippable": True,
+        "featured": False,
+        "new_product": False,
+        "translation": {
+            "main_name": name,
+            "main_description": "Bulk Product Test Description",
+            "main_description_short": "Bulk Product Test Description Short",
+            "alt1_name": "",
+        },
+        "image_1": "",
+        "image_2": "",
+        "image_3": "",
+        "image_4": "",
+        "image_5": "",
+        "image_6": "",
+    }
+
+
+def test_products_bulk(shop, category, test_client):
+    from server.db import db
+    from server.db.models import ProductAttributeValueTable, ProductTranslationTable
+    from tests.unit_tests.factories.attribute import make_attribute, make_pav
+
+    product = make_product(shop, category)
+    body = [product_body(shop, category, f"Bulk {i}") for i in range(3)]
+    response = test_client.post(f"/shops/{shop}/products/bulk", data=json_dumps(body))
+    assert response.status_code == HTTPStatus.CREATED, response.json()
+    ids = response.json()
+    products = [db.session.get(ProductTable, id) for id in ids]
+    assert [product.translation.main_name for product in products] == ["Bulk 0", "Bulk 1", "Bulk 2"]
+    assert products[0].translation.alt1_name is None
+    # Appended after the existing product of the category
+    assert [product.order_number for product in products] == [1024, 2048, 3072]
+
+    body = [{**product_body(shop, category, f"Updated {i}"), "id": id, "price": 2.5} for i, id in enumerate(ids[:2])]
+    response = test_client.put(f"/shops/{shop}/products/bulk", data=json_dumps(body))
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    db.session.expire_all()
+    assert [(product.translation.main_name, product.price) for product in products] == [
+        ("Updated 0", 2.5),
+        ("Updated 1", 2.5),
+        ("Bulk 2", 1.0),
+    ]
+    assert products[0].modified_at is not None
+
+    pav_id = make_pav(ids[0], make_attribute(shop, name="size"))
+    response = test_client.request("DELETE", f"/shops/{shop}/products/bulk", data=json_dumps(ids))
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    db.session.expire_all()
+    assert ProductTable.query.filter(ProductTable.id.in_(ids)).count() == 0
+    assert ProductTranslationTable.query.filter(ProductTranslationTable.product_id.in_(ids)).count() == 0
+    assert db.session.get(ProductAttributeValueTable, pav_id) is None
+    assert db.session.get(ProductTable, product) is not None
+
+
+def test_products_bulk_is_all_or_nothing(shop, category, test_client):
+    from server.db import db
+
+    product = make_product(shop, category)
+    other_product = make_product(make_shop(random_shop_name=True), category)
+    body = [{**product_body(shop, category, "Updated"), "id": id} for id in (product, other_product)]
+    response = test_client.put(f"/shops/{shop}/products/bulk", data=json_dumps(body))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert db.session.get(ProductTable, product).translation.main_name != "Updated"
+
+    response = test_client.request("DELETE", f"/shops/{shop}/products/bulk", data=json_dumps([product, other_product]))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert ProductTable.query.filter(ProductTable.id.in_([product, other_product])).count() == 2
+
+
 def test_products_get_multi_with_attributes(test_client, shop_with_products_and_attributes):
     ids = shop_with_products_and_attributes
     shop_id = ids["shop_id"]
@@ -243,3 +325,67 @@ def test_products_get_multi_with_attributes_mutually_exclusive_filters(test_clie
     )
     assert response.status_code == 400
     assert "Only one filter may be used at a time" in response.json()["detail"]["message"]
+
+
+def test_products_search(shop, category, test_client):
+    in_description = make_product(
+        shop_id=shop, category_id=category, main_name="Kussen", main_description="Rode stoelen van hout"
+    )
+    in_name = make_product(shop_id=shop, category_id=category, main_name="Rode stoel")
+    make_product(shop_id=shop, category_id=category, main_name="Blauwe stoel")
+    other_shop = make_shop(random_shop_name=True)
+    make_product(shop_id=other_shop, category_id=make_category(shop_id=other_shop), main_name="Rode stoel")
+
+    response = test_client.get(f"/shops/{shop}/products/search", params={"q": "rode stoel"})
+    assert response.status_code == HTTPStatus.OK
+    # A match in the name ranks above a match in the description
+    assert [product["id"] for product in response.json()] == [str(in_name), str(in_description)]
+
+    response = test_client.get(f"/shops/{shop}/products/search", params={"q": "stoel -blauwe"})
+    assert {product["id"] for product in response.json()} == {str(in_name), str(in_description)}
+
+
+def test_products_search_alt_languages(shop, category, test_client):
+    product = make_translated_product(shop_id=shop, category_id=category)
+
+    for q in ["beschrijving", "Kurzbeschreibung", "testing"]:
+        response = test_client.get(f"/shops/{shop}/products/search", params={"q": q})
+        assert [item["id"] for item in response.json()] == [str(product)], q
+    assert test_client.get(f"/shops/{shop}/products/search", params={"q": "bicycle"}).json() == []
+    assert test_client.get(f"/shops/{shop}/products/search").status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_search_vector_migration_matches_model():
+    migration = import_module("migrations.versions.schema.2026-10-18_b7e3f09a4c18_add_product_search_vector")
+    assert " ".join(migration.SEARCH_VECTOR.split()) == search_vector_sql()
+
+
+def test_products_reorder(shop, category, test_client):
+    from server.db import db
+    from tests.unit_tests.test_update import statements, writes
+
+    body = [product_body(shop, category, f"Product {i}") for i in range(4)]
+    ids = test_client.post(f"/shops/{shop}/products/bulk", data=json_dumps(body)).json()
+    url = f"/shops/{shop}/products/reorder?category_id={category}"
+
+    # The last product dragged to second place: only its order number changes, in one statement
+    order = [ids[0], ids[3], ids[1], ids[2]]
+    with statements() as executed:
+        response = test_client.put(url, data=json_dumps(order))
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    [update, catalog_version] = writes(executed)
+    assert update.startswith("UPDATE products SET order_number=new_order.order_number FROM (VALUES ")
+    assert catalog_version.startswith("UPDATE shops SET catalog_version=")
+    db.session.expire_all()
+    products = [db.session.get(ProductTable, id) for id in order]
+    assert [product.order_number for product in products] == [0, 512, 1024, 2048]
+
+    response = test_client.put(f"/shops/{shop}/products/{ids[3]}/swap?move_up=false", data=json_dumps({}))
+    assert response.status_code == HTTPStatus.CREATED
+    db.session.expire_all()
+    assert [product.order_number for product in products] == [0, 1024, 512, 2048]
+
+    assert test_client.put(url, data=json_dumps(order[:3])).status_code == HTTPStatus.BAD_REQUEST
+    assert test_client.put(url, data=json_dumps([*order[:3], ids[0]])).status_code == HTTPStatus.BAD_REQUEST
+    other = make_product(shop, make_category(shop))
+    assert test_client.put(url, data=json_dumps([*order, other])).status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timezone
+from uuid import UUID
+
+import anyio
+import pytest
+from fastapi.routing import APIRoute, serialize_response
+
+from server.api.responses import FastJSONResponse, PrevalidatedResponse
+from server.schemas.product_attribute import ProductAttributeItem
+
+ID = UUID("0e5b5a4d-3f0c-4d4b-9c6e-1a2b3c4d5e6f")
+
+
+def test_fast_json_response():
+    content = {"id": ID, "created_at": datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc), "name": "Café", "n": [1.5]}
+    response = FastJSONResponse(content)
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {
+        "id": str(ID),
+        "created_at": "2026-10-18T12:00:00+00:00",
+        "name": "Café",
+        "n": [1.5],
+    }
+
+    with pytest.raises(ValueError):
+        FastJSONResponse({"total": float("nan")})
+
+
+def test_prevalidated_response():
+    item = ProductAttributeItem(attribute_id=ID, attribute_name="Size", option_id=None, option_value_key="S")
+    response = PrevalidatedResponse([item], headers={"Content-Range": "items 0-0/1"})
+    assert response.headers["Content-Range"] == "items 0-0/1"
+    assert json.loads(response.body) == [item.model_dump(mode="json")]
+
+
+def response_model_body(fastapi_app, path: str, content) -> bytes:
+    """The body FastAPI serializes from `content` when it is checked against the `response_model` of `path`."""
+    route = next(route for route in fastapi_app.routes if isinstance(route, APIRoute) and route.path == path)
+    return FastJSONResponse(
+        anyio.run(lambda: serialize_response(field=route.response_field, response_content=content))
+    ).body
+
+
+def test_orders_same_as_response_model(fastapi_app, test_client, pending_order):
+    response = test_client.get("/orders/")
+    assert response.status_code == 200
+    assert response.headers["Content-Range"].endswith("/1")
+    assert json.loads(response.content) == json.loads(response_model_body(fastapi_app, "/orders/", response.json()))
+
+
+def test_category_products_same_as_response_model(fastapi_app, test_client, shop_with_config, product):
+    category_id = test_client.get(f"/shops/{shop_with_config}/products/{product}").json()["category_id"]
+    path = "/shops/{shop_id}/categories/{category_id}/products"
+    response = test_client.get(path.format(shop_id=shop_with_config, category_id=category_id))
+    assert response.status_code == 200
+    assert "ETag" in response.headers
+    assert response.json()[0]["product"]["id"] == str(product)
+    assert json.loads(response.content) == json.loads(response_model_body(fastapi_app, path, response.json()))
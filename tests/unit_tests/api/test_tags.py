@@ -1,5 +1,9 @@
-from server.db.models import TagTable
+from uuid import UUID
+
+from server.db import db
+from server.db.models import ProductToTagTable, TagTable
 from server.utils.json import json_dumps
+from tests.unit_tests.factories.product import make_product
 
 
 def test_tags_get_multi(shop_with_tags, test_client):
@@ -55,6 +59,31 @@ def test_tags_delete(shop, tag, test_client):
     assert response.status_code == 204
 
 
+def test_tags_bulk(shop, category, test_client):
+    product = make_product(shop, category)
+    body = [{"shop_id": shop, "name": name, "translation": {"main_name": name}} for name in ("Red", "Green", "Blue")]
+    response = test_client.post(f"/shops/{shop}/tags/bulk", data=json_dumps(body))
+    assert response.status_code == 201
+    ids = response.json()
+    assert [TagTable.query.filter_by(id=id).first().translation.main_name for id in ids] == ["Red", "Green", "Blue"]
+
+    body = [{"shop_id": shop, "id": ids[0], "name": "Rood", "translation": {"main_name": "Rood", "alt1_name": "Red"}}]
+    response = test_client.put(f"/shops/{shop}/tags/bulk", data=json_dumps(body))
+    assert response.status_code == 204
+    tag = TagTable.query.filter_by(id=ids[0]).populate_existing().first()
+    assert (tag.name, tag.translation.main_name, tag.translation.alt1_name) == ("Rood", "Rood", "Red")
+
+    db.session.add(ProductToTagTable(shop_id=shop, product_id=product, tag_id=ids[0]))
+    db.session.commit()
+    response = test_client.request("DELETE", f"/shops/{shop}/tags/bulk", data=json_dumps(ids[:2]))
+    assert response.status_code == 204
+    assert [tag.id for tag in TagTable.query.filter(TagTable.id.in_(ids))] == [UUID(ids[2])]
+    assert ProductToTagTable.query.filter_by(product_id=product).count() == 0
+
+    response = test_client.request("DELETE", f"/shops/{shop}/tags/bulk", data=json_dumps(ids))
+    assert response.status_code == 404
+
+
 # from http import HTTPStatus
 # from uuid import uuid4
 #
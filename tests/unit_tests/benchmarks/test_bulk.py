@@ -0,0 +1,71 @@
+"""Writing 1,000 products with their translations: one `create_by_shop_id`, `update` or `delete_by_shop_id` per product
+against `create_many`, `update_many` and `delete_many`, which write each table with one multi-row or executemany
+statement. The database round trips per run are in `extra_info`. Run only the benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+import pytest
+from sqlalchemy import event
+
+from server.crud.crud_product import product_crud
+from server.db import db
+from server.schemas.product import ProductBulkUpdate
+from tests.unit_tests.factories.categories import make_category
+from tests.unit_tests.factories.product import product_create
+
+PRODUCTS = 1000
+ROUNDS = 3
+
+
+@pytest.mark.parametrize("variant", ["before", "after"])
+@pytest.mark.parametrize("operation", ["create", "update", "delete"])
+def test_bulk(benchmark, shop, operation, variant):
+    category_id = make_category(shop_id=shop)
+    items = [product_create(shop, category_id, number) for number in range(PRODUCTS)]
+    ids, updates, round_trips = [], [], [0]
+
+    def setup():
+        if operation != "create":
+            ids[:] = product_crud.create_many(shop_id=shop, objs_in=items)
+            updates[:] = [
+                ProductBulkUpdate(id=id, **{**item.model_dump(), "price": item.price + 1})
+                for id, item in zip(ids, items)
+            ]
+        # Count the round trips of the operation only
+        round_trips.append(0)
+
+    def create():
+        if variant == "before":
+            for item in items:
+                product_crud.create_by_shop_id(shop_id=shop, obj_in=item)
+        else:
+            product_crud.create_many(shop_id=shop, objs_in=items)
+
+    def update():
+        if variant == "before":
+            for item_in in updates:
+                product_crud.update(db_obj=product_crud.get_id_by_shop_id(shop, item_in.id), obj_in=item_in)
+        else:
+            product_crud.update_many(shop_id=shop, objs_in=updates)
+
+    def delete():
+        if variant == "before":
+            for id in ids:
+                product_crud.delete_by_shop_id(shop_id=shop, id=id)
+        else:
+            product_crud.delete_many(shop_id=shop, ids=ids)
+
+    def after_cursor_execute(*args) -> None:
+        round_trips[-1] += 1
+
+    event.listen(db.engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        benchmark.group = f"bulk-{operation}"
+        benchmark.pedantic(
+            {"create": create, "update": update, "delete": delete}[operation], setup=setup, rounds=ROUNDS
+        )
+    finally:
+        event.remove(db.engine, "after_cursor_execute", after_cursor_execute)
+    benchmark.extra_info["products"] = PRODUCTS
+    benchmark.extra_info["round_trips"] = round_trips[-1]
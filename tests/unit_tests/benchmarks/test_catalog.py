@@ -0,0 +1,39 @@
+"""The storefront price list of a shop with 5,000 products: built from the catalog on every request (the snapshot made
+stale before each round, as every request did before) against served from its snapshot in `catalog_snapshots`. The
+endpoint function is called directly: the 5,000 rows load in more `selectinload` batches than the N+1 check of the test
+client allows. Run only the benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+import pytest
+
+from server.api.endpoints.shop_endpoints.prices import Lang, _get_products
+from server.crud.catalog import raise_catalog_versions
+from server.crud.crud_product import product_crud
+from server.db import db
+from tests.unit_tests.factories.categories import make_category_translated
+from tests.unit_tests.factories.product import product_create
+
+PRODUCTS = 5000
+
+
+@pytest.mark.parametrize("variant", ["before", "after"])
+def test_catalog_snapshot(benchmark, shop, variant):
+    category_id = make_category_translated(shop_id=shop)
+    product_crud.create_many(shop_id=shop, objs_in=[product_create(shop, category_id, n) for n in range(PRODUCTS)])
+    _get_products(shop, Lang.MAIN)
+
+    def setup():
+        if variant == "before":
+            raise_catalog_versions(db.session, [shop])
+            db.session.commit()
+
+    def get_prices() -> bytes:
+        return _get_products(shop, Lang.MAIN).body
+
+    benchmark.group = "catalog-snapshot"
+    content = benchmark.pedantic(get_prices, setup=setup, rounds=10)
+    assert len(content) > PRODUCTS
+    benchmark.extra_info["products"] = PRODUCTS
+    benchmark.extra_info["response_bytes"] = len(content)
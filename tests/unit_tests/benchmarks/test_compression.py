@@ -0,0 +1,50 @@
+"""Bytes on the wire and latency of the catalog of a shop with 5,000 products, uncompressed ("identity", as before)
+against zstd, brotli and gzip: the price list is served from its snapshot stored compressed, a page of 100 products of
+a category is compressed per request by `CompressionMiddleware`. The compressed size and the 95th percentile of the
+latency are in `extra_info`. Run only the benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+import pytest
+
+from server.api.endpoints.shop_endpoints.prices import Lang, _get_products
+from server.crud.crud_product import product_crud
+from tests.unit_tests.factories.categories import make_category_translated
+from tests.unit_tests.factories.product import product_create
+
+PRODUCTS = 5000
+
+
+def product_with_images(shop_id, category_id, number: int):
+    item = product_create(shop_id, category_id, number)
+    for image in range(1, 7):
+        setattr(item, f"image_{image}", f"https://images.example.com/{shop_id}/products/{number}-{image}.png")
+    item.translation.main_description = "Handgemaakt in Nederland van duurzaam geteelde materialen. " * 5
+    return item
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip", "br", "zstd"])
+@pytest.mark.parametrize("route", ["prices", "category-products"])
+def test_compression(benchmark, test_client, shop, route, encoding):
+    category_id = make_category_translated(shop_id=shop)
+    product_crud.create_many(shop_id=shop, objs_in=[product_with_images(shop, category_id, n) for n in range(PRODUCTS)])
+    # Built outside the test client, whose N+1 check the 5,000 rows would trip
+    _get_products(shop, Lang.MAIN)
+    url = {
+        "prices": f"/shops/{shop}/prices/?lang=main",
+        "category-products": f"/shops/{shop}/categories/{category_id}/products?count=none",
+    }[route]
+
+    def get() -> int:
+        response = test_client.get(url, headers={"Accept-Encoding": encoding})
+        assert response.status_code == 200
+        assert response.headers.get("Content-Encoding", "identity") == encoding
+        return int(response.headers["Content-Length"])
+
+    benchmark.group = f"compression-{route}"
+    size = benchmark.pedantic(get, rounds=50, warmup_rounds=2)
+    timings = sorted(benchmark.stats.stats.data)
+    benchmark.extra_info["products"] = PRODUCTS
+    benchmark.extra_info["response_bytes"] = size
+    benchmark.extra_info["p95_ms"] = round(timings[int(len(timings) * 0.95) - 1] * 1000, 2)
@@ -0,0 +1,47 @@
+"""The total count of a listing page for the `Content-Range` header, per `count` mode, on 300k accounts of one shop.
+
+`before` is the exact `query.count()` on every request, as `get_multi` did before the count modes. `cached` is an exact
+count reused from `count_cache`, `estimate` is the planner's row estimate and `none` skips the count. Run only the
+benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+import pytest
+from sqlalchemy import text
+
+from server.crud.count import CountMode, count_cache
+from server.crud.crud_account import account_crud
+from server.db import db
+
+ROWS = 300_000
+
+VARIANTS = {"before": (CountMode.exact, 0), "cached": (CountMode.exact, 60), "estimate": (CountMode.estimate, 0)}
+VARIANTS["none"] = (CountMode.none, 0)
+
+
+@pytest.mark.parametrize("variant", list(VARIANTS))
+def test_count_listing(benchmark, shop, monkeypatch, variant):
+    mode, ttl = VARIANTS[variant]
+    monkeypatch.setattr(count_cache, "ttl", ttl)
+    db.session.execute(
+        text(
+            "INSERT INTO accounts (shop_id, name, details) "
+            "SELECT :shop_id, 'Account ' || n, '{}' FROM generate_series(1, :rows) n"
+        ),
+        {"shop_id": str(shop), "rows": ROWS},
+    )
+    db.session.execute(text("ANALYZE accounts"))
+
+    def page() -> str:
+        accounts, header_range = account_crud.get_multi_by_shop_id(
+            shop_id=shop, limit=25, filter_parameters=None, sort_parameters=None, count=mode
+        )
+        assert len(accounts) == 25
+        return header_range.rsplit("/", 1)[1]
+
+    benchmark.group = "listing-count"
+    total = benchmark(page)
+    benchmark.extra_info["total"] = total
+    if variant in ("before", "cached"):
+        assert total == str(ROWS)
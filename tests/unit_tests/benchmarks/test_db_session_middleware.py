@@ -0,0 +1,82 @@
+"""Per-request overhead of `DBSessionMiddleware` on routes that never touch the database.
+
+Compares the previous `BaseHTTPMiddleware` implementation, which eagerly created a uuid4 scope and a session for every
+request, with the pure ASGI middleware. Run only the benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+
+`BENCHMARK_REQUESTS` controls the number of requests per round (default 200).
+"""
+
+import os
+from typing import Any
+
+import anyio
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+
+from server.db import db
+from server.db.database import Database, DBSessionMiddleware
+
+REQUESTS = int(os.getenv("BENCHMARK_REQUESTS", "200"))
+
+
+class EagerDBSessionMiddleware(BaseHTTPMiddleware):
+    """The `DBSessionMiddleware` implementation before it became a lazy, pure ASGI middleware."""
+
+    def __init__(self, app: Any, database: Database):
+        super().__init__(app)
+        self.database = database
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        with self.database.database_scope():
+            return await call_next(request)
+
+
+def get_my_ip(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(request.client.host if request.client else "")
+
+
+def make_app(middleware: type) -> Starlette:
+    app = Starlette(routes=[Route("/get_my_ip", get_my_ip)])
+    app.add_middleware(middleware, database=db)
+    return app
+
+
+async def send_requests(app: Starlette, amount: int) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/get_my_ip",
+        "raw_path": b"/get_my_ip",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+
+    async def send(message: dict) -> None:
+        pass
+
+    for _ in range(amount):
+        messages = [{"type": "http.disconnect"}, {"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive() -> dict:
+            return messages.pop() if len(messages) > 1 else messages[0]
+
+        await app(dict(scope), receive, send)
+
+
+@pytest.mark.parametrize("middleware", [EagerDBSessionMiddleware, DBSessionMiddleware], ids=["eager", "lazy"])
+def test_no_db_route_overhead(benchmark, middleware):
+    app = make_app(middleware)
+    benchmark.group = "db-session-middleware"
+    benchmark(anyio.run, send_requests, app, REQUESTS)
@@ -0,0 +1,33 @@
+"""A page of 1,000 products: the full `ProductWithDefaultPrice` rows against a sparse fieldset (`fields=price,stock`),
+which reads three columns, loads no relationships and validates a schema of three fields. The response size is in
+`extra_info`. Run only the benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+import pytest
+
+from server.crud.crud_product import product_crud
+from tests.unit_tests.factories.categories import make_category
+from tests.unit_tests.factories.product import product_create
+
+PRODUCTS = 1000
+
+
+@pytest.mark.parametrize("variant", ["before", "after"])
+def test_sparse_fieldset(benchmark, test_client, shop, variant):
+    category_id = make_category(shop_id=shop)
+    product_crud.create_many(shop_id=shop, objs_in=[product_create(shop, category_id, n) for n in range(PRODUCTS)])
+    params = {"limit": PRODUCTS, "count": "none"}
+    if variant == "after":
+        params["fields"] = "price,stock"
+
+    def get_page() -> bytes:
+        response = test_client.get(f"/shops/{shop}/products/", params=params)
+        assert response.status_code == 200
+        return response.content
+
+    benchmark.group = "sparse-fieldset"
+    content = benchmark(get_page)
+    benchmark.extra_info["products"] = PRODUCTS
+    benchmark.extra_info["response_bytes"] = len(content)
@@ -0,0 +1,62 @@
+"""A filtered page of the order listing of a shop: the old `cast(column, String).ilike('%value%')` filters against
+the typed conditions of `compile_filter`, on 200k orders.
+
+The cast hides the column from every index, so the old filters scan all orders of the shop. The typed `id` filter is a
+primary key lookup and the date range reads `ix_orders_shop_id_created_at_id`. Run only the benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+import pytest
+from sqlalchemy import String, cast, text
+
+from server.crud.count import CountMode
+from server.crud.crud_order import order_crud
+from server.db import db
+from server.db.models import OrderTable
+
+ORDERS = 200_000
+
+
+def legacy_query(shop_id, column: str, value: str):
+    return (
+        db.session.query(OrderTable)
+        .filter(OrderTable.shop_id == shop_id)
+        .filter(cast(getattr(OrderTable, column), String).ilike(f"%{value}%"))
+    )
+
+
+@pytest.mark.parametrize("variant", ["before", "after"])
+@pytest.mark.parametrize("filter_", ["id", "created_at"])
+def test_filtered_order_page(benchmark, shop, variant, filter_):
+    db.session.execute(
+        text(
+            "INSERT INTO orders (shop_id, total, status, created_at, order_info) "
+            "SELECT :shop_id, n % 100, 'complete', timestamp '2026-01-01' - n * interval '1 minute', '[]' "
+            "FROM generate_series(1, :orders) n"
+        ),
+        {"shop_id": str(shop), "orders": ORDERS},
+    )
+    db.session.execute(text("ANALYZE orders"))
+    order_id = db.session.scalar(text("SELECT id FROM orders WHERE shop_id = :shop_id LIMIT 1"), {"shop_id": str(shop)})
+
+    if filter_ == "id":
+        query, filters = legacy_query(shop, "id", str(order_id)), [f"id:{order_id}"]
+    else:
+        # The orders of one day: the old filter can only match the date as text
+        query, filters = legacy_query(shop, "created_at", "2025-12-31"), ["created_at_gte:2025-12-31"]
+        filters.append("created_at_lt:2026-01-01")
+
+    def page() -> int:
+        orders, _ = order_crud.get_multi_by_shop_id(
+            shop_id=shop,
+            limit=25,
+            filter_parameters=None if variant == "before" else filters,
+            sort_parameters=None,
+            query_parameter=query if variant == "before" else None,
+            count=CountMode.none,
+        )
+        return len(orders)
+
+    benchmark.group = f"filter-{filter_}"
+    assert benchmark(page) == (1 if filter_ == "id" else 25)
@@ -0,0 +1,80 @@
+"""Serializing ORM objects with `json_dumps`, as happens for every row written into a JSONB column.
+
+`before` is the previous `__json__`, which inspected the mapper and rebuilt its key sets for every object; `after` uses
+the plan cached per mapped class.
+
+Run only the benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from server.db import db
+from server.db.database import _Base
+from server.db.models import ProductTable, ProductTranslationTable
+from server.utils.json import json_dumps
+from tests.unit_tests.factories.categories import make_category
+
+PRODUCTS = 10_000
+
+
+def legacy_json(self, excluded_keys: set = set()) -> dict:  # noqa: B006
+    ins: Any = sa_inspect(self)
+
+    columns = set(ins.mapper.column_attrs.keys())
+    relationships = set(ins.mapper.relationships.keys())
+    unloaded = ins.unloaded
+    expired = ins.expired_attributes
+    include = set(self._json_include)
+    exclude = set(self._json_exclude) | set(excluded_keys)
+
+    keys = columns | relationships
+    if not ins.transient:
+        keys -= unloaded
+    if ins.expired:
+        keys |= expired
+    keys |= include
+    if ins.deleted or ins.detached:
+        keys -= relationships
+        keys -= unloaded
+    keys -= exclude
+
+    return {key: getattr(self, key) for key in keys}
+
+
+@pytest.fixture
+def products(shop):
+    category_id = make_category(shop_id=shop)
+    product_ids = [uuid4() for _ in range(PRODUCTS)]
+    db.session.execute(
+        insert(ProductTable), [{"id": id, "shop_id": shop, "category_id": category_id} for id in product_ids]
+    )
+    db.session.execute(
+        insert(ProductTranslationTable),
+        [
+            {"product_id": id, "main_name": f"Product {i}", "main_description": "", "main_description_short": ""}
+            for i, id in enumerate(product_ids)
+        ],
+    )
+    return db.session.scalars(
+        select(ProductTable).where(ProductTable.shop_id == shop).options(joinedload(ProductTable.translation))
+    ).all()
+
+
+@pytest.mark.parametrize("variant", ["before", "after"])
+def test_serialize_products(benchmark, monkeypatch, products, variant):
+    if variant == "before":
+        monkeypatch.setattr(_Base, "__json__", legacy_json)
+
+    benchmark.group = "json-serialize-10k-products"
+    serialized = benchmark(json_dumps, products)
+
+    assert serialized.count('"main_name"') == PRODUCTS
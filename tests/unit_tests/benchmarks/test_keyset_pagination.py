@@ -0,0 +1,55 @@
+"""Deep pages of the order listing of a shop: `OFFSET` against keyset (`cursor`) pagination.
+
+With `skip` Postgres produces and throws away every row before the page, so the cost grows with the page depth. With a
+cursor the page starts at an index lookup of the last row of the previous page (`ix_orders_shop_id_created_at_id`).
+Both variants include the count for `Content-Range`. Run only the benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+import pytest
+from sqlalchemy import text
+
+from server.crud.crud_order import order_crud
+from server.db import db
+from server.db.models import OrderTable
+
+ORDERS = 200_000
+PAGE = 25
+SORT = ["created_at:DESC"]
+
+
+@pytest.mark.parametrize("variant", ["before", "after"])
+def test_deep_order_page(benchmark, shop, variant):
+    db.session.execute(
+        text(
+            "INSERT INTO orders (shop_id, total, status, created_at, order_info) "
+            "SELECT :shop_id, n % 100, 'complete', now() - n * interval '1 minute', '[]' "
+            "FROM generate_series(1, :orders) n"
+        ),
+        {"shop_id": str(shop), "orders": ORDERS},
+    )
+    db.session.execute(text("ANALYZE orders"))
+    skip = ORDERS - 10 * PAGE
+    query = OrderTable.query.filter(OrderTable.shop_id == shop)
+
+    def page(**kwargs):
+        orders, _ = order_crud.get_multi(
+            query_parameter=query, limit=PAGE, filter_parameters=None, sort_parameters=SORT, **kwargs
+        )
+        return [order.id for order in orders]
+
+    # The cursor of the page before: the sort key of its last row (created_at is unique here, so ties don't matter)
+    previous, _ = order_crud.get_multi(
+        query_parameter=query, skip=skip - 1, limit=1, filter_parameters=None, sort_parameters=SORT
+    )
+    cursor = order_crud.next_cursor(previous, limit=1, sort_parameters=SORT)
+    expected = page(skip=skip)
+
+    benchmark.group = "deep-order-page"
+    benchmark.extra_info["orders"] = ORDERS
+    benchmark.extra_info["skip"] = skip
+    if variant == "before":
+        assert benchmark(page, skip=skip) == expected
+    else:
+        assert benchmark(page, cursor=cursor) == expected
@@ -0,0 +1,73 @@
+"""Product search in a shop with 30k products: `ILIKE '%word%'` over the translations against full-text search on the
+GIN indexed `search_vector` (`product_crud.search_by_shop_id`).
+
+`common` is a word in 1 of 10 products, which all get ranked (the `ILIKE` query returns the first 20 it finds, unranked);
+`rare` matches a single product. Run only the benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+import pytest
+from sqlalchemy import or_, text
+
+from server.crud.crud_product import product_crud
+from server.db import db
+from server.db.models import ProductTable, ProductTranslationTable
+from tests.unit_tests.factories.categories import make_category
+
+PRODUCTS = 30_000
+WORDS = {"common": "stoel", "rare": "p12345"}
+
+
+def ilike_search(shop_id, word: str):
+    pattern = f"%{word}%"
+    return (
+        db.session.query(ProductTable)
+        .join(ProductTable.translation)
+        .filter(
+            ProductTable.shop_id == shop_id,
+            or_(
+                ProductTranslationTable.main_name.ilike(pattern),
+                ProductTranslationTable.main_description.ilike(pattern),
+                ProductTranslationTable.alt1_name.ilike(pattern),
+                ProductTranslationTable.alt1_description.ilike(pattern),
+            ),
+        )
+        .limit(20)
+        .all()
+    )
+
+
+@pytest.mark.parametrize("variant", ["before", "after"])
+@pytest.mark.parametrize("word", list(WORDS))
+def test_product_search(benchmark, shop, variant, word):
+    category_id = make_category(shop_id=shop)
+    db.session.execute(
+        text(
+            "INSERT INTO products (shop_id, category_id, price, tax_category) "
+            "SELECT :shop_id, :category_id, n, 'vat_standard' FROM generate_series(1, :products) n"
+        ),
+        {"shop_id": str(shop), "category_id": str(category_id), "products": PRODUCTS},
+    )
+    db.session.execute(
+        text(
+            "INSERT INTO product_translations (product_id, main_name, main_description, main_description_short, "
+            "alt1_name, alt1_description) "
+            "SELECT id, (ARRAY['Rode', 'Blauwe', 'Groene'])[row_number % 3 + 1] || ' ' "
+            "|| (ARRAY['stoel', 'tafel', 'lamp', 'kast', 'bank', 'kussen', 'spiegel', 'vaas', 'klok', 'mand'])"
+            "[row_number % 10 + 1] || ' p' || row_number, "
+            "'Handgemaakt in Nederland van duurzaam hout, ontwerp nummer ' || row_number, 'Handgemaakt', "
+            "'Handmade item ' || row_number, 'Made in the Netherlands from sustainable wood' "
+            "FROM (SELECT id, row_number() OVER () FROM products WHERE shop_id = :shop_id) p"
+        ),
+        {"shop_id": str(shop)},
+    )
+    db.session.execute(text("ANALYZE products; ANALYZE product_translations"))
+
+    def search() -> int:
+        if variant == "before":
+            return len(ilike_search(shop, WORDS[word]))
+        return len(product_crud.search_by_shop_id(shop_id=shop, text=WORDS[word]))
+
+    benchmark.group = f"product-search-{word}"
+    assert benchmark(search) == (20 if word == "common" else 1)
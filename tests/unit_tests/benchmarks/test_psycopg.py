@@ -0,0 +1,173 @@
+"""Round trips and latency of multi-statement writes with psycopg2 and with psycopg 3.
+
+The engines connect through `RoundTripProxy`, which counts round trips (a client message after a server reply) and
+delays every reply by `LATENCY`, like a database in another availability zone.
+
+`test_replace_product_attribute_values`: the INSERT and DELETE of the batch replace share one round trip in psycopg 3
+pipeline mode (`Database.pipeline`). `test_create_product_with_translation` is not pipelined, as the product INSERT
+returns its generated columns, but shows psycopg 3 is not slower for the usual ORM writes.
+
+Run only the benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+import socket
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import closing, contextmanager
+
+import pytest
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from server.api.endpoints.shop_endpoints.product_attribute_values import (
+    put_selected_product_attribute_values_by_product,
+)
+from server.crud.crud_product import product_crud
+from server.db import db
+from server.db.database import SESSION_ARGUMENTS, engine_arguments
+from server.schemas.product import ProductCreate
+from server.schemas.product_attribute_value import ProductAttributeOptionSelectionReplace
+from tests.unit_tests.factories.attribute import make_attribute, make_option
+from tests.unit_tests.factories.categories import make_category
+from tests.unit_tests.factories.product import make_product
+from tests.unit_tests.factories.shop import make_shop
+
+LATENCY = 0.001
+
+
+class RoundTripProxy:
+    """TCP proxy counting round trips and adding `latency` seconds to each."""
+
+    def __init__(self, upstream: tuple[str, int], latency: float) -> None:
+        self.upstream = upstream
+        self.latency = latency
+        self.round_trips = 0
+        self._lock = threading.Lock()
+        self._server = socket.create_server(("127.0.0.1", 0))
+        self.port = self._server.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def close(self) -> None:
+        self._server.close()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                return
+            server = socket.create_connection(self.upstream)
+            for sock in client, server:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            replied = [True]
+            threading.Thread(target=self._pump, args=(client, server, replied, False), daemon=True).start()
+            threading.Thread(target=self._pump, args=(server, client, replied, True), daemon=True).start()
+
+    def _pump(self, source: socket.socket, target: socket.socket, replied: list[bool], is_reply: bool) -> None:
+        with closing(source), closing(target):
+            while data := self._recv(source):
+                if is_reply:
+                    time.sleep(self.latency)
+                with self._lock:
+                    if not is_reply and replied[0]:
+                        self.round_trips += 1
+                    replied[0] = is_reply
+                target.sendall(data)
+
+    @staticmethod
+    def _recv(sock: socket.socket) -> bytes:
+        try:
+            return sock.recv(65536)
+        except OSError:
+            return b""
+
+
+@contextmanager
+def session_through_proxy(db_uri: str, driver: str) -> Iterator[RoundTripProxy]:
+    """Point `db.session` at a connection through a `RoundTripProxy`, in a transaction that is rolled back."""
+    url = make_url(db_uri)
+    proxy = RoundTripProxy((url.host or "localhost", url.port or 5432), LATENCY)
+    proxied_url = url.set(drivername=f"postgresql+{driver}", host="127.0.0.1", port=proxy.port)
+    arguments = engine_arguments(proxied_url.render_as_string(hide_password=False))
+    # psycopg 3 returns text as bytes from a SQL_ASCII database, as created by some local Postgres installs
+    arguments = {**arguments, "connect_args": {**arguments["connect_args"], "client_encoding": "utf8"}}
+    engine = create_engine(proxied_url, **arguments)
+    database = db.wrapped_database
+    original = database.session_factory, database.scoped_session
+    try:
+        with closing(engine.connect()) as connection:
+            database.session_factory = sessionmaker(**SESSION_ARGUMENTS, bind=connection)
+            database.scoped_session = scoped_session(database.session_factory, database._scopefunc)
+            transaction = connection.begin()
+            try:
+                yield proxy
+            finally:
+                database.scoped_session.remove()
+                transaction.rollback()
+    finally:
+        database.session_factory, database.scoped_session = original
+        engine.dispose()
+        proxy.close()
+
+
+def run_benchmark(benchmark, proxy: RoundTripProxy, group: str, fn) -> None:
+    fn()  # Warm up: statement caches, psycopg 3 prepared statements
+    start = proxy.round_trips
+    benchmark.group = group
+    benchmark.pedantic(fn, rounds=20, iterations=1)
+    benchmark.extra_info["round_trips"] = (proxy.round_trips - start) / 20
+
+
+@pytest.mark.parametrize("driver", ["psycopg2", "psycopg"])
+def test_create_product_with_translation(benchmark, db_uri, driver):
+    with session_through_proxy(db_uri, driver) as proxy:
+        shop_id = make_shop()
+        category_id = make_category(shop_id=shop_id)
+        product = ProductCreate(
+            category_id=category_id,
+            shop_id=shop_id,
+            max_one=False,
+            shippable=True,
+            featured=False,
+            new_product=False,
+            tax_category="vat_standard",
+            image_1=None,
+            image_2=None,
+            image_3=None,
+            image_4=None,
+            image_5=None,
+            image_6=None,
+            translation={"main_name": "Product", "main_description": "Description", "main_description_short": "Short"},
+        )
+
+        run_benchmark(
+            benchmark,
+            proxy,
+            "psycopg-create-product",
+            lambda: product_crud.create_by_shop_id(shop_id=shop_id, obj_in=product),
+        )
+
+
+@pytest.mark.parametrize("driver", ["psycopg2", "psycopg"])
+def test_replace_product_attribute_values(benchmark, db_uri, driver):
+    with session_through_proxy(db_uri, driver) as proxy:
+        shop_id = make_shop()
+        product_id = make_product(shop_id=shop_id, category_id=make_category(shop_id=shop_id))
+        attribute_id = make_attribute(shop_id)
+        options = [make_option(attribute_id, f"option {i}") for i in range(6)]
+        selections = [
+            ProductAttributeOptionSelectionReplace(option_ids=options[:3]),
+            ProductAttributeOptionSelectionReplace(option_ids=options[3:]),
+        ]
+        rounds = iter(range(1000))
+
+        def replace() -> None:
+            # Swap all three options every time: three deletes and three inserts
+            put_selected_product_attribute_values_by_product(shop_id, product_id, selections[next(rounds) % 2])
+
+        run_benchmark(benchmark, proxy, "psycopg-replace-attribute-values", replace)
+
+    assert benchmark.extra_info["round_trips"] <= 7
@@ -0,0 +1,97 @@
+"""Moving a product ten places down in a category of 200 products: ten `swap` requests (as before) against one
+`reorder` request, which writes only the moved product in one `UPDATE ... FROM (VALUES ...)`. The statements of all
+requests are in `extra_info`.
+
+The last order number of a category, looked up for every new product, comes from the end of
+`ix_products_shop_id_category_id_order_number` alone; the old lookup loaded the whole last product. Run only the
+benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+import pytest
+from sqlalchemy import text
+
+from server.crud.crud_product import product_crud
+from server.db import db
+from server.db.models import ProductTable
+from server.utils.json import json_dumps
+from tests.unit_tests.factories.categories import make_category_translated
+from tests.unit_tests.factories.product import product_create
+
+PRODUCTS = 200
+MOVE = 10
+
+
+@pytest.mark.parametrize("variant", ["swap", "reorder"])
+def test_move_product(benchmark, test_client, shop, variant):
+    category_id = make_category_translated(shop_id=shop)
+    ids = product_crud.create_many(
+        shop_id=shop, objs_in=[product_create(shop, category_id, n * 1024) for n in range(PRODUCTS)]
+    )
+    order = list(ids)
+
+    def move() -> int:
+        statements = 0
+        if variant == "swap":
+            for _ in range(MOVE):
+                response = test_client.put(f"/shops/{shop}/products/{order[0]}/swap?move_up=false")
+                assert response.status_code == 201
+                statements += int(response.headers["X-DB-Statements"])
+        else:
+            new_order = [*order[1 : MOVE + 1], order[0], *order[MOVE + 1 :]]
+            response = test_client.put(
+                f"/shops/{shop}/products/reorder?category_id={category_id}", data=json_dumps(new_order)
+            )
+            assert response.status_code == 204
+            statements += int(response.headers["X-DB-Statements"])
+        # Back to the start for the next round
+        product_crud.reorder(shop_id=shop, ids=order, category_id=category_id)
+        return statements
+
+    benchmark.group = "move-product"
+    statements = benchmark.pedantic(move, rounds=20, warmup_rounds=1)
+    benchmark.extra_info["products"] = PRODUCTS
+    benchmark.extra_info["positions"] = MOVE
+    benchmark.extra_info["statements"] = statements
+
+
+@pytest.mark.parametrize("variant", ["last-product", "max"])
+def test_last_order_number(benchmark, shop, variant):
+    category_id = make_category_translated(shop_id=shop)
+    db.session.execute(
+        text(
+            "INSERT INTO products (shop_id, category_id, order_number) "
+            "SELECT :shop_id, :category_id, n * 1024 FROM generate_series(0, 49999) n"
+        ),
+        {"shop_id": str(shop), "category_id": str(category_id)},
+    )
+    db.session.execute(text("ANALYZE products"))
+
+    if variant == "max":
+        plan = db.session.scalars(
+            text(
+                "EXPLAIN SELECT max(order_number) FROM products WHERE shop_id = :shop_id AND category_id = :category_id"
+            ),
+            {"shop_id": str(shop), "category_id": str(category_id)},
+        ).all()
+        assert any(
+            "Index Only Scan" in line and "ix_products_shop_id_category_id_order_number" in line for line in plan
+        )
+
+        def last() -> int:
+            return product_crud.last_order_number(shop_id=shop, category_id=category_id)
+
+    else:
+
+        def last() -> int:
+            return (
+                ProductTable.query.filter_by(shop_id=shop)
+                .filter_by(category_id=category_id)
+                .order_by(ProductTable.order_number.desc())
+                .first()
+                .order_number
+            )
+
+    benchmark.group = "last-order-number"
+    assert benchmark(last) == 49999 * 1024
@@ -0,0 +1,85 @@
+"""Throughput of the response path of the storefront's category page and of the order listing, for the same page of
+500 products or orders: FastAPI checking the endpoint's result against its `response_model` and serializing it with
+the standard library ("response_model", as before) against the `PrevalidatedResponse` the endpoints return now,
+serialized by pydantic-core. Loading the page is left out, it is the same for both. Responses per second and the size
+of the body are in `extra_info`. Run only the benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+import asyncio
+
+import anyio
+import pytest
+from fastapi.routing import APIRoute, serialize_response
+from sqlalchemy import text
+from starlette.responses import JSONResponse, Response
+
+from server.api.endpoints.shop_endpoints.categories import _get_category_products
+from server.api.endpoints.shop_endpoints.orders import _with_names, order_list
+from server.api.responses import prevalidated_response
+from server.crud.count import CountMode
+from server.crud.crud_order import order_crud
+from server.crud.crud_product import product_crud
+from server.crud.loaders import LoaderProfile
+from server.db import db
+from tests.unit_tests.factories.account import make_account
+from tests.unit_tests.factories.categories import make_category_translated
+from tests.unit_tests.factories.product import product_create
+
+PAGE = 500
+
+PATHS = {
+    "storefront": "/shops/{shop_id}/categories/{category_id}/products",
+    "orders": "/orders/",
+}
+
+
+def storefront_page(shop_id) -> list:
+    category_id = make_category_translated(shop_id=shop_id)
+    product_crud.create_many(shop_id=shop_id, objs_in=[product_create(shop_id, category_id, n) for n in range(PAGE)])
+    common = {"skip": 0, "limit": PAGE, "filter": None, "sort": None, "cursor": None, "count": CountMode.none}
+    return _get_category_products(shop_id, category_id, Response(), None, None, None, None, common)
+
+
+def order_page(shop_id) -> list:
+    account_id = make_account(shop_id=shop_id, name="Benchmark")
+    db.session.execute(
+        text(
+            "INSERT INTO orders (shop_id, account_id, customer_order_id, total, status, order_info) "
+            "SELECT :shop_id, :account_id, n, n % 100, 'pending', json_build_array(json_build_object("
+            "'description', 'Shirt', 'product_name', 'Shirt', 'price', 1.0, 'quantity', 2, 'product_id', gen_random_uuid()"
+            ")) FROM generate_series(1, :orders) n"
+        ),
+        {"shop_id": str(shop_id), "account_id": str(account_id), "orders": PAGE},
+    )
+    orders, _ = order_crud.get_multi(
+        limit=PAGE, filter_parameters=None, sort_parameters=None, count=CountMode.none, profile=LoaderProfile.admin_list
+    )
+    return [_with_names(order) for order in orders]
+
+
+@pytest.mark.parametrize("variant", ["response_model", "prevalidated"])
+@pytest.mark.parametrize("endpoint", ["storefront", "orders"])
+def test_response_throughput(benchmark, fastapi_app, shop, endpoint, variant):
+    route = next(route for route in fastapi_app.routes if isinstance(route, APIRoute) and route.path == PATHS[endpoint])
+    content = storefront_page(shop) if endpoint == "storefront" else order_page(shop)
+
+    async def respond() -> Response:
+        if variant == "response_model":
+            # What FastAPI does with a result that is no `Response`, sync endpoints validate in the threadpool
+            is_coroutine = asyncio.iscoroutinefunction(route.dependant.call)
+            return JSONResponse(
+                await serialize_response(
+                    field=route.response_field, response_content=content, is_coroutine=is_coroutine
+                )
+            )
+        if endpoint == "orders":
+            return prevalidated_response(order_list.validate_python(content, from_attributes=True))
+        return prevalidated_response(content)
+
+    benchmark.group = f"responses-{endpoint}"
+    response = benchmark.pedantic(anyio.run, args=(respond,), rounds=50, warmup_rounds=2)
+    benchmark.extra_info["items"] = PAGE
+    benchmark.extra_info["response_bytes"] = len(response.body)
+    benchmark.extra_info["responses_per_second"] = round(1 / benchmark.stats.stats.mean)
@@ -0,0 +1,51 @@
+"""Cold boot time of the migration step in `lifespan` for a database that is already up to date.
+
+Each round starts a new interpreter, like a worker process does, and imports `server.db` as the app has by then.
+`before` runs `alembic upgrade head`, which imports alembic and loads every revision; `after` runs `upgrade_to_heads`,
+which compares `alembic_version` with the heads read from the revision files and skips alembic. The boot time is
+mostly the interpreter and the app imports, so the time of the migration step alone is in `extra_info`. Run only the
+benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+
+BOOT = """
+import os, time
+import server.db
+start = time.perf_counter()
+{step}
+print((time.perf_counter() - start) * 1000)
+"""
+
+STEPS = {
+    "before": "from alembic import command; from alembic.config import Config; "
+    "command.upgrade(Config('alembic.ini'), 'head')",
+    "after": "from server.db.migrations import upgrade_to_heads; "
+    "assert not upgrade_to_heads(os.environ['DATABASE_URI'], 'alembic.ini')",
+}
+
+
+@pytest.mark.parametrize("variant", ["before", "after"])
+def test_cold_boot_migration_check(benchmark, db_uri, variant):
+    env = {**os.environ, "DATABASE_URI": db_uri}
+    script = BOOT.format(step=STEPS[variant])
+    step_ms = []
+
+    def boot() -> None:
+        result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, check=True, capture_output=True)
+        step_ms.append(float(result.stdout.split()[-1]))
+
+    benchmark.group = "cold-boot-migrations"
+    benchmark.extra_info["revisions"] = len(list((ROOT / "migrations/versions/schema").glob("*.py")))
+    benchmark.pedantic(boot, rounds=5, iterations=1)
+    benchmark.extra_info["migration_step_ms"] = round(statistics.median(step_ms), 1)
@@ -0,0 +1,106 @@
+"""Compiled statement cache hit rate and latency.
+
+`test_timestamp_bind`: statements binding a `UtcTimestamp` value (timestamp filters, every INSERT/UPDATE of a
+`created_at`/`modified_at`) got no cache key while the type declared `cache_ok = False`, so they were compiled on every
+call. `before` reproduces that by disabling the compiled cache for the statement.
+
+`test_hot_lookup`: `before` is the previous Query based implementation, `after` the current one. `get_id_by_shop_id`
+and `get_newest_order_id` are lambda statements now, which also skip rebuilding the statement and its cache key on
+every call. The price list stays a plain `select`: as a lambda statement it was no faster. Both variants of a lookup
+load the same rows with the same loader options.
+
+Run only the benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, select, update
+
+from server.api.endpoints.shop_endpoints.prices import Lang, products_statement
+from server.crud.crud_order import order_crud
+from server.crud.crud_product import product_crud
+from server.crud.loaders import LoaderProfile
+from server.db import db
+from server.db.models import (
+    CategoryTable,
+    CategoryTranslationTable,
+    OrderTable,
+    ProductTable,
+    ProductTranslationTable,
+    ShopTable,
+)
+from server.utils.date_utils import nowtz
+
+
+@contextmanager
+def cache_outcomes() -> Iterator[Counter]:
+    outcomes: Counter = Counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        outcomes[context.cache_hit is context.dialect.CACHE_HIT] += 1
+
+    event.listen(db.engine, "after_cursor_execute", after_cursor_execute)
+    try:
+        yield outcomes
+    finally:
+        event.remove(db.engine, "after_cursor_execute", after_cursor_execute)
+
+
+def run_benchmark(benchmark, group: str, fn: Callable) -> float:
+    fn()  # Warm up: the first call compiles and caches the statement
+    with cache_outcomes() as outcomes:
+        benchmark.group = group
+        benchmark(fn)
+
+    hit_rate = outcomes[True] / sum(outcomes.values())
+    benchmark.extra_info["cache_hit_rate"] = hit_rate
+    return hit_rate
+
+
+@pytest.mark.parametrize("variant", ["before", "after"])
+def test_timestamp_bind(benchmark, shop, variant):
+    options = {"execution_options": {"compiled_cache": None}} if variant == "before" else {}
+
+    def touch_shop():
+        db.session.execute(update(ShopTable).where(ShopTable.id == shop).values(modified_at=nowtz()), **options)
+        db.session.execute(select(ShopTable.id).where(ShopTable.modified_at <= nowtz()), **options).all()
+
+    assert run_benchmark(benchmark, "statement-cache-timestamp-bind", touch_shop) == (variant == "after")
+
+
+def lookups(shop_id, product_id) -> dict[str, dict[str, Callable]]:
+    return {
+        "get_id_by_shop_id": {
+            "before": lambda: db.session.query(ProductTable)
+            .filter(ProductTable.shop_id == shop_id, ProductTable.id == product_id)
+            .first(),
+            "after": lambda: product_crud.get_id_by_shop_id(shop_id, product_id),
+        },
+        "get_newest_order_id": {
+            "before": lambda: OrderTable.query.filter_by(shop_id=str(shop_id)).count() + 1,
+            "after": lambda: order_crud.get_newest_order_id(shop_id=shop_id),
+        },
+        "prices_get_products": {
+            "before": lambda: ProductTable.query.join(ProductTranslationTable)
+            .join(CategoryTable)
+            .join(CategoryTranslationTable)
+            .filter(ProductTable.shop_id == shop_id)
+            .options(*product_crud.loader_options(LoaderProfile.storefront_list))
+            .all(),
+            "after": lambda: db.session.scalars(products_statement(shop_id, Lang.MAIN)).all(),
+        },
+    }
+
+
+@pytest.mark.parametrize("variant", ["before", "after"])
+@pytest.mark.parametrize("lookup", ["get_id_by_shop_id", "get_newest_order_id", "prices_get_products"])
+def test_hot_lookup(benchmark, product, lookup, variant):
+    shop_id = db.session.get(ProductTable, product).shop_id
+    fn = lookups(shop_id, product)[lookup][variant]
+
+    assert run_benchmark(benchmark, f"statement-cache-{lookup}", fn) == 1.0
@@ -0,0 +1,56 @@
+"""Memory use of an unlimited (`limit=0`) listing streamed from a server side cursor.
+
+The resident set size is sampled after every chunk of the response; the streamed listing of 500k accounts should
+grow it by about as much as one chunk of rows needs, not by the size of the result.
+
+Run only the benchmarks with:
+
+    pytest tests/unit_tests/benchmarks --benchmark-only
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from server.api.streaming import json_array_chunks
+from server.crud.crud_account import account_crud
+from server.db import db
+from server.schemas.account import AccountSchema
+
+ROWS = 500_000
+MAX_GROWTH_MB = 64
+
+STATM = Path("/proc/self/statm")
+
+
+def rss_mb() -> float:
+    return int(STATM.read_text().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+@pytest.mark.skipif(not STATM.exists(), reason="Needs /proc to sample the resident set size")
+def test_stream_accounts_in_constant_memory(benchmark, shop):
+    db.session.execute(
+        text(
+            "INSERT INTO accounts (shop_id, name, details) "
+            "SELECT :shop_id, 'Account ' || n, '{}' FROM generate_series(1, :rows) n"
+        ),
+        {"shop_id": str(shop), "rows": ROWS},
+    )
+
+    def stream_all() -> tuple[int, float]:
+        start = peak = rss_mb()
+        size = 0
+        accounts, _ = account_crud.get_multi(limit=0, filter_parameters=None, sort_parameters=None, stream=True)
+        for chunk in json_array_chunks(accounts, AccountSchema):
+            size += len(chunk)
+            peak = max(peak, rss_mb())
+        return size, peak - start
+
+    benchmark.group = "stream-500k-accounts"
+    size, growth_mb = benchmark.pedantic(stream_all, rounds=1, iterations=1)
+    benchmark.extra_info["rss_growth_mb"] = round(growth_mb, 1)
+
+    assert size > ROWS * 50
+    assert growth_mb < MAX_GROWTH_MB
@@ -14,20 +14,23 @@ from sqlalchemy import create_engine, make_url, text
 from sqlalchemy.orm import scoped_session, sessionmaker
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
-from starlette.responses import JSONResponse
 
 from server.api.api import api_router
+from server.api.compression import CompressionMiddleware
 from server.api.deps import get_current_active_superuser
 from server.api.error_handling import ProblemDetailException
+from server.api.responses import FastJSONResponse
+from server.crud.count import count_cache
 from server.db import db, init_database
 from server.db.database import (
-    ENGINE_ARGUMENTS,
     SESSION_ARGUMENTS,
     BaseModel,
     Database,
     DBSessionMiddleware,
     SearchQuery,
+    engine_arguments,
 )
+from server.db.instrumentation import SQLInstrumentationMiddleware, instrument_engine
 from server.db.models import ProductTable, UserTable
 from server.exception_handlers.generic_exception_handlers import problem_detail_handler
 from server.security import CustomCognitoToken, auth_required
@@ -40,6 +43,8 @@ from tests.unit_tests.factories.product import make_product, make_translated_pro
 from tests.unit_tests.factories.shop import make_shop
 from tests.unit_tests.factories.tag import make_tag
 
+SQL_REPEAT_THRESHOLD = 5
+
 
 def run_migrations(db_uri: str) -> None:
     """Configure the alembic context and run the migrations.
@@ -123,7 +128,7 @@ def database(db_uri):
         conn.execute(text(f'CREATE DATABASE "{db_to_create}";'))
 
     run_migrations(db_uri)
-    db.wrapped_database.engine = create_engine(db_uri, **ENGINE_ARGUMENTS)
+    db.wrapped_database.engine = instrument_engine(create_engine(db_uri, **engine_arguments(db_uri)))
 
     try:
         yield
@@ -162,6 +167,8 @@ def db_session(database):
         finally:
             if not trans._deactivated_from_connection:
                 trans.rollback()
+            # The counts of rolled back rows
+            count_cache.clear()
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -173,7 +180,7 @@ def fastapi_app(database, db_uri):
         docs_url="/docs",
         redoc_url="/redoc",
         version="0.2.0",
-        default_response_class=JSONResponse,
+        default_response_class=FastJSONResponse,
     )
     init_database(app_settings)
 
@@ -181,6 +188,8 @@ def fastapi_app(database, db_uri):
 
     app.add_middleware(SessionMiddleware, secret_key=app_settings.SESSION_SECRET)
     app.add_middleware(DBSessionMiddleware, database=db)
+    # Fail tests of endpoints that issue the same statement for every row (N+1)
+    app.add_middleware(SQLInstrumentationMiddleware, debug_headers=True, strict=True, threshold=SQL_REPEAT_THRESHOLD)
     origins = app_settings.CORS_ORIGINS.split(",")
     app.add_middleware(
         CORSMiddleware,
@@ -189,6 +198,7 @@ def fastapi_app(database, db_uri):
         allow_headers=app_settings.CORS_ALLOW_HEADERS,
         expose_headers=app_settings.CORS_EXPOSE_HEADERS,
     )
+    app.add_middleware(CompressionMiddleware, minimum_size=app_settings.COMPRESSION_MINIMUM_SIZE)
 
     # app.add_exception_handler(FormException, form_error_handler)
     app.add_exception_handler(ProblemDetailException, problem_detail_handler)
@@ -243,7 +253,7 @@ def fastapi_app_not_authenticated(database, db_uri):
         docs_url="/docs",
         redoc_url="/redoc",
         version="0.2.0",
-        default_response_class=JSONResponse,
+        default_response_class=FastJSONResponse,
     )
     init_database(app_settings)
 
@@ -251,6 +261,8 @@ def fastapi_app_not_authenticated(database, db_uri):
 
     app.add_middleware(SessionMiddleware, secret_key=app_settings.SESSION_SECRET)
     app.add_middleware(DBSessionMiddleware, database=db)
+    # Fail tests of endpoints that issue the same statement for every row (N+1)
+    app.add_middleware(SQLInstrumentationMiddleware, debug_headers=True, strict=True, threshold=SQL_REPEAT_THRESHOLD)
     origins = app_settings.CORS_ORIGINS.split(",")
     app.add_middleware(
         CORSMiddleware,
@@ -259,6 +271,7 @@ def fastapi_app_not_authenticated(database, db_uri):
         allow_headers=app_settings.CORS_ALLOW_HEADERS,
         expose_headers=app_settings.CORS_EXPOSE_HEADERS,
     )
+    app.add_middleware(CompressionMiddleware, minimum_size=app_settings.COMPRESSION_MINIMUM_SIZE)
 
     # app.add_exception_handler(FormException, form_error_handler)
     app.add_exception_handler(ProblemDetailException, problem_detail_handler)
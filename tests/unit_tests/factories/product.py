@@ -4,6 +4,7 @@ import structlog
 
 from server.db import db
 from server.db.models import ProductTable, ProductTranslationTable
+from server.schemas.product import ProductCreate
 
 logger = structlog.getLogger(__name__)
 
@@ -70,3 +71,28 @@ def make_translated_product(
     db.session.commit()
 
     return product.id
+
+
+def product_create(shop_id, category_id, number: int) -> ProductCreate:
+    return ProductCreate(
+        shop_id=shop_id,
+        category_id=category_id,
+        price=number,
+        tax_category="vat_standard",
+        max_one=False,
+        shippable=True,
+        featured=False,
+        new_product=False,
+        order_number=number,
+        image_1=None,
+        image_2=None,
+        image_3=None,
+        image_4=None,
+        image_5=None,
+        image_6=None,
+        translation={
+            "main_name": f"Product {number}",
+            "main_description": "Handgemaakt in Nederland",
+            "main_description_short": "Handgemaakt",
+        },
+    )
@@ -0,0 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from server.api import helpers
+from server.services.aws import ClientRegistry, aws_clients
+
+
+def test_client_is_created_once_on_first_use():
+    calls = []
+    registry = ClientRegistry()
+    registry.register("client", lambda: calls.append(1) or object())
+
+    assert not calls
+    with ThreadPoolExecutor(8) as executor:
+        clients = list(executor.map(lambda _: registry.get("client"), range(32)))
+
+    assert len(calls) == 1
+    assert all(client is clients[0] for client in clients)
+
+    registry.reset()
+    assert registry.get("client") is not clients[0]
+    assert len(calls) == 2
+
+
+def test_helpers_clients_are_lazy():
+    aws_clients.reset()
+
+    client = helpers.s3_client
+
+    assert client is aws_clients.get("s3_client")
+    assert client.meta.region_name == "eu-central-1"
@@ -0,0 +1,139 @@
+from uuid import uuid4
+
+from sqlalchemy import select
+from typer.testing import CliRunner
+
+from server.crud.crud_product import product_crud
+from server.crud.crud_shop import shop_crud
+from server.crud.crud_tag import tag_crud
+from server.db import db
+from server.db.models import CatalogSnapshotTable, ProductTable, ProductToTagTable, ShopTable, TagTranslationTable
+from server.schemas.product import ProductBulkUpdate
+from server.scripts.rebuild_catalog import app
+from server.utils.json import json_dumps
+from tests.unit_tests.factories.account import make_account
+from tests.unit_tests.factories.attribute import make_attribute_with_translation, make_option
+from tests.unit_tests.factories.categories import make_category
+from tests.unit_tests.factories.order import make_pending_order
+from tests.unit_tests.factories.product import product_create
+from tests.unit_tests.factories.tag import make_tag
+
+runner = CliRunner()
+
+
+def catalog_version(shop_id) -> int:
+    return db.session.get(ShopTable, shop_id, populate_existing=True).catalog_version
+
+
+def get_prices(test_client, shop_id, lang="main"):
+    response = test_client.get(f"/shops/{shop_id}/prices/?lang={lang}")
+    assert response.status_code == 200
+    return response
+
+
+def test_snapshot_served(test_client, shop_with_config, product):
+    built = get_prices(test_client, shop_with_config)
+    snapshot = db.session.get(CatalogSnapshotTable, (shop_with_config, "main"))
+    assert snapshot.version == catalog_version(shop_with_config)
+
+    served = get_prices(test_client, shop_with_config)
+    assert served.json() == built.json()
+    assert served.json()[0]["id"] == str(product)
+    assert int(served.headers["X-DB-Statements"]) < int(built.headers["X-DB-Statements"])
+
+
+def test_snapshot_not_found(test_client):
+    assert test_client.get(f"/shops/{uuid4()}/prices/?lang=main").status_code == 404
+
+
+def test_product_change_rebuilds(test_client, shop_with_config, product):
+    get_prices(test_client, shop_with_config)
+
+    db.session.get(ProductTable, product).price = 5
+    db.session.commit()
+    [item] = get_prices(test_client, shop_with_config).json()
+    assert item["price"] == 5
+
+    db.session.get(ProductTable, product).translation.main_name = "Renamed"
+    db.session.commit()
+    [item] = get_prices(test_client, shop_with_config).json()
+    assert item["name"] == "Renamed"
+
+
+def test_tag_change_rebuilds(test_client, shop_with_config, product):
+    tag_id = make_tag(shop_id=shop_with_config, main_name="Sale")
+    db.session.add(ProductToTagTable(shop_id=shop_with_config, product_id=product, tag_id=tag_id))
+    db.session.commit()
+    [item] = get_prices(test_client, shop_with_config).json()
+    assert item["tags"] == ["Sale"]
+
+    db.session.scalars(select(TagTranslationTable).filter_by(tag_id=tag_id)).one().main_name = "Outlet"
+    db.session.commit()
+    [item] = get_prices(test_client, shop_with_config).json()
+    assert item["tags"] == ["Outlet"]
+
+    tag_crud.delete_by_shop_id(shop_id=shop_with_config, id=tag_id)
+    [item] = get_prices(test_client, shop_with_config).json()
+    assert item["tags"] == []
+
+
+def test_attribute_change_rebuilds(test_client, shop_with_config, product):
+    attribute_id = make_attribute_with_translation(shop_id=shop_with_config, main_name="Size")
+    option_id = make_option(attribute_id, "xl")
+    [item] = get_prices(test_client, shop_with_config).json()
+    assert item["attributes"] == []
+
+    response = test_client.put(
+        f"/shops/{shop_with_config}/product-attribute-values/{product}",
+        data=json_dumps({"option_ids": [str(option_id)]}),
+    )
+    assert response.status_code == 204
+    [item] = get_prices(test_client, shop_with_config).json()
+    assert item["attributes"] == ["Size"]
+
+
+def test_vat_change_rebuilds(test_client, shop_with_config, product):
+    [item] = get_prices(test_client, shop_with_config).json()
+    assert item["tax_percentage"] == 21.0
+
+    shop_crud.get(shop_with_config).vat_standard = 9.0
+    db.session.commit()
+    [item] = get_prices(test_client, shop_with_config).json()
+    assert item["tax_percentage"] == 9.0
+
+
+def test_unrelated_writes_keep_snapshot(test_client, shop_with_config, product):
+    get_prices(test_client, shop_with_config)
+    version = catalog_version(shop_with_config)
+
+    shop_crud.get(shop_with_config).discord_webhook = "https://example.com/webhook"
+    db.session.commit()
+    account_id = make_account(shop_id=shop_with_config)
+    make_pending_order(shop_with_config, account_id, product, product)
+    assert catalog_version(shop_with_config) == version
+
+
+def test_bulk_writes_raise_version(shop_with_config):
+    category_id = make_category(shop_id=shop_with_config)
+    version = catalog_version(shop_with_config)
+
+    item = product_create(shop_with_config, category_id, 1)
+    [product_id] = product_crud.create_many(shop_id=shop_with_config, objs_in=[item])
+    assert catalog_version(shop_with_config) == version + 1
+    update = ProductBulkUpdate(id=product_id, **{**item.model_dump(), "price": 2})
+    product_crud.update_many(shop_id=shop_with_config, objs_in=[update])
+    assert catalog_version(shop_with_config) == version + 2
+    product_crud.delete_many(shop_id=shop_with_config, ids=[product_id])
+    assert catalog_version(shop_with_config) == version + 3
+
+
+def test_rebuild_catalog(shop_with_config, product):
+    result = runner.invoke(app, ["--shop-id", str(shop_with_config)])
+    assert result.exit_code == 0
+    assert "built=3" in result.stdout
+    snapshot = db.session.get(CatalogSnapshotTable, (shop_with_config, "main"))
+    assert snapshot.version == catalog_version(shop_with_config)
+
+    # Up to date snapshots are left alone
+    result = runner.invoke(app, ["--shop-id", str(shop_with_config), "--lang", "main"])
+    assert "built=0" in result.stdout
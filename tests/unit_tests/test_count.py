@@ -0,0 +1,99 @@
+from uuid import uuid4
+
+import anyio
+from sqlalchemy import text
+
+from server.crud.count import CountMode, count_cache
+from server.crud.crud_account import account_crud
+from server.crud.crud_product import product_crud
+from server.db import db
+from server.db.database import Database
+from server.db.models import Account
+from server.schemas.product import ProductBulkUpdate
+from tests.unit_tests.factories.account import make_account
+from tests.unit_tests.factories.categories import make_category
+from tests.unit_tests.factories.product import product_create
+from tests.unit_tests.factories.shop import make_shop
+
+
+def total(shop_id, count: CountMode) -> str:
+    _, header_range = account_crud.get_multi_by_shop_id(
+        shop_id=shop_id, limit=10, filter_parameters=None, sort_parameters=None, count=count
+    )
+    return header_range.rsplit("/", 1)[1]
+
+
+def test_count_none(shop):
+    make_account(shop_id=shop)
+
+    assert total(shop, CountMode.none) == "*"
+
+
+def test_count_estimate(shop):
+    for _ in range(3):
+        make_account(shop_id=shop)
+
+    # Filtered by shop: the planner's estimate, which is a positive number but not necessarily 3
+    assert int(total(shop, CountMode.estimate)) >= 1
+    _, header_range = account_crud.get_multi(limit=10, filter_parameters=None, sort_parameters=None, count="estimate")
+    assert int(header_range.rsplit("/", 1)[1]) >= 0
+
+
+def test_count_estimate_async_engine(db_uri, monkeypatch):
+    # A filtered listing through `run_sync` on the asyncpg engine, which binds positional parameters
+    async_db = Database(db_uri, async_enabled=True)
+    monkeypatch.setattr(db, "wrapped_database", async_db)
+
+    async def run():
+        try:
+            async with async_db.async_database_scope():
+                return await async_db.run_sync(total, uuid4(), CountMode.estimate)
+        finally:
+            await async_db.async_engine.dispose()
+
+    assert int(anyio.run(run)) >= 0
+
+
+def test_exact_count_is_cached(shop, monkeypatch):
+    monkeypatch.setattr(count_cache, "ttl", 60)
+    make_account(shop_id=shop)
+    assert total(shop, CountMode.exact) == "1"
+
+    # Written without a flush: the cached count is served until it expires
+    db.session.execute(
+        text("INSERT INTO accounts (shop_id, name, details) VALUES (:shop_id, 'Core', '{}')"), {"shop_id": str(shop)}
+    )
+    assert total(shop, CountMode.exact) == "1"
+
+    # Written through the session: the counts of the table are dropped
+    db.session.add(Account(shop_id=shop, name="ORM", details={}))
+    db.session.flush()
+    assert total(shop, CountMode.exact) == "3"
+
+
+def test_exact_count_is_per_shop(shop, monkeypatch):
+    monkeypatch.setattr(count_cache, "ttl", 60)
+    other_shop = make_shop(random_shop_name=True)
+    make_account(shop_id=shop)
+
+    assert total(shop, CountMode.exact) == "1"
+    assert total(other_shop, CountMode.exact) == "0"
+
+
+def test_bulk_writes_drop_counts(shop, monkeypatch):
+    monkeypatch.setattr(count_cache, "ttl", 60)
+    category_id = make_category(shop_id=shop)
+    item = product_create(shop, category_id, 1)
+
+    for write in ("create", "update", "delete"):
+        count_cache.set("products", "fingerprint", 1)
+        count_cache.set("product_translations", "fingerprint", 1)
+        if write == "create":
+            [product_id] = product_crud.create_many(shop_id=shop, objs_in=[item])
+        elif write == "update":
+            update = ProductBulkUpdate(id=product_id, **{**item.model_dump(), "price": 2})
+            product_crud.update_many(shop_id=shop, objs_in=[update])
+            assert count_cache.get("product_translations", "fingerprint") is None
+        else:
+            product_crud.delete_many(shop_id=shop, ids=[product_id])
+        assert count_cache.get("products", "fingerprint") is None, write
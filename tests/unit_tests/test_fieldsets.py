@@ -0,0 +1,112 @@
+import pytest
+
+from server.api.deps import split_values
+from server.crud.fieldsets import sparse_fieldset
+from server.db.models import ProductTable
+from server.schemas.product import ProductWithDefaultPrice
+from tests.unit_tests.factories.attribute import make_attribute
+from tests.unit_tests.factories.categories import make_category
+from tests.unit_tests.factories.product import make_product
+from tests.unit_tests.factories.tag import make_tag
+from tests.unit_tests.test_update import statements
+
+
+def test_split_values():
+    assert split_values(None) is None
+    assert split_values(["id,price", " stock ", ""]) == ["id", "price", "stock"]
+
+
+def test_fieldset():
+    fieldset = sparse_fieldset(
+        ProductTable,
+        ProductWithDefaultPrice,
+        ["images_amount"],
+        ["translation"],
+        {"images_amount": ["image_1", "image_2"]},
+    )
+    assert list(fieldset.schema.model_fields) == ["translation", "id", "images_amount"]
+    assert fieldset.columns == ("id", "image_1", "image_2")
+    assert fieldset.include == ("translation",)
+    assert sparse_fieldset(ProductTable, ProductWithDefaultPrice, None, None) is None
+
+
+def test_products_fields(test_client, shop_with_config, product):
+    with statements() as executed:
+        response = test_client.get(f"/shops/{shop_with_config}/products/", params={"fields": "price,images_amount"})
+    assert response.status_code == 200
+    assert response.json() == [{"price": 1.0, "id": str(product), "images_amount": 0}]
+    assert response.headers["Content-Range"] == "producttables 0-100/1"
+    [select] = [statement for statement in executed if "FROM products" in statement and "count" not in statement]
+    assert "products.price" in select and "products.image_1" in select
+    assert "products.recurring_price_yearly" not in select and "product_translations" not in select
+
+
+def test_products_include(test_client, shop_with_config, product):
+    response = test_client.get(
+        f"/shops/{shop_with_config}/products/", params={"fields": "price", "include": "translation"}
+    )
+    assert response.json() == [
+        {
+            "price": 1.0,
+            "translation": {
+                "main_name": "Product for Testing",
+                "main_description": "Test Product Description",
+                "main_description_short": "Test Product Short Description",
+                "alt1_name": None,
+                "alt1_description": None,
+                "alt1_description_short": None,
+                "alt2_name": None,
+                "alt2_description": None,
+                "alt2_description_short": None,
+            },
+            "id": str(product),
+        }
+    ]
+
+    # Without `fields` all fields and the included relationships
+    [item] = test_client.get(f"/shops/{shop_with_config}/products/", params={"include": "translation"}).json()
+    assert item.keys() == ProductWithDefaultPrice.model_fields.keys()
+
+
+def test_products_fields_constant_queries(test_client, shop_with_config):
+    category_id = make_category(shop_id=shop_with_config)
+    url = f"/shops/{shop_with_config}/products/?fields=price&include=translation&count=none"
+    make_product(shop_id=shop_with_config, category_id=category_id)
+    statements_one = test_client.get(url).headers["X-DB-Statements"]
+    for _ in range(10):
+        make_product(shop_id=shop_with_config, category_id=category_id)
+    response = test_client.get(url)
+    assert len(response.json()) == 11
+    assert response.headers["X-DB-Statements"] == statements_one
+
+
+def test_fields_with_cursor(test_client, shop_with_config):
+    category_id = make_category(shop_id=shop_with_config)
+    cheap, expensive = (
+        make_product(shop_id=shop_with_config, category_id=category_id, price=price) for price in (1, 2)
+    )
+    params = {"fields": "price", "sort": "price", "cursor": "", "limit": 1}
+
+    response = test_client.get(f"/shops/{shop_with_config}/products/", params=params)
+    assert response.json() == [{"price": 1.0, "id": str(cheap)}]
+    params["cursor"] = response.headers["X-Next-Cursor"]
+    response = test_client.get(f"/shops/{shop_with_config}/products/", params=params)
+    assert response.json() == [{"price": 2.0, "id": str(expensive)}]
+
+
+@pytest.mark.parametrize(
+    "params", [{"fields": "nope"}, {"fields": "translation"}, {"include": "price"}, {"include": "category"}]
+)
+def test_unknown_fields(test_client, shop_with_config, params):
+    assert test_client.get(f"/shops/{shop_with_config}/products/", params=params).status_code == 400
+
+
+@pytest.mark.parametrize(
+    "listing, make", [("categories", make_category), ("tags", make_tag), ("attributes", make_attribute)]
+)
+def test_listing_fields(test_client, shop, listing, make):
+    make(shop_id=shop)
+    response = test_client.get(f"/shops/{shop}/{listing}/", params={"fields": "shop_id"})
+    assert response.status_code == 200
+    [item] = response.json()
+    assert item.keys() == {"shop_id", "id"}
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from server.crud.crud_account import account_crud
+from server.crud.crud_order import order_crud
+from server.crud.filters import compile_filter, search_condition
+from server.db import db
+from server.db.models import Account, OrderTable, ShopTable, UserTable
+from server.db.search import SEARCH_COLUMNS
+from tests.unit_tests.factories.account import make_account
+
+COMPLETED_AT = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def orders(shop):
+    account_id = make_account(shop_id=shop)
+    rows = [
+        OrderTable(shop_id=shop, account_id=account_id, total=10, status="pending", order_info=[]),
+        OrderTable(shop_id=shop, account_id=account_id, total=25, status="complete", order_info=[]),
+        OrderTable(
+            shop_id=shop,
+            account_id=account_id,
+            total=40,
+            status="complete",
+            completed_at=COMPLETED_AT,
+            notes="100% paid",
+            order_info=[],
+        ),
+    ]
+    db.session.add_all(rows)
+    db.session.flush()
+    return rows
+
+
+def totals(shop_id, *filters: str) -> list[float]:
+    orders, _ = order_crud.get_multi_by_shop_id(
+        shop_id=shop_id, filter_parameters=list(filters), sort_parameters=["total:ASC"]
+    )
+    return [order.total for order in orders]
+
+
+@pytest.mark.parametrize(
+    "filters, expected",
+    [
+        (["total:25"], [25]),
+        (["total_gte:25"], [25, 40]),
+        (["total_gt:10", "total_lt:40"], [25]),
+        (["total_lte:10"], [10]),
+        (["status_ne:pending"], [25, 40]),
+        (["status:complete", "total_gte:30"], [40]),
+        (["status_in:pending,complete"], [10, 25, 40]),
+        (["status_prefix:PEN"], [10]),
+        (["status:plet"], [25, 40]),
+        (["completed_at_null:true"], [10, 25]),
+        (["completed_at_null:false"], [40]),
+        ([f"completed_at_gte:{COMPLETED_AT:%Y-%m-%d}"], [40]),
+        (["notes:100%"], [40]),
+        (["notes:%"], [40]),
+        (["unknown:1"], [10, 25, 40]),
+    ],
+)
+def test_filters(shop, orders, filters, expected):
+    assert totals(shop, *filters) == expected
+
+
+def test_filter_by_id(shop, orders):
+    assert totals(shop, f"id:{orders[1].id}") == [25]
+    assert totals(shop, f"id_in:{orders[0].id},{orders[2].id}") == [10, 40]
+
+
+@pytest.mark.parametrize("filter_parameter", ["total_gte:many", "id:1", "completed_at_null:maybe", "total_prefix:1"])
+def test_invalid_filter(shop, orders, test_client, filter_parameter):
+    assert test_client.get("/orders/", params={"filter": filter_parameter}).status_code == 400
+
+
+def test_search(shop):
+    account_id = make_account(shop_id=shop, name="Jane Doe")
+    make_account(shop_id=shop, name="John Smith")
+
+    accounts, _ = account_crud.get_multi_by_shop_id(shop_id=shop, filter_parameters=["doe"], sort_parameters=None)
+    assert [account.id for account in accounts] == [account_id]
+    accounts, _ = account_crud.get_multi_by_shop_id(
+        shop_id=shop, filter_parameters=[str(account_id)], sort_parameters=None
+    )
+    assert [account.id for account in accounts] == [account_id]
+
+
+def test_typed_filters_are_not_cast():
+    condition = compile_filter(OrderTable, "total_gte:10").compile(dialect=postgresql.dialect())
+    assert str(condition) == "orders.total >= %(total_1)s"
+    condition = compile_filter(Account, "name:doe").compile(dialect=postgresql.dialect())
+    assert str(condition) == "accounts.name ILIKE %(name_1)s"
+
+
+def test_search_skips_secrets():
+    for model, secrets in ((UserTable, ["password"]), (Account, ["hash_name"]), (ShopTable, ["stripe_secret_key"])):
+        condition = str(search_condition(model, "secret").compile(dialect=postgresql.dialect()))
+        assert all(secret not in condition for secret in secrets)
+
+
+def test_search_columns_are_indexed():
+    if db.session.scalar(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")) is None:
+        pytest.skip("The pg_trgm extension is not available")
+    indexes = set(db.session.scalars(text("SELECT indexname FROM pg_indexes WHERE indexname LIKE '%_trgm'")))
+    for table, columns in SEARCH_COLUMNS.items():
+        for column in columns:
+            assert f"ix_{table}_{column}_trgm" in indexes
+
+    # Every branch of the OR has an index, so the search needs no sequential scan
+    db.session.execute(text("SET LOCAL enable_seqscan = off"))
+    statement = select(OrderTable).where(search_condition(OrderTable, "paid"))
+    sql = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    plan = "\n".join(db.session.scalars(text(f"EXPLAIN {sql}")))
+    assert "Seq Scan" not in plan
@@ -0,0 +1,51 @@
+"""Import time of `server.main`, which every worker and every test process pays.
+
+The import is traced with `python -X importtime` in a fresh interpreter. The modules in `DEFERRED_MODULES` must not be
+imported. The wall-clock budget depends on the machine, so it is only checked when `IMPORT_TIME_BUDGET_MS` is set,
+e.g. `IMPORT_TIME_BUDGET_MS=1600 pytest tests/unit_tests/test_import_time.py`; the import is timed best of `ROUNDS`.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+ROUNDS = 3
+IMPORT_TIME_BUDGET_MS = os.getenv("IMPORT_TIME_BUDGET_MS")
+
+# Only needed by a few endpoints, or not at all at runtime: imported lazily
+DEFERRED_MODULES = ["alembic", "boto3", "botocore", "html2text", "jinja2", "sentry_sdk", "stripe"]
+
+IMPORT_LINE = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| *(\S+)$", re.MULTILINE)
+
+
+def import_server_main() -> dict[str, int]:
+    """Return the cumulative import time in microseconds of every module imported by `import server.main`."""
+    env = {key: value for key, value in os.environ.items() if key != "SENTRY_DSN"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server.main"],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    times: dict[str, int] = {}
+    for cumulative, name in IMPORT_LINE.findall(result.stderr):
+        times[name] = times.get(name, 0) + int(cumulative)
+    return times
+
+
+def test_deferred_modules_not_imported():
+    imported = {name.split(".")[0] for name in import_server_main()}
+    assert not imported & set(DEFERRED_MODULES)
+
+
+@pytest.mark.skipif(not IMPORT_TIME_BUDGET_MS, reason="IMPORT_TIME_BUDGET_MS is not set")
+def test_server_main_import_time():
+    best_ms = min(import_server_main()["server.main"] for _ in range(ROUNDS)) / 1000
+    assert best_ms < int(IMPORT_TIME_BUDGET_MS), f"import server.main took {best_ms:.0f} ms"
@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import select
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from server.db import ShopTable, db
+from server.db.instrumentation import NPlusOneError, SQLInstrumentationMiddleware, fingerprint
+
+
+def test_fingerprint_collapses_parameter_lists():
+    one = "SELECT * FROM products WHERE products.id IN (%(id_1_1)s::UUID)"
+    many = "SELECT *\n FROM products WHERE products.id IN (%(id_1_1)s::UUID, %(id_1_2)s::UUID, %(id_1_3)s::UUID)"
+    assert fingerprint(many) == "SELECT * FROM products WHERE products.id IN (...)"
+    assert fingerprint(one) == fingerprint(many)
+    assert fingerprint("SELECT * FROM products WHERE id = $1") == "SELECT * FROM products WHERE id = $1"
+
+
+def test_debug_headers(test_client, shop):
+    response = test_client.get(f"/shops/{shop}/categories/")
+    assert int(response.headers["X-DB-Statements"]) >= 1
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
+    assert int(response.headers["X-DB-Max-Repeats"]) >= 1
+
+
+def test_strict_mode_raises_on_repeated_statement(shop):
+    def n_plus_one(request):
+        for _ in range(3):
+            db.session.execute(select(ShopTable.name).where(ShopTable.id == shop)).scalar()
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/", n_plus_one)])
+    app.add_middleware(SQLInstrumentationMiddleware, strict=True, threshold=2)
+
+    with pytest.raises(NPlusOneError, match="more than 2 times"):
+        TestClient(app).get("/")
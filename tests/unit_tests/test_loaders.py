@@ -0,0 +1,93 @@
+import pytest
+
+from server.crud.count import count_cache
+from server.crud.crud_product import product_crud
+from server.crud.loaders import LoaderProfile
+from server.db import db
+from server.db.models import ProductToTagTable
+from tests.unit_tests.factories.account import make_account
+from tests.unit_tests.factories.attribute import make_attribute_with_translation, make_option, make_pav
+from tests.unit_tests.factories.categories import make_category_translated
+from tests.unit_tests.factories.order import make_pending_order
+from tests.unit_tests.factories.product import make_product
+from tests.unit_tests.factories.tag import make_tag
+
+
+@pytest.fixture()
+def catalog(shop_with_config):
+    """A shop with a category and a function that adds products to it, each with a category, order and account."""
+    shop_id = shop_with_config
+    category_id = make_category_translated(shop_id=shop_id)
+
+    def add_products(amount: int) -> None:
+        for number in range(amount):
+            product_id = make_product(shop_id=shop_id, category_id=category_id, main_name=f"Shirt {number}")
+            # Every product its own attribute, option, tag and order: lazy loading them would cost a query each
+            attribute_id = make_attribute_with_translation(shop_id=shop_id, name=f"color {product_id}")
+            make_pav(product_id, attribute_id, make_option(attribute_id, value_key="Red"))
+            tag_id = make_tag(shop_id=shop_id, main_name=f"Tag {product_id}")
+            db.session.add(ProductToTagTable(shop_id=shop_id, product_id=product_id, tag_id=tag_id))
+            make_category_translated(shop_id=shop_id, main_name=f"Category {product_id}")
+            account_id = make_account(shop_id=shop_id, name=f"Account {product_id}")
+            make_pending_order(shop_id, account_id, product_id, product_id, customer_order_id=number)
+        db.session.commit()
+
+    return shop_id, category_id, add_products
+
+
+def statement_count(test_client, url: str) -> int:
+    # Both requests count the rows
+    count_cache.clear()
+    response = test_client.get(url)
+    assert response.status_code == 200
+    return int(response.headers["X-DB-Statements"])
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/shops/{shop_id}/products/",
+        "/shops/{shop_id}/products/?limit=0",
+        "/shops/{shop_id}/products/with_attributes",
+        "/shops/{shop_id}/products/search?q=shirt",
+        "/shops/{shop_id}/categories/",
+        "/shops/{shop_id}/categories/{category_id}/products",
+        "/shops/{shop_id}/prices/?lang=main",
+        "/orders/shop/{shop_id}/pending",
+        "/orders/shop/{shop_id}/pending?limit=0",
+    ],
+)
+def test_page_costs_constant_queries(test_client, catalog, url):
+    shop_id, category_id, add_products = catalog
+    url = url.format(shop_id=shop_id, category_id=category_id)
+
+    add_products(2)
+    small = statement_count(test_client, url)
+    add_products(10)
+    assert statement_count(test_client, url) == small
+
+
+def test_detail_costs_constant_queries(test_client, shop_with_config):
+    shop_id = shop_with_config
+    category_id = make_category_translated(shop_id=shop_id)
+    product_ids = [make_product(shop_id=shop_id, category_id=category_id) for _ in range(2)]
+    for number, product_id in enumerate(product_ids):
+        for value in range(1 + 5 * number):
+            attribute_id = make_attribute_with_translation(shop_id=shop_id, name=f"attribute {product_id} {value}")
+            make_pav(product_id, attribute_id, make_option(attribute_id, value_key=str(value)))
+
+    one, six = (
+        statement_count(test_client, f"/shops/{shop_id}/products/{product_id}/with_attributes")
+        for product_id in product_ids
+    )
+    assert one == six
+
+
+def test_profile_loads_relationships(shop_with_config, product):
+    db.session.expunge_all()
+    assert "translation" not in product_crud.get_id_by_shop_id(shop_with_config, product).__dict__
+
+    db.session.expunge_all()
+    loaded = product_crud.get_id_by_shop_id(shop_with_config, product, profile=LoaderProfile.detail)
+    assert "translation" in loaded.__dict__
+    assert product_crud.loader_options(None) == ()
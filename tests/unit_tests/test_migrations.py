@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, make_url, text
+
+from server.db.migrations import database_heads, script_heads, upgrade_to_heads, version_locations
+
+ALEMBIC_INI = Path(__file__).resolve().parent / "../../alembic.ini"
+
+
+def test_script_heads_match_alembic():
+    alembic_heads = set(ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_heads())
+
+    assert script_heads(version_locations(ALEMBIC_INI)) == alembic_heads
+
+
+def test_upgrade_skipped_when_up_to_date(db_uri):
+    assert upgrade_to_heads(db_uri, ALEMBIC_INI) is False
+
+
+def test_concurrent_upgrades_migrate_once(db_uri):
+    url = make_url(db_uri)
+    fresh_url = url.set(database=f"{url.database}-migrations").render_as_string(hide_password=False)
+    admin_engine = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    with closing(admin_engine.connect()) as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{url.database}-migrations"'))
+        conn.execute(text(f'CREATE DATABASE "{url.database}-migrations"'))
+
+    try:
+        with ThreadPoolExecutor(4) as executor:
+            migrated = list(executor.map(lambda _: upgrade_to_heads(fresh_url, ALEMBIC_INI), range(4)))
+
+        assert migrated.count(True) == 1
+        engine = create_engine(fresh_url)
+        with closing(engine.connect()) as conn:
+            assert database_heads(conn) == script_heads(version_locations(ALEMBIC_INI))
+        engine.dispose()
+    finally:
+        with closing(admin_engine.connect()) as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{url.database}-migrations"'))
+        admin_engine.dispose()
+
+
+def test_upgrade_with_percent_in_password(db_uri):
+    url = make_url(db_uri)
+    name = f"{url.database}-percent"
+    # Rendered URL encoded, as shop%25test
+    fresh_url = url.set(database=name, username=name, password="shop%test").render_as_string(hide_password=False)
+    admin_engine = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+    with closing(admin_engine.connect()) as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+        conn.execute(text(f'DROP ROLE IF EXISTS "{name}"'))
+        conn.execute(text(f"CREATE ROLE \"{name}\" LOGIN PASSWORD 'shop%test'"))
+        conn.execute(text(f'CREATE DATABASE "{name}" OWNER "{name}"'))
+
+    try:
+        assert "%" in fresh_url
+        assert upgrade_to_heads(fresh_url, ALEMBIC_INI) is True
+    finally:
+        with closing(admin_engine.connect()) as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+            conn.execute(text(f'DROP ROLE IF EXISTS "{name}"'))
+        admin_engine.dispose()
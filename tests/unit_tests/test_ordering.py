@@ -0,0 +1,37 @@
+import pytest
+
+from server.crud.ordering import ORDER_NUMBER_GAP, next_order_number, sparse_order_numbers
+
+GAP = ORDER_NUMBER_GAP
+
+
+def test_next_order_number():
+    assert next_order_number(None) == 0
+    assert next_order_number(0) == GAP
+    assert next_order_number(-5) == GAP - 5
+
+
+@pytest.mark.parametrize(
+    "numbers, expected",
+    [
+        ([], []),
+        ([0, GAP, 2 * GAP], [0, GAP, 2 * GAP]),
+        # Only the moved row gets a new number, between those of its new neighbours
+        ([0, 2 * GAP, GAP, 3 * GAP], [0, GAP // 2, GAP, 3 * GAP]),
+        ([3 * GAP, 0, GAP, 2 * GAP], [-GAP, 0, GAP, 2 * GAP]),
+        ([GAP, 2 * GAP, 3 * GAP, 0], [GAP, 2 * GAP, 3 * GAP, 4 * GAP]),
+        # No room between 0 and 1: everything is spread out
+        ([0, 2, 1], [0, GAP, 2 * GAP]),
+        ([None, None], [0, GAP]),
+    ],
+)
+def test_sparse_order_numbers(numbers, expected):
+    assert sparse_order_numbers(numbers) == expected
+
+
+def test_sparse_order_numbers_increase():
+    numbers = [5, 5, None, 3, 9, 9, 1]
+    order_numbers = sparse_order_numbers(numbers)
+    assert order_numbers == sorted(set(order_numbers))
+    # The longest increasing run, like 5, 9, keeps its numbers
+    assert sum(new == old for new, old in zip(order_numbers, numbers)) == 2
@@ -0,0 +1,79 @@
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import event
+
+from server.crud.crud_product import product_crud
+from server.crud.crud_tag import tag_crud
+from server.db import db
+from server.db.models import ProductTable
+from server.schemas.product import ProductOrder
+from server.schemas.tag import TagUpdate
+from tests.unit_tests.factories.tag import make_tag
+
+
+@contextmanager
+def statements() -> Iterator[List[str]]:
+    executed: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, *args) -> None:
+        executed.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield executed
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def writes(executed: List[str]) -> List[str]:
+    return [statement for statement in executed if statement.startswith(("UPDATE", "INSERT", "DELETE"))]
+
+
+def test_update_writes_changed_columns(shop):
+    tag = tag_crud.get(make_tag(shop_id=shop))
+    update = TagUpdate(shop_id=shop, name=tag.name, translation={"main_name": "Rood", "alt1_name": "Tag voor Testen"})
+
+    with statements() as executed:
+        tag_crud.update(db_obj=tag, obj_in=update)
+    # The changed column, and the catalog version of the shop (see `server.crud.catalog`)
+    [statement, catalog_version] = writes(executed)
+    assert statement.startswith("UPDATE tag_translations SET main_name=")
+    assert catalog_version.startswith("UPDATE shops SET catalog_version=")
+    assert tag.translation.main_name == "Rood"
+
+
+def test_update_without_changes_writes_nothing(shop):
+    tag = tag_crud.get(make_tag(shop_id=shop))
+    update = TagUpdate(
+        shop_id=shop,
+        name=tag.name,
+        translation={"main_name": "Tag for Testing", "alt1_name": "Tag voor Testen", "alt2_name": "Tag zum Testen"},
+    )
+    assert tag.translation.main_name == "Tag for Testing"
+
+    with statements() as executed:
+        tag_crud.update(db_obj=tag, obj_in=update)
+    # No UPDATE, no COMMIT and no query for the loaded translation
+    assert executed == []
+
+
+def test_update_sets_modified_at(shop_with_config, product):
+    db_obj = product_crud.get(product)
+    modified_at = db_obj.modified_at
+
+    product_crud.update(db_obj=db_obj, obj_in=ProductOrder(order_number=db_obj.order_number))
+    assert db_obj.modified_at == modified_at
+
+    product_crud.update(db_obj=db_obj, obj_in=ProductOrder(order_number=db_obj.order_number + 1))
+    assert db.session.get(ProductTable, product).modified_at > modified_at
+
+
+def test_update_commits_earlier_changes(shop):
+    """`commit=False` updates followed by one that changes nothing, like the swap endpoints, are committed."""
+    tag = tag_crud.get(make_tag(shop_id=shop))
+    tag_crud.update(
+        db_obj=tag, obj_in=TagUpdate(shop_id=shop, name="Changed", translation={"main_name": "x"}), commit=False
+    )
+    tag_crud.update(db_obj=tag, obj_in=TagUpdate(shop_id=shop, name="Changed", translation={"main_name": "x"}))
+    assert not db.session.dirty